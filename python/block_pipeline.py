@@ -0,0 +1,146 @@
+"""
+Three-stage producer/consumer pipeline for block-wise processing.
+A reader thread prefetches the input of upcoming blocks, a pool of
+compute threads processes them, and a writer thread consumes the results
+strictly in block order. At most max_in_flight blocks are read but not
+yet written, which bounds memory. Each stage's busy time is measured so
+the slowest stage can be identified.
+"""
+
+import queue
+import threading
+import time
+
+_DONE = object()
+_POLL_SECONDS = 0.1
+
+
+class _Stopped(Exception):
+    pass
+
+
+def _put(q, item, stop):
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_SECONDS)
+            return
+        except queue.Full:
+            pass
+    raise _Stopped
+
+
+def _get(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            pass
+    raise _Stopped
+
+
+def _acquire(semaphore, stop):
+    while not stop.is_set():
+        if semaphore.acquire(timeout=_POLL_SECONDS):
+            return
+    raise _Stopped
+
+
+def run_pipeline(items, read, compute, write, workers=2, max_in_flight=4):
+    """
+    Run read(item) -> compute(item, data) -> write(item, result) over items.
+    read runs in one thread, compute in `workers` threads, and write in one
+    thread in the order of items. The first exception in any stage stops
+    the pipeline and is raised here.
+    Returns {'wall', 'read', 'compute', 'write', 'workers', 'blocks'} with
+    the busy seconds of each stage.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if max_in_flight < 1:
+        raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+    items = list(items)
+    read_queue = queue.Queue(max_in_flight)
+    write_queue = queue.Queue(max_in_flight)
+    in_flight = threading.Semaphore(max_in_flight)
+    stop = threading.Event()
+    errors = []
+    busy = {'read': 0.0, 'compute': 0.0, 'write': 0.0}
+    busy_lock = threading.Lock()
+
+    def timed(stage, function, *args):
+        started = time.perf_counter()
+        result = function(*args)
+        with busy_lock:
+            busy[stage] += time.perf_counter() - started
+        return result
+
+    def run_stage(body):
+        def target():
+            try:
+                body()
+            except _Stopped:
+                pass
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+        return threading.Thread(target=target, daemon=True)
+
+    def reader():
+        for index, item in enumerate(items):
+            _acquire(in_flight, stop)
+            _put(read_queue, (index, item, timed('read', read, item)), stop)
+        for _ in range(workers):
+            _put(read_queue, _DONE, stop)
+
+    def worker():
+        while True:
+            task = _get(read_queue, stop)
+            if task is _DONE:
+                break
+            index, item, data = task
+            _put(write_queue, (index, item, timed('compute', compute, item, data)), stop)
+        _put(write_queue, _DONE, stop)
+
+    def writer():
+        # Results can arrive out of order from the workers
+        pending = {}
+        next_index = 0
+        finished_workers = 0
+        while finished_workers < workers:
+            task = _get(write_queue, stop)
+            if task is _DONE:
+                finished_workers += 1
+                continue
+            pending[task[0]] = task
+            while next_index in pending:
+                _, item, result = pending.pop(next_index)
+                timed('write', write, item, result)
+                in_flight.release()
+                next_index += 1
+
+    started = time.perf_counter()
+    threads = [run_stage(reader), run_stage(writer)] + [run_stage(worker) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return dict(busy, wall=time.perf_counter() - started, workers=workers, blocks=len(items))
+
+
+def format_utilization(stats):
+    """
+    One line per stage with its busy time and utilization.
+    The busiest stage relative to its capacity is marked as the bottleneck.
+    """
+    wall = max(stats['wall'], 1e-9)
+    capacity = {'read': 1, 'compute': stats['workers'], 'write': 1}
+    utilization = {stage: stats[stage] / (wall * capacity[stage]) for stage in capacity}
+    bottleneck = max(utilization, key=utilization.get)
+    lines = [f"⏱️ {stats['blocks']} blocks in {stats['wall']:.1f}s"]
+    for stage in capacity:
+        threads = f" ({capacity[stage]} threads)" if capacity[stage] > 1 else ""
+        marker = "  ← bottleneck" if stage == bottleneck else ""
+        lines.append(f"  {stage:<8} {stats[stage]:7.1f}s busy, {utilization[stage] * 100:5.1f}% utilized{threads}{marker}")
+    return "\n".join(lines)
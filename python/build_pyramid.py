@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Multi-resolution pyramid of the comparison rasters.
+Block-reduces the fields of heat_index_comparison_complete.nc to 2x, 4x,
+8x ... coarser grids with NaN-aware, area-weighted means, and stores
+every level as a group of one NetCDF file, so readers open only the
+resolution they need.
+"""
+
+import argparse
+import os
+import numpy as np
+import xarray as xr
+
+INPUT_FILE = 'heat_index_comparison_complete.nc'
+PYRAMID_FILE = 'heat_index_comparison_pyramid.nc'
+PYRAMID_VARIABLES = ('heat_index_2000', 'heat_index_2025', 'difference_2025_minus_2000', 'percent_change')
+
+
+def level_group(level):
+    return f'level_{level}'
+
+
+def cell_area_weights(lat):
+    """
+    Relative area of each grid row: the sine difference across the row's
+    latitude band, so polar rows keep their (small) share of the area.
+    """
+    lat = np.asarray(lat, dtype=float)
+    half_step = np.abs(np.median(np.diff(lat))) / 2 if len(lat) > 1 else 0.5
+    upper = np.clip(lat + half_step, -90, 90)
+    lower = np.clip(lat - half_step, -90, 90)
+    return np.abs(np.sin(np.deg2rad(upper)) - np.sin(np.deg2rad(lower)))
+
+
+def block_sum(values, factor=2):
+    """
+    Sum non-overlapping factor x factor blocks over the last two axes.
+    Edges that do not fill a block are padded with zeros.
+    """
+    *leading, n_lat, n_lon = values.shape
+    pad_lat = -n_lat % factor
+    pad_lon = -n_lon % factor
+    if pad_lat or pad_lon:
+        values = np.pad(values, [(0, 0)] * len(leading) + [(0, pad_lat), (0, pad_lon)])
+    n_lat, n_lon = values.shape[-2:]
+    blocks = values.reshape(*leading, n_lat // factor, factor, n_lon // factor, factor)
+    return blocks.sum(axis=(-3, -1))
+
+
+def block_coords(coords, factor=2):
+    """
+    Centre coordinate of each block (mean of the coordinates it covers).
+    """
+    coords = np.asarray(coords, dtype=float)
+    starts = np.arange(0, len(coords), factor)
+    return np.add.reduceat(coords, starts) / np.diff(np.append(starts, len(coords)))
+
+
+def build_pyramid(ds, n_levels=None, factor=2):
+    """
+    List of Datasets from native resolution (level 0) down to the coarsest
+    level. Each level is reduced from the previous one's weighted sums, so
+    the whole pyramid is built in one pass over the native grid and every
+    level equals the area-weighted mean of its native cells.
+    """
+    if factor < 2:
+        raise ValueError(f"coarsening factor must be at least 2, got {factor}")
+    lat = ds.latitude.values
+    lon = ds.longitude.values
+    variables = [name for name in PYRAMID_VARIABLES if name in ds]
+
+    values = np.stack([ds[name].transpose('latitude', 'longitude').values for name in variables])
+    valid = ~np.isnan(values)
+    cell_area = np.broadcast_to(cell_area_weights(lat)[:, None], values.shape[1:])
+    # Running per-variable sums of area and area x value over valid cells
+    weights = np.where(valid, cell_area, 0.0)
+    weighted = np.where(valid, values, 0.0) * weights
+
+    if n_levels is None:
+        n_levels = 1
+        size = min(len(lat), len(lon))
+        while size > factor:
+            size = -(-size // factor)
+            n_levels += 1
+
+    levels = []
+    for level in range(n_levels):
+        if level:
+            weighted = block_sum(weighted, factor)
+            weights = block_sum(weights, factor)
+            lat = block_coords(lat, factor)
+            lon = block_coords(lon, factor)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(weights > 0, weighted / weights, np.nan)
+
+        level_ds = xr.Dataset(
+            {name: (('latitude', 'longitude'), means[i], ds[name].attrs) for i, name in enumerate(variables)},
+            coords={'latitude': lat, 'longitude': lon},
+        )
+        level_ds.attrs = {'level': level, 'factor': factor ** level,
+                          'description': f'Area-weighted {factor ** level}x block mean of the native grid'}
+        levels.append(level_ds)
+    return levels
+
+
+def write_pyramid(levels, path=PYRAMID_FILE):
+    """
+    Write the levels as groups level_0, level_1, ... of one NetCDF file.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    for level_ds in levels:
+        level_ds.to_netcdf(path, mode='a', group=level_group(level_ds.attrs['level']))
+
+
+def open_level(level, path=PYRAMID_FILE):
+    """
+    Open one resolution level of the pyramid.
+    """
+    return xr.open_dataset(path, group=level_group(level))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a multi-resolution pyramid of the comparison rasters")
+    parser.add_argument('--input', default=INPUT_FILE, help="Comparison dataset from compare_2000_vs_2025.py")
+    parser.add_argument('--output', default=PYRAMID_FILE)
+    parser.add_argument('--levels', type=int, default=None,
+                        help="Number of levels including native (default: down to a 2-cell grid)")
+    parser.add_argument('--factor', type=int, default=2, help="Coarsening factor between levels")
+    args = parser.parse_args()
+
+    if args.factor < 2:
+        print(f"❌ --factor must be at least 2, got {args.factor}")
+        exit(1)
+    if args.levels is not None and args.levels < 1:
+        print(f"❌ --levels must be at least 1, got {args.levels}")
+        exit(1)
+
+    if not os.path.exists(args.input):
+        print(f"❌ {args.input} not found")
+        print("\n💡 Please run compare_2000_vs_2025.py first")
+        exit(1)
+
+    print(f"🔄 Building pyramid from {args.input}...")
+    with xr.open_dataset(args.input) as ds:
+        levels = build_pyramid(ds.load(), args.levels, args.factor)
+
+    write_pyramid(levels, args.output)
+    for level_ds in levels:
+        print(f"  level {level_ds.attrs['level']}: {level_ds.sizes['latitude']} x "
+              f"{level_ds.sizes['longitude']} ({level_ds.attrs['factor']}x)")
+    print(f"✅ {len(levels)} levels saved to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
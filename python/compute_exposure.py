@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Population-weighted heat exposure per country and globally.
+A local gridded population raster (NetCDF, or an ESRI ASCII grid as
+distributed with GPW/WorldPop) is regridded once to the ERA5 grid by
+summing every population cell into the grid cell nearest its centre, so
+totals are conserved; the result is cached per source file and grid.
+Country figures use the same box aggregation as the comparison stage.
+"""
+
+import argparse
+import hashlib
+import os
+import numpy as np
+import pandas as pd
+import xarray as xr
+from country_registry import get_registry
+from country_utils import weighted_sum_by_country
+from grid_lookup import GridIndex
+from heat_utils import scatter_to_grid, time_step_seconds
+
+CACHE_DIR = '.exposure_cache'
+# NWS heat index categories (°F): extreme caution, danger, extreme danger
+THRESHOLDS = (90.0, 103.0, 124.0)
+BAND_ROWS = 512
+
+
+def _ascii_grid_bands(path, band_rows):
+    """
+    Yield (values, lat_centres, lon_centres) row bands of an ESRI ASCII grid.
+    """
+    header = {}
+    with open(path) as f:
+        for line in f:
+            key, _, value = line.strip().partition(' ')
+            if not key or key[0].isdigit() or key[0] in '-.':
+                break
+            header[key.lower()] = float(value)
+    n_header = len(header)
+    n_cols, n_rows, cell_size = int(header['ncols']), int(header['nrows']), header['cellsize']
+    west = header['xllcenter'] - cell_size / 2 if 'xllcenter' in header else header['xllcorner']
+    south = header['yllcenter'] - cell_size / 2 if 'yllcenter' in header else header['yllcorner']
+    nodata = header.get('nodata_value')
+
+    lon_centres = west + (np.arange(n_cols) + 0.5) * cell_size
+    # Rows run from north to south
+    lat_centres = south + (n_rows - np.arange(n_rows) - 0.5) * cell_size
+    reader = pd.read_csv(path, sep=r'\s+', header=None, skiprows=n_header, chunksize=band_rows,
+                         dtype=np.float64)
+    start = 0
+    for chunk in reader:
+        values = chunk.values[:, :n_cols]
+        if nodata is not None:
+            values[values == nodata] = np.nan
+        yield values, lat_centres[start:start + len(values)], lon_centres
+        start += len(values)
+
+
+def _netcdf_bands(path, band_rows):
+    """
+    Yield (values, lat_centres, lon_centres) latitude bands of a NetCDF raster.
+    """
+    with xr.open_dataset(path) as ds:
+        population = next(iter(ds.data_vars.values()))
+        names = {'lat': 'latitude', 'lon': 'longitude', 'y': 'latitude', 'x': 'longitude'}
+        population = population.rename({dim: names[dim] for dim in population.dims if dim in names})
+        # Single-band rasters often carry a length-1 band or time dimension
+        population = population.squeeze(drop=True).transpose('latitude', 'longitude')
+        lon_centres = population.longitude.values
+        for start in range(0, population.sizes['latitude'], band_rows):
+            band = population.isel(latitude=slice(start, start + band_rows))
+            yield band.values.astype(float), band.latitude.values, lon_centres
+
+
+def regrid_population(path, lat_coords, lon_coords, band_rows=BAND_ROWS):
+    """
+    (latitude, longitude) population on the target grid. Every source cell
+    adds its count to the nearest target cell; cells off the grid or with
+    no data are dropped.
+    """
+    index = GridIndex(lat_coords, lon_coords)
+    totals = np.zeros(len(lat_coords) * len(lon_coords))
+    bands = _ascii_grid_bands if path.lower().endswith('.asc') else _netcdf_bands
+    for values, lats, lons in bands(path, band_rows):
+        lat_grid, lon_grid = np.meshgrid(lats, lons, indexing='ij')
+        rows, cols, valid = index.cell_indices(lat_grid.ravel(), lon_grid.ravel())
+        values = values.ravel()
+        valid &= np.isfinite(values) & (values > 0)
+        totals += np.bincount(rows[valid] * len(lon_coords) + cols[valid], weights=values[valid],
+                              minlength=len(totals))
+    return totals.reshape(len(lat_coords), len(lon_coords))
+
+
+def _cache_key(path, lat_coords, lon_coords):
+    stat = os.stat(path)
+    digest = hashlib.sha1(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+    digest.update(np.asarray(lat_coords, dtype=float).tobytes())
+    digest.update(np.asarray(lon_coords, dtype=float).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def load_population_grid(path, lat_coords, lon_coords, cache_dir=CACHE_DIR):
+    """
+    Regridded population as a DataArray, read from the cache when the
+    source file and target grid are unchanged.
+    """
+    cache_file = os.path.join(cache_dir, f"population_{_cache_key(path, lat_coords, lon_coords)}.nc")
+    if os.path.exists(cache_file):
+        print(f"📦 Using cached population grid '{cache_file}'")
+        with xr.open_dataarray(cache_file) as cached:
+            return cached.load()
+
+    print(f"🔄 Regridding population from '{path}'...")
+    population = xr.DataArray(
+        regrid_population(path, lat_coords, lon_coords),
+        coords={'latitude': lat_coords, 'longitude': lon_coords},
+        dims=('latitude', 'longitude'),
+        name='population',
+        attrs={'source': os.path.abspath(path), 'units': 'persons'},
+    )
+    os.makedirs(cache_dir, exist_ok=True)
+    population.to_netcdf(cache_file)
+    return population
+
+
+def hours_above(path, thresholds=THRESHOLDS, block_size=168):
+    """
+    Per-cell hours at or above each threshold of a heat_index_<year>_full.nc
+    series, counted block_size time steps at a time.
+    Returns a (threshold, latitude, longitude) DataArray.
+    """
+    with xr.open_dataarray(path) as series:
+        step_hours = time_step_seconds(series.time.values) / 3600
+        counts = np.zeros((len(thresholds),) + series.shape[1:])
+        for start in range(0, series.sizes['time'], block_size):
+            block = series.isel(time=slice(start, start + block_size)).values
+            # NaN (below the heat index range) never counts
+            with np.errstate(invalid='ignore'):
+                for i, threshold in enumerate(thresholds):
+                    counts[i] += (block >= threshold).sum(axis=0)
+
+        hours = counts * step_hours
+        template = series.isel(time=0, drop=True)
+        if 'cell' in series.dims:
+            grids = [scatter_to_grid(template.copy(data=values)) for values in hours]
+        else:
+            grids = [template.copy(data=values) for values in hours]
+        result = xr.concat(grids, dim=pd.Index(np.asarray(thresholds, dtype=float), name='threshold'))
+    return result.transpose('threshold', 'latitude', 'longitude')
+
+
+def exposure_table(mean_heat_index, hours, population):
+    """
+    Per-country and global population-weighted heat index and person-hours
+    above each threshold. The global row (WLD) covers the whole grid.
+    """
+    weights = population.values
+    mean_by_country = weighted_sum_by_country(mean_heat_index, weights)
+    population_by_country = weighted_sum_by_country(population, np.ones_like(weights))
+    person_hours = {
+        threshold: weighted_sum_by_country(hours.sel(threshold=threshold), weights)
+        for threshold in hours.threshold.values
+    }
+
+    rows = []
+    for country, stats in mean_by_country.items():
+        row = {
+            'country_code': country,
+            'gridded_population': population_by_country[country]['weighted_sum'],
+            'pop_weighted_heat_index': stats['mean'],
+        }
+        for threshold, by_country in person_hours.items():
+            row[f'person_hours_above_{threshold:g}'] = by_country[country]['weighted_sum']
+        rows.append(row)
+
+    table = pd.DataFrame(rows)
+    registry = get_registry()
+    table.insert(1, 'country_name', registry.names(table['country_code'].values).astype(object))
+    table.insert(3, 'national_population', registry.populations(table['country_code'].values))
+    table = table.sort_values('pop_weighted_heat_index', ascending=False)
+
+    # Global row over every cell rather than the overlapping country boxes
+    values = mean_heat_index.transpose('latitude', 'longitude').values
+    valid = ~np.isnan(values)
+    world = {
+        'country_code': 'WLD',
+        'country_name': 'World',
+        'gridded_population': weights.sum(),
+        'national_population': -1,
+        'pop_weighted_heat_index': np.dot(values[valid], weights[valid]) / max(weights[valid].sum(), 1e-12),
+    }
+    for threshold in hours.threshold.values:
+        world[f'person_hours_above_{threshold:g}'] = float(np.nansum(hours.sel(threshold=threshold).values * weights))
+    return pd.concat([pd.DataFrame([world]), table], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Population-weighted heat index exposure by country")
+    parser.add_argument('--population', required=True,
+                        help="Gridded population raster (NetCDF or ESRI ASCII .asc)")
+    parser.add_argument('--years', type=int, nargs='+', default=[2000, 2025])
+    parser.add_argument('--thresholds', type=float, nargs='+', default=list(THRESHOLDS),
+                        help="Heat index thresholds (°F) for person-hours")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args()
+
+    required_files = [args.population] + [f'heat_index_{year}_{kind}.nc'
+                                          for year in args.years for kind in ('avg', 'full')]
+    missing_files = [f for f in required_files if not os.path.exists(f)]
+    if missing_files:
+        print("❌ Missing required files:")
+        for f in missing_files:
+            print(f"  - {f}")
+        print("\n💡 Please run process_year_data.py --year <year> for each year first")
+        exit(1)
+
+    for year in args.years:
+        print(f"\n🌡️ Exposure for {year}")
+        mean_heat_index = xr.open_dataarray(f'heat_index_{year}_avg.nc')
+        population = load_population_grid(args.population, mean_heat_index.latitude.values,
+                                           mean_heat_index.longitude.values, args.cache_dir)
+        print(f"👥 {population.values.sum() / 1e9:.2f} billion people on the grid")
+        hours = hours_above(f'heat_index_{year}_full.nc', args.thresholds)
+        table = exposure_table(mean_heat_index, hours, population)
+
+        world = table.iloc[0]
+        print(f"🌍 Population-weighted heat index: {world['pop_weighted_heat_index']:.1f}°F")
+        for threshold in args.thresholds:
+            print(f"  {world[f'person_hours_above_{threshold:g}'] / 1e9:,.1f} billion person-hours ≥ {threshold:g}°F")
+
+        print(f"\n🏆 Top 10 countries by population-weighted heat index:")
+        for i, (_, row) in enumerate(table.iloc[1:11].iterrows()):
+            print(f"{i+1:2d}. {row['country_name']:<20} {row['pop_weighted_heat_index']:.1f}°F")
+
+        output = f'heat_index_exposure_{year}.csv'
+        table.to_csv(output, index=False)
+        print(f"✅ Exposure saved to '{output}'")
+
+
+if __name__ == "__main__":
+    main()
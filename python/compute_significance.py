@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Block-bootstrap significance of the 2025 vs 2000 heat index difference.
+Resamples the daily mean heat index (heat_index_<year>_daily.nc) in blocks
+of consecutive days, using the same resampled days for every cell so the
+whole grid is handled by one matrix product per latitude band. Resamples
+are split across a process pool.
+"""
+
+import argparse
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import xarray as xr
+
+# Per-worker state, set up by _init_worker
+_worker_files = {}
+_worker_band = {}
+
+
+def _init_worker(daily_files, block_days):
+    _worker_files['paths'] = daily_files
+    _worker_files['block_days'] = block_days
+
+
+def block_sums(values, block_days):
+    """
+    Sums and valid-day counts of every run of block_days consecutive days.
+    values is (day, cell); NaN days are left out. Returns two
+    (n_days - block_days + 1, cell) float32 arrays.
+    """
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    zeros = np.zeros((1, values.shape[1]))
+    value_cumsum = np.concatenate([zeros, np.cumsum(filled, axis=0)])
+    count_cumsum = np.concatenate([zeros, np.cumsum(valid, axis=0)])
+    sums = value_cumsum[block_days:] - value_cumsum[:-block_days]
+    counts = count_cumsum[block_days:] - count_cumsum[:-block_days]
+    return sums.astype(np.float32), counts.astype(np.float32)
+
+
+def _load_band(band):
+    """
+    Block sums for both years in one latitude band, cached per worker.
+    """
+    if _worker_band.get('band') != band:
+        _worker_band['band'] = band
+        _worker_band['sums'] = {}
+        for key, path in _worker_files['paths'].items():
+            with xr.open_dataset(path) as ds:
+                values = ds['hi_mean'].isel(latitude=slice(*band)).values
+            values = values.reshape(values.shape[0], -1).astype(float)
+            _worker_band['sums'][key] = block_sums(values, _worker_files['block_days'])
+    return _worker_band['sums']
+
+
+def _resample_band(task):
+    """
+    Bootstrap differences (resample, cell) for one band and one batch of resamples.
+    task holds the band bounds and the block-start count matrices for each year.
+    """
+    band, weights = task
+    data = _load_band(band)
+    means = {}
+    for key, (sums, counts) in data.items():
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means[key] = (weights[key] @ sums) / (weights[key] @ counts)
+    return means['late'] - means['early']
+
+
+def block_start_counts(rng, n_resamples, n_days, block_days):
+    """
+    Matrix (resample, block start) of how often each moving block is drawn.
+    Each resample draws enough blocks to cover n_days.
+    """
+    n_starts = n_days - block_days + 1
+    n_blocks = -(-n_days // block_days)
+    starts = rng.integers(0, n_starts, size=(n_resamples, n_blocks))
+    weights = np.zeros((n_resamples, n_starts), dtype=np.float32)
+    np.add.at(weights, (np.repeat(np.arange(n_resamples), n_blocks), starts.ravel()), 1)
+    return weights
+
+
+def bootstrap_difference(early_file, late_file, n_resamples=1000, block_days=7,
+                         workers=None, band_rows=16, seed=0,
+                         warming_threshold=2.0, cooling_threshold=-2.0, confidence=0.95):
+    """
+    Bootstrap the difference of daily-mean heat index between two years.
+    Returns a Dataset of observed difference, p-value and confidence bounds,
+    plus bootstrap samples of the warming/cooling grid point counts.
+    """
+    with xr.open_dataset(early_file) as ds:
+        early_days = ds.sizes['time']
+        lat_coords = ds.latitude.values
+        lon_coords = ds.longitude.values
+        early_mean = ds['hi_mean'].mean(dim='time').values
+    with xr.open_dataset(late_file) as ds:
+        late_days = ds.sizes['time']
+        late_mean = ds['hi_mean'].mean(dim='time').values
+    observed = late_mean - early_mean
+
+    # Every resample needs at least one full block from each year
+    if block_days > min(early_days, late_days):
+        print(f"⚠️ --block-days {block_days} is longer than the shorter year ({min(early_days, late_days)} days); "
+              f"using {min(early_days, late_days)}")
+        block_days = min(early_days, late_days)
+
+    rng = np.random.default_rng(seed)
+    weights = {
+        'early': block_start_counts(rng, n_resamples, early_days, block_days),
+        'late': block_start_counts(rng, n_resamples, late_days, block_days),
+    }
+
+    n_lat, n_lon = len(lat_coords), len(lon_coords)
+    p_value = np.full((n_lat, n_lon), np.nan)
+    ci_lower = np.full((n_lat, n_lon), np.nan)
+    ci_upper = np.full((n_lat, n_lon), np.nan)
+    warming_counts = np.zeros(n_resamples, dtype=np.int64)
+    cooling_counts = np.zeros(n_resamples, dtype=np.int64)
+
+    workers = workers or os.cpu_count()
+    batch_edges = np.linspace(0, n_resamples, min(workers, n_resamples) + 1).astype(int)
+    alpha = 1 - confidence
+
+    files = {'early': early_file, 'late': late_file}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(files, block_days)) as pool:
+        for start in range(0, n_lat, band_rows):
+            band = (start, min(start + band_rows, n_lat))
+            tasks = [(band, {key: w[b0:b1] for key, w in weights.items()})
+                     for b0, b1 in zip(batch_edges[:-1], batch_edges[1:])]
+            samples = np.concatenate(list(pool.map(_resample_band, tasks)))
+
+            band_observed = observed[band[0]:band[1]].reshape(-1)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                # Two-sided p-value from the bootstrap distribution centred on the observed value
+                exceed = np.abs(samples - band_observed) >= np.abs(band_observed)
+                band_p = (exceed.sum(axis=0) + 1) / (n_resamples + 1)
+                band_p[np.isnan(band_observed)] = np.nan
+                lower, upper = np.nanquantile(samples, [alpha / 2, 1 - alpha / 2], axis=0)
+
+            shape = (band[1] - band[0], n_lon)
+            p_value[band[0]:band[1]] = band_p.reshape(shape)
+            ci_lower[band[0]:band[1]] = lower.reshape(shape)
+            ci_upper[band[0]:band[1]] = upper.reshape(shape)
+            warming_counts += (samples > warming_threshold).sum(axis=1)
+            cooling_counts += (samples < cooling_threshold).sum(axis=1)
+
+    coords = {'latitude': lat_coords, 'longitude': lon_coords}
+    dims = ('latitude', 'longitude')
+    level = f'{confidence * 100:g}%'
+    significance_ds = xr.Dataset({
+        'difference': xr.DataArray(observed, coords=coords, dims=dims, attrs={
+            'units': 'degrees_F', 'long_name': 'Daily-Mean Heat Index Change'}),
+        'p_value': xr.DataArray(p_value, coords=coords, dims=dims, attrs={
+            'units': '1', 'long_name': 'Bootstrap Two-sided p-value of Change'}),
+        'ci_lower': xr.DataArray(ci_lower, coords=coords, dims=dims, attrs={
+            'units': 'degrees_F', 'long_name': f'Lower {level} Bootstrap Bound of Change'}),
+        'ci_upper': xr.DataArray(ci_upper, coords=coords, dims=dims, attrs={
+            'units': 'degrees_F', 'long_name': f'Upper {level} Bootstrap Bound of Change'}),
+        'warming_count_samples': xr.DataArray(warming_counts, dims=('resample',), attrs={
+            'long_name': f'Grid points with >{warming_threshold}°F warming per resample'}),
+        'cooling_count_samples': xr.DataArray(cooling_counts, dims=('resample',), attrs={
+            'long_name': f'Grid points with >{-cooling_threshold}°F cooling per resample'}),
+    })
+    significance_ds.attrs = {
+        'title': 'Heat Index Change Significance (block bootstrap)',
+        'n_resamples': n_resamples,
+        'block_days': block_days,
+        'confidence': confidence,
+        'seed': seed,
+        'warming_threshold_degF': warming_threshold,
+        'cooling_threshold_degF': cooling_threshold,
+        'created_date': str(np.datetime64('now'))
+    }
+    return significance_ds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bootstrap significance of the 2025 vs 2000 heat index difference")
+    parser.add_argument('--early-year', type=int, default=2000)
+    parser.add_argument('--late-year', type=int, default=2025)
+    parser.add_argument('--resamples', type=int, default=1000, help="Number of bootstrap resamples")
+    parser.add_argument('--block-days', type=int, default=7, help="Length of resampled day blocks")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--band-rows', type=int, default=16, help="Latitude rows per work unit")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--alpha', type=float, default=0.05, help="Significance level")
+    args = parser.parse_args()
+    if args.block_days < 1:
+        parser.error("--block-days must be at least 1")
+
+    early_file = f'heat_index_{args.early_year}_daily.nc'
+    late_file = f'heat_index_{args.late_year}_daily.nc'
+    missing_files = [f for f in (early_file, late_file) if not os.path.exists(f)]
+    if missing_files:
+        print("❌ Missing required files:")
+        for f in missing_files:
+            print(f"  - {f}")
+        print("\n💡 Please run process_daily_data.py --year <year> for both years first")
+        exit(1)
+
+    print(f"🎲 Running {args.resamples} block-bootstrap resamples "
+          f"({args.block_days}-day blocks, {args.workers or os.cpu_count()} workers)...")
+    significance_ds = bootstrap_difference(early_file, late_file, args.resamples, args.block_days,
+                                           args.workers, args.band_rows, args.seed,
+                                           confidence=1 - args.alpha)
+
+    p_value = significance_ds['p_value']
+    difference = significance_ds['difference']
+    tested = p_value.notnull().sum().values
+    significant = (p_value < args.alpha).sum().values
+    significant_warming = ((p_value < args.alpha) & (difference > 2.0)).sum().values
+    significant_cooling = ((p_value < args.alpha) & (difference < -2.0)).sum().values
+
+    print(f"\n📊 Significance Statistics:")
+    print(f"Grid points tested: {tested:,}")
+    print(f"Significant change (p < {args.alpha}): {significant:,} ({significant / max(tested, 1) * 100:.1f}%)")
+    print(f"Significant >2°F warming: {significant_warming:,}")
+    print(f"Significant >2°F cooling: {significant_cooling:,}")
+
+    level = (1 - args.alpha) * 100
+    for name, label in (('warming_count_samples', 'warming'), ('cooling_count_samples', 'cooling')):
+        lower, upper = np.percentile(significance_ds[name].values, [args.alpha / 2 * 100, 100 - args.alpha / 2 * 100])
+        print(f"Grid points with >2°F {label}: {level:g}% interval {lower:,.0f} to {upper:,.0f}")
+
+    output_file = f'heat_index_significance_{args.late_year}_{args.early_year}.nc'
+    significance_ds.to_netcdf(output_file)
+    print(f"\n✅ Significance data saved to '{output_file}'")
+
+
+if __name__ == "__main__":
+    main()
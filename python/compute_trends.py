@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Fit per-cell linear heat index trends over a series of years.
+Uses closed-form least squares on latitude bands of the stacked annual
+means (heat_index_<year>_avg.nc), so no per-cell loop is needed and only
+one band of all years is in memory at a time.
+"""
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+import xarray as xr
+from scipy import stats
+from country_utils import aggregate_by_country, country_name
+
+
+def fit_linear_trend(years, values):
+    """
+    Least-squares fit of values (year, ...) against years for every cell at once.
+    NaN values are left out of each cell's fit.
+    Returns slope, intercept, standard error of the slope, p-value and n.
+    """
+    x = np.asarray(years, dtype=float).reshape((-1,) + (1,) * (values.ndim - 1))
+    valid = ~np.isnan(values)
+    y = np.where(valid, values, 0.0)
+    w = valid.astype(float)
+
+    n = w.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = (w * x).sum(axis=0) / n
+        y_mean = y.sum(axis=0) / n
+        dx = (x - x_mean) * w
+        sxx = (dx * dx).sum(axis=0)
+        sxy = (dx * (y - y_mean)).sum(axis=0)
+
+        slope = sxy / sxx
+        intercept = y_mean - slope * x_mean
+
+        residuals = (y - intercept - slope * x) * w
+        dof = n - 2
+        stderr = np.sqrt((residuals * residuals).sum(axis=0) / dof / sxx)
+        t_stat = slope / stderr
+        p_value = 2 * stats.t.sf(np.abs(t_stat), np.where(dof > 0, dof, np.nan))
+
+    # Cells with fewer than three years have no usable error estimate
+    stderr[dof < 1] = np.nan
+    p_value[dof < 1] = np.nan
+    slope[n < 2] = np.nan
+    intercept[n < 2] = np.nan
+    return slope, intercept, stderr, p_value, n
+
+
+def compute_trends(years, band_size=64):
+    """
+    Fit trends over the annual means of the given years, one latitude band at a time.
+    """
+    arrays = [xr.open_dataarray(f'heat_index_{year}_avg.nc') for year in years]
+    template = arrays[0]
+    n_lat = template.sizes['latitude']
+    shape = (n_lat, template.sizes['longitude'])
+
+    results = {name: np.full(shape, np.nan) for name in ('slope', 'intercept', 'stderr', 'p_value')}
+    results['n_years'] = np.zeros(shape)
+
+    for start in range(0, n_lat, band_size):
+        band = slice(start, min(start + band_size, n_lat))
+        values = np.stack([
+            da.isel(latitude=band).transpose('latitude', 'longitude').values.astype(float)
+            for da in arrays
+        ])
+        slope, intercept, stderr, p_value, n = fit_linear_trend(years, values)
+        results['slope'][band] = slope
+        results['intercept'][band] = intercept
+        results['stderr'][band] = stderr
+        results['p_value'][band] = p_value
+        results['n_years'][band] = n
+
+    coords = {'latitude': template.latitude.values, 'longitude': template.longitude.values}
+    dims = ('latitude', 'longitude')
+    attrs = {
+        'slope': {'units': 'degrees_F per year', 'long_name': 'Heat Index Linear Trend'},
+        'intercept': {'units': 'degrees_F', 'long_name': 'Heat Index Trend Intercept (year 0)'},
+        'stderr': {'units': 'degrees_F per year', 'long_name': 'Standard Error of Trend'},
+        'p_value': {'units': '1', 'long_name': 'Two-sided p-value of Trend'},
+        'n_years': {'units': '1', 'long_name': 'Number of Years in Fit'},
+    }
+    trend_ds = xr.Dataset({
+        name: xr.DataArray(values, coords=coords, dims=dims, attrs=attrs[name])
+        for name, values in results.items()
+    })
+    trend_ds.attrs = {
+        'title': f'Heat Index Trend {years[0]}-{years[-1]}',
+        'years': ', '.join(str(year) for year in years),
+        'created_date': str(np.datetime64('now'))
+    }
+
+    for da in arrays:
+        da.close()
+    return trend_ds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit per-cell heat index trends over several years")
+    parser.add_argument('--years', type=int, nargs='+', required=True,
+                        help="Years to include (needs heat_index_<year>_avg.nc for each)")
+    parser.add_argument('--significance', type=float, default=0.05,
+                        help="p-value below which a cell's trend counts as significant")
+    args = parser.parse_args()
+
+    years = sorted(set(args.years))
+    if len(years) < 3:
+        print("❌ At least three years are needed to estimate a trend and its error")
+        exit(1)
+
+    missing_files = [f'heat_index_{year}_avg.nc' for year in years
+                     if not os.path.exists(f'heat_index_{year}_avg.nc')]
+    if missing_files:
+        print("❌ Missing required files:")
+        for f in missing_files:
+            print(f"  - {f}")
+        print("\n💡 Please run process_year_data.py --year <year> for each year first")
+        exit(1)
+
+    print(f"📈 Fitting heat index trends over {len(years)} years ({years[0]}-{years[-1]})...")
+    trend_ds = compute_trends(years)
+
+    slope = trend_ds['slope']
+    significant = (trend_ds['p_value'] < args.significance).where(slope.notnull())
+
+    print(f"\n📊 Global Trend Statistics:")
+    print(f"Average trend: {slope.mean().values * 10:+.2f}°F per decade")
+    print(f"Cells with significant trend (p < {args.significance}): {significant.mean().values * 100:.1f}%")
+
+    # Country rollups through the same aggregation as the comparison stage
+    print("\n🌍 Creating country-level trend analysis...")
+    countries_slope = aggregate_by_country(slope)
+    countries_significant = aggregate_by_country(significant)
+
+    country_trends = {}
+    for country, stats_slope in countries_slope.items():
+        country_trends[country] = {
+            'country_code': country,
+            'country_name': country_name(country),
+            'trend_per_decade': stats_slope['mean'] * 10,
+            'trend_std_per_decade': stats_slope['std'] * 10,
+            'significant_fraction': countries_significant.get(country, {}).get('mean', np.nan),
+            'data_points': stats_slope['count']
+        }
+
+    trend_df = pd.DataFrame.from_dict(country_trends, orient='index')
+    trend_df = trend_df.sort_values('trend_per_decade', ascending=False)
+
+    print(f"\n🏆 Top 10 Countries with Fastest Warming Trend:")
+    for i, (_, row) in enumerate(trend_df.head(10).iterrows()):
+        print(f"{i+1:2d}. {row['country_name']:<20} {row['trend_per_decade']:+.2f}°F/decade")
+
+    print("\n💾 Saving trend datasets...")
+    trend_ds.to_netcdf('heat_index_trend.nc')
+    trend_df.to_csv('heat_index_trend_by_country.csv', index=False)
+
+    print("✅ Trend data saved to 'heat_index_trend.nc'")
+    print("✅ Country trends saved to 'heat_index_trend_by_country.csv'")
+    print("\n✅ Trend analysis complete!")
+
+
+if __name__ == "__main__":
+    main()
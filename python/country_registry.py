@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Precompiled country metadata registry.
+ISO3 codes, ISO numeric ids, display names, populations (data.json) and
+the bounding-box regions of country_utils are compiled once into a small
+array-backed table saved as an .npz file. Loading it needs neither
+pycountry nor any JSON parsing, and happens lazily on first use; lookups
+are binary searches over the sorted ISO3 column.
+"""
+
+import argparse
+import json
+import os
+import numpy as np
+
+REGISTRY_FILE = '../data/country-registry.npz'
+POPULATION_FILE = '../data/data.json'
+MAPPING_FILE = '../data/country-id-mapping.json'
+COLUMNS = ('iso3', 'numeric_id', 'name', 'population', 'region', 'region_bounds')
+
+
+class CountryRegistry:
+    """
+    Country table sorted by ISO3 code. Every column is an array of the
+    same length, except region_bounds: one (south, north, west, east) row
+    per bounding-box region, indexed by the region column (-1 for none).
+    """
+
+    def __init__(self, iso3, numeric_id, name, population, region, region_bounds):
+        self.iso3 = iso3
+        self.numeric_id = numeric_id
+        self.name = name
+        self.population = population
+        self.region = region
+        self.region_bounds = region_bounds
+
+    def __len__(self):
+        return len(self.iso3)
+
+    def positions(self, codes):
+        """
+        Row of every ISO3 code (-1 for unknown codes).
+        """
+        codes = np.asarray(codes, dtype=self.iso3.dtype)
+        rows = np.clip(np.searchsorted(self.iso3, codes), 0, len(self.iso3) - 1)
+        return np.where(self.iso3[rows] == codes, rows, -1)
+
+    def names(self, codes):
+        """
+        Display names of ISO3 codes, falling back to the code itself.
+        """
+        codes = np.asarray(codes, dtype=self.iso3.dtype)
+        rows = self.positions(codes)
+        return np.where(rows >= 0, self.name[rows], codes)
+
+    def populations(self, codes):
+        """
+        Populations of ISO3 codes (-1 where unknown).
+        """
+        rows = self.positions(codes)
+        return np.where(rows >= 0, self.population[rows], -1)
+
+    def bounds(self, code):
+        """
+        (south, north, west, east) box of a country, or None.
+        """
+        row = self.positions([code])[0]
+        if row < 0 or self.region[row] < 0:
+            return None
+        return tuple(self.region_bounds[self.region[row]])
+
+    def save(self, path=REGISTRY_FILE):
+        np.savez_compressed(path, **{column: getattr(self, column) for column in COLUMNS})
+
+    @classmethod
+    def load(cls, path=REGISTRY_FILE):
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls(**{column: arrays[column] for column in COLUMNS})
+
+
+def compile_registry(population_file=POPULATION_FILE, mapping_file=MAPPING_FILE):
+    """
+    Build the registry from pycountry, data.json, the web app's id mapping
+    and COUNTRY_BOUNDARIES. Only needed when one of those changes.
+    """
+    import pycountry
+    from country_utils import COUNTRY_BOUNDARIES
+
+    with open(population_file) as f:
+        population_by_id = {int(row['id']): row['population'] for row in json.load(f)}
+    with open(mapping_file) as f:
+        mapped_codes = set(json.load(f).values())
+
+    countries = {country.alpha_3: country for country in pycountry.countries}
+    codes = sorted(set(countries) | set(COUNTRY_BOUNDARIES) | mapped_codes)
+    region_codes = list(COUNTRY_BOUNDARIES)
+
+    numeric_id = np.array([int(countries[code].numeric) if code in countries else -1 for code in codes],
+                          dtype=np.int16)
+    return CountryRegistry(
+        iso3=np.array(codes, dtype='<U3'),
+        numeric_id=numeric_id,
+        name=np.array([countries[code].name if code in countries else code for code in codes]),
+        population=np.array([population_by_id.get(int(i), -1) if i >= 0 else -1 for i in numeric_id],
+                            dtype=np.int64),
+        region=np.array([region_codes.index(code) if code in COUNTRY_BOUNDARIES else -1 for code in codes],
+                        dtype=np.int16),
+        region_bounds=np.array([COUNTRY_BOUNDARIES[code]['lat'] + COUNTRY_BOUNDARIES[code]['lon']
+                                for code in region_codes], dtype=np.float32),
+    )
+
+
+_registry = None
+
+
+def get_registry(path=REGISTRY_FILE):
+    """
+    The shared registry, loaded from its prebuilt file on first use.
+    Falls back to compiling it (which needs pycountry) if the file is missing.
+    """
+    global _registry
+    if _registry is None:
+        if os.path.exists(path):
+            _registry = CountryRegistry.load(path)
+        else:
+            print(f"⚠️  {path} not found; compiling the country registry")
+            _registry = compile_registry()
+    return _registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the country metadata registry")
+    parser.add_argument('--output', default=REGISTRY_FILE)
+    parser.add_argument('--populations', default=POPULATION_FILE, help="data.json with populations by numeric id")
+    parser.add_argument('--mapping', default=MAPPING_FILE, help="TopoJSON id to ISO3 mapping")
+    args = parser.parse_args()
+
+    for path in (args.populations, args.mapping):
+        if not os.path.exists(path):
+            print(f"❌ {path} not found")
+            exit(1)
+
+    registry = compile_registry(args.populations, args.mapping)
+    registry.save(args.output)
+    with_population = np.sum(registry.population >= 0)
+    with_region = np.sum(registry.region >= 0)
+    print(f"✅ {len(registry)} countries ({with_population} with population, {with_region} with a region) "
+          f"saved to '{args.output}' ({os.path.getsize(args.output) / 1024:.0f} kB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Country lookup helpers shared by the comparison and trend stages.
+Countries are approximated by lat/lon bounding boxes; a grid point
+belongs to every box it falls in.
+"""
+
+import numpy as np
+import pandas as pd
+from country_registry import get_registry
+
+# Simple country boundaries (rough approximations)
+COUNTRY_BOUNDARIES = {
+    'USA': {'lat': (25, 49), 'lon': (-125, -66)},
+    'CAN': {'lat': (42, 60), 'lon': (-141, -52)},  # Focus on southern Canada
+    'MEX': {'lat': (14, 33), 'lon': (-118, -86)},
+    'BRA': {'lat': (-34, 5), 'lon': (-74, -34)},
+    'ARG': {'lat': (-55, -21), 'lon': (-74, -53)},
+    'CHN': {'lat': (18, 54), 'lon': (73, 135)},
+    'IND': {'lat': (6, 37), 'lon': (68, 97)},
+    'RUS': {'lat': (41, 82), 'lon': (19, 169)},
+    'AUS': {'lat': (-44, -10), 'lon': (113, 154)},
+    'ZAF': {'lat': (-35, -22), 'lon': (16, 33)},
+    'EGY': {'lat': (22, 32), 'lon': (25, 35)},
+    'DEU': {'lat': (47, 55), 'lon': (5, 15)},
+    'FRA': {'lat': (42, 51), 'lon': (-5, 8)},
+    'GBR': {'lat': (50, 61), 'lon': (-8, 2)},
+    'ESP': {'lat': (36, 44), 'lon': (-9, 3)},
+    'ITA': {'lat': (36, 47), 'lon': (6, 19)},
+    'JPN': {'lat': (24, 46), 'lon': (123, 146)},
+    'IDN': {'lat': (-11, 6), 'lon': (95, 141)},
+    'THA': {'lat': (5, 21), 'lon': (97, 106)},
+    'VNM': {'lat': (8, 24), 'lon': (102, 110)},
+    'TUR': {'lat': (36, 42), 'lon': (26, 45)},
+    'IRN': {'lat': (25, 40), 'lon': (44, 63)},
+    'SAU': {'lat': (16, 33), 'lon': (34, 56)},
+    'NGA': {'lat': (4, 14), 'lon': (2, 15)},
+    'KEN': {'lat': (-5, 5), 'lon': (34, 42)},
+    'ETH': {'lat': (3, 15), 'lon': (33, 48)},
+    'MAR': {'lat': (21, 36), 'lon': (-17, -1)},
+    'DZA': {'lat': (19, 37), 'lon': (-9, 12)},
+    'LBY': {'lat': (20, 33), 'lon': (9, 25)},
+    'PER': {'lat': (-18, 0), 'lon': (-82, -68)},
+    'COL': {'lat': (-4, 13), 'lon': (-79, -66)},
+    'VEN': {'lat': (0, 13), 'lon': (-73, -59)},
+    'CHL': {'lat': (-56, -17), 'lon': (-76, -66)},
+    'NOR': {'lat': (58, 71), 'lon': (4, 31)},
+    'SWE': {'lat': (55, 69), 'lon': (11, 24)},
+    'FIN': {'lat': (60, 70), 'lon': (20, 32)},
+    'POL': {'lat': (49, 55), 'lon': (14, 24)},
+    'UKR': {'lat': (44, 53), 'lon': (22, 40)},
+    'KAZ': {'lat': (40, 55), 'lon': (46, 87)},
+    'MNG': {'lat': (41, 52), 'lon': (87, 120)},
+    'AFG': {'lat': (29, 39), 'lon': (60, 75)},
+    'PAK': {'lat': (24, 37), 'lon': (61, 77)},
+    'BGD': {'lat': (20, 27), 'lon': (88, 93)},
+    'MMR': {'lat': (9, 29), 'lon': (92, 102)},
+    'KOR': {'lat': (33, 39), 'lon': (124, 132)},
+    'PRK': {'lat': (37, 43), 'lon': (124, 131)},
+    'MYS': {'lat': (0, 7), 'lon': (99, 119)},
+    'PHL': {'lat': (4, 22), 'lon': (116, 127)},
+    'SGP': {'lat': (1, 2), 'lon': (103, 104)},
+    'NZL': {'lat': (-47, -34), 'lon': (166, 179)},
+    'PNG': {'lat': (-11, -1), 'lon': (140, 156)},
+    'FJI': {'lat': (-21, -12), 'lon': (177, 180)},
+    'NCL': {'lat': (-23, -19), 'lon': (163, 168)},
+    'MDG': {'lat': (-26, -11), 'lon': (43, 51)},
+    'MWI': {'lat': (-17, -9), 'lon': (32, 36)},
+    'ZMB': {'lat': (-18, -8), 'lon': (21, 34)},
+    'ZWE': {'lat': (-23, -15), 'lon': (25, 33)},
+    'BWA': {'lat': (-27, -17), 'lon': (20, 29)},
+    'NAM': {'lat': (-29, -16), 'lon': (11, 25)},
+    'AGO': {'lat': (-18, -4), 'lon': (11, 24)},
+    'MOZ': {'lat': (-27, -10), 'lon': (30, 41)},
+    'TZA': {'lat': (-12, -1), 'lon': (29, 41)},
+    'UGA': {'lat': (-2, 4), 'lon': (29, 35)},
+    'RWA': {'lat': (-3, -1), 'lon': (28, 31)},
+    'BDI': {'lat': (-5, -2), 'lon': (28, 31)},
+    'COD': {'lat': (-14, 6), 'lon': (12, 32)},
+    'CAF': {'lat': (2, 11), 'lon': (14, 28)},
+    'TCD': {'lat': (7, 23), 'lon': (13, 24)},
+    'SDN': {'lat': (8, 22), 'lon': (21, 39)},
+    'SSD': {'lat': (3, 13), 'lon': (24, 36)},
+    'ERI': {'lat': (12, 18), 'lon': (36, 44)},
+    'DJI': {'lat': (10, 13), 'lon': (41, 44)},
+    'SOM': {'lat': (-2, 12), 'lon': (41, 52)},
+    'GHA': {'lat': (4, 12), 'lon': (-4, 2)},
+    'CIV': {'lat': (4, 11), 'lon': (-9, -2)},
+    'BFA': {'lat': (9, 15), 'lon': (-6, 3)},
+    'MLI': {'lat': (10, 25), 'lon': (-13, 5)},
+    'NER': {'lat': (11, 24), 'lon': (-1, 16)},
+    'TUN': {'lat': (30, 38), 'lon': (7, 12)},
+    'LBN': {'lat': (33, 35), 'lon': (35, 37)},
+    'SYR': {'lat': (32, 38), 'lon': (35, 43)},
+    'JOR': {'lat': (29, 34), 'lon': (34, 40)},
+    'ISR': {'lat': (29, 34), 'lon': (34, 36)},
+    'PSE': {'lat': (31, 33), 'lon': (34, 36)},
+    'IRQ': {'lat': (29, 38), 'lon': (38, 49)},
+    'KWT': {'lat': (28, 31), 'lon': (46, 49)},
+    'QAT': {'lat': (24, 27), 'lon': (50, 52)},
+    'BHR': {'lat': (25, 27), 'lon': (50, 51)},
+    'ARE': {'lat': (22, 27), 'lon': (51, 57)},
+    'OMN': {'lat': (16, 27), 'lon': (51, 60)},
+    'YEM': {'lat': (12, 19), 'lon': (42, 54)},
+    'GEO': {'lat': (41, 44), 'lon': (39, 47)},
+    'ARM': {'lat': (38, 42), 'lon': (43, 47)},
+    'AZE': {'lat': (38, 42), 'lon': (44, 51)},
+    'UZB': {'lat': (37, 46), 'lon': (55, 74)},
+    'TKM': {'lat': (35, 43), 'lon': (52, 67)},
+    'TJK': {'lat': (36, 41), 'lon': (67, 75)},
+    'KGZ': {'lat': (39, 44), 'lon': (69, 81)},
+    'NPL': {'lat': (26, 31), 'lon': (80, 89)},
+    'BTN': {'lat': (26, 29), 'lon': (88, 93)},
+    'LKA': {'lat': (5, 10), 'lon': (79, 82)},
+    'MDV': {'lat': (-1, 8), 'lon': (72, 74)},
+    # Additional European countries
+    'NLD': {'lat': (50, 54), 'lon': (3, 8)},
+    'BEL': {'lat': (49, 52), 'lon': (2, 7)},
+    'AUT': {'lat': (46, 49), 'lon': (9, 17)},
+    'CHE': {'lat': (45, 48), 'lon': (5, 11)},
+    'CZE': {'lat': (48, 51), 'lon': (12, 19)},
+    'SVK': {'lat': (47, 50), 'lon': (16, 23)},
+    'HUN': {'lat': (45, 49), 'lon': (16, 23)},
+    'ROU': {'lat': (43, 49), 'lon': (20, 30)},
+    'BGR': {'lat': (41, 44), 'lon': (22, 29)},
+    'GRC': {'lat': (34, 42), 'lon': (19, 30)},
+    'PRT': {'lat': (36, 43), 'lon': (-10, -6)},
+    'IRL': {'lat': (51, 56), 'lon': (-11, -5)},
+    'DNK': {'lat': (54, 58), 'lon': (8, 15)},
+    'LTU': {'lat': (53, 57), 'lon': (20, 27)},
+    'LVA': {'lat': (55, 58), 'lon': (20, 28)},
+    'EST': {'lat': (57, 60), 'lon': (21, 29)},
+    'SVN': {'lat': (45, 47), 'lon': (13, 17)},
+    'HRV': {'lat': (42, 47), 'lon': (13, 20)},
+    'BIH': {'lat': (42, 46), 'lon': (15, 20)},
+    'SRB': {'lat': (42, 47), 'lon': (18, 23)},
+    'MNE': {'lat': (41, 44), 'lon': (18, 21)},
+    'MKD': {'lat': (40, 43), 'lon': (20, 23)},
+    'ALB': {'lat': (39, 43), 'lon': (19, 22)},
+    'LUX': {'lat': (49, 51), 'lon': (5, 7)},
+    'MLT': {'lat': (35, 36), 'lon': (14, 15)},
+    # Additional South American countries
+    'ECU': {'lat': (-5, 2), 'lon': (-81, -75)},
+    'BOL': {'lat': (-23, -9), 'lon': (-70, -57)},
+    'URY': {'lat': (-35, -30), 'lon': (-58, -53)},
+    'GUY': {'lat': (1, 9), 'lon': (-61, -56)},
+    'SUR': {'lat': (1, 6), 'lon': (-58, -53)},
+    'GUF': {'lat': (2, 6), 'lon': (-55, -51)},  # French Guiana
+    # Southeast Asian countries
+    'KHM': {'lat': (10, 15), 'lon': (102, 108)},  # Cambodia
+    'LAO': {'lat': (13, 23), 'lon': (100, 108)},  # Laos
+    'BRN': {'lat': (4, 5), 'lon': (114, 115)},   # Brunei
+}
+
+
+def to_180(lon_coords):
+    """
+    Convert longitudes from the ERA5 0-360 system to -180-180.
+    """
+    lon_coords = np.asarray(lon_coords)
+    return np.where(lon_coords > 180, lon_coords - 360, lon_coords)
+
+
+def country_grid_indices(lat_coords, lon_coords):
+    """
+    Return {country_code: (lat_indices, lon_indices)} for every country box
+    that contains at least one grid point.
+    """
+    lat_coords = np.asarray(lat_coords)
+    lon_converted = to_180(lon_coords)
+
+    indices = {}
+    for country_code, bounds in COUNTRY_BOUNDARIES.items():
+        lat_idx = np.where((bounds['lat'][0] <= lat_coords) & (lat_coords <= bounds['lat'][1]))[0]
+        lon_idx = np.where((bounds['lon'][0] <= lon_converted) & (lon_converted <= bounds['lon'][1]))[0]
+        if len(lat_idx) and len(lon_idx):
+            indices[country_code] = (lat_idx, lon_idx)
+    return indices
+
+
+def aggregate_by_country(data_array, countries=None):
+    """
+    Aggregate gridded (latitude, longitude) data by country.
+    Returns {country_code: {'mean', 'min', 'max', 'std', 'count'}} over the
+    non-NaN grid points inside each country box, optionally only for the
+    listed country codes.
+    """
+    print("🔄 Aggregating data by country...")
+
+    values = data_array.transpose('latitude', 'longitude').values
+    indices = country_grid_indices(data_array.latitude.values, data_array.longitude.values)
+
+    country_averages = {}
+    for country_code, (lat_idx, lon_idx) in indices.items():
+        if countries is not None and country_code not in countries:
+            continue
+        country_values = values[np.ix_(lat_idx, lon_idx)].ravel()
+        country_values = country_values[~np.isnan(country_values)]
+
+        if len(country_values):  # Only if we have data
+            country_averages[country_code] = {
+                'mean': np.mean(country_values),
+                'min': np.min(country_values),
+                'max': np.max(country_values),
+                'std': np.std(country_values),
+                'count': len(country_values)
+            }
+
+    print(f"✅ Aggregated data for {len(country_averages)} countries")
+    return country_averages
+
+
+def weighted_sum_by_country(data_array, weights, countries=None):
+    """
+    Weighted aggregation of gridded (latitude, longitude) data by country,
+    over the same country boxes as aggregate_by_country.
+    Returns {country_code: {'weighted_sum', 'weight', 'mean'}}, where weight
+    sums the weights of the non-NaN grid points and mean is the weighted mean.
+    """
+    values = data_array.transpose('latitude', 'longitude').values
+    weights = np.asarray(weights, dtype=float)
+    indices = country_grid_indices(data_array.latitude.values, data_array.longitude.values)
+
+    sums = {}
+    for country_code, (lat_idx, lon_idx) in indices.items():
+        if countries is not None and country_code not in countries:
+            continue
+        country_values = values[np.ix_(lat_idx, lon_idx)].ravel()
+        country_weights = weights[np.ix_(lat_idx, lon_idx)].ravel()
+        valid = ~np.isnan(country_values)
+        weight = country_weights[valid].sum()
+        weighted_sum = np.dot(country_values[valid], country_weights[valid])
+        sums[country_code] = {
+            'weighted_sum': weighted_sum,
+            'weight': weight,
+            'mean': weighted_sum / weight if weight > 0 else np.nan
+        }
+    return sums
+
+
+def country_name(country_code):
+    """
+    Look up a country's display name, falling back to its code.
+    """
+    return str(get_registry().names([country_code])[0])
+
+
+def countries_bbox(country_codes):
+    """
+    Bounding box (west, south, east, north) covering the boxes of the given countries.
+    """
+    unknown = [code for code in country_codes if code not in COUNTRY_BOUNDARIES]
+    if unknown:
+        raise ValueError(f"Unknown country codes: {', '.join(unknown)}")
+    bounds = [COUNTRY_BOUNDARIES[code] for code in country_codes]
+    return (min(b['lon'][0] for b in bounds), min(b['lat'][0] for b in bounds),
+            max(b['lon'][1] for b in bounds), max(b['lat'][1] for b in bounds))
+
+
+def country_comparison_table(hi_2000_avg, hi_2025_avg, hi_difference, countries=None, value_name='heat_index'):
+    """
+    Per-country 2000 vs 2025 comparison, sorted by difference (largest warming first).
+    The yearly means go in the <value_name>_2000 and <value_name>_2025 columns.
+    """
+    countries_2000 = aggregate_by_country(hi_2000_avg, countries)
+    countries_2025 = aggregate_by_country(hi_2025_avg, countries)
+    countries_diff = aggregate_by_country(hi_difference, countries)
+
+    # Create country comparison dataset
+    country_comparison = {}
+    for country in countries_2000.keys():
+        if country in countries_2025 and country in countries_diff:
+            country_comparison[country] = {
+                'country_code': country,
+                f'{value_name}_2000': countries_2000[country]['mean'],
+                f'{value_name}_2025': countries_2025[country]['mean'],
+                'difference': countries_2025[country]['mean'] - countries_2000[country]['mean'],  # Calculate directly
+                'percent_change': ((countries_2025[country]['mean'] - countries_2000[country]['mean']) / countries_2000[country]['mean']) * 100,
+                'data_points': countries_2000[country]['count']
+            }
+
+    # Convert to DataFrame for easier analysis
+    country_df = pd.DataFrame.from_dict(country_comparison, orient='index')
+    country_df.insert(1, 'country_name', get_registry().names(country_df['country_code'].values).astype(object))
+    return country_df.sort_values('difference', ascending=False)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Heatwave events from the daily maximum heat index (heat_index_<year>_daily.nc).
+A day is hot in a cell when its daily maximum exceeds the cell's percentile
+baseline (and an absolute floor). Hot days that touch in time, latitude or
+longitude form one event: face-connected components of the 3-D
+(time, latitude, longitude) exceedance mask are labelled with a vectorized
+union-find, a block of days at a time, and components that continue across
+a block boundary are merged afterwards. The result is one row per event.
+"""
+
+import argparse
+import os
+import warnings
+import numpy as np
+import pandas as pd
+import xarray as xr
+from reverse_geocode import CountryLocator
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def percentile_baseline(daily_files, percentile=90.0, band_rows=32):
+    """
+    (latitude, longitude) percentile of the daily maximum heat index over
+    all days of the baseline files, one latitude band at a time.
+    Days below the heat index range (NaN) count as cool days.
+    """
+    with xr.open_dataset(daily_files[0]) as ds:
+        n_lat = ds.sizes['latitude']
+    bands = []
+    for start in range(0, n_lat, band_rows):
+        values = []
+        for path in daily_files:
+            with xr.open_dataset(path) as ds:
+                values.append(ds['hi_max'].isel(latitude=slice(start, start + band_rows)).values)
+        values = np.concatenate(values)
+        # 'nearest' never interpolates towards the -inf fill
+        bands.append(np.percentile(np.where(np.isnan(values), -np.inf, values), percentile,
+                                   axis=0, method='nearest'))
+    return np.concatenate(bands)
+
+
+def _connect(parent, a, b):
+    """
+    Merge the sets of every node pair (a[i], b[i]) in a parent array where
+    every node points at the smallest node of its set.
+    """
+    while True:
+        root_a, root_b = parent[a], parent[b]
+        differ = root_a != root_b
+        if not differ.any():
+            return parent
+        a, b, root_a, root_b = a[differ], b[differ], root_a[differ], root_b[differ]
+        np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+        # Pointer jumping until every node points at its root again
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+
+def label_components(mask, wrap_longitude=False):
+    """
+    Label the face-connected components of a 3-D boolean array.
+    With wrap_longitude the first and last columns of the last axis are
+    neighbours. Returns (labels, n): 0 outside the mask, 1..n inside,
+    numbered in order of each component's first element.
+    """
+    nodes = np.flatnonzero(mask)
+    index = np.full(mask.shape, -1, dtype=np.int64)
+    index.flat[nodes] = np.arange(len(nodes))
+
+    pairs = []
+    for axis in range(mask.ndim):
+        n = mask.shape[axis]
+        pairs.append((index.take(range(n - 1), axis=axis), index.take(range(1, n), axis=axis)))
+    if wrap_longitude and mask.shape[-1] > 2:
+        pairs.append((index[..., -1], index[..., 0]))
+    a = np.concatenate([first[(first >= 0) & (second >= 0)] for first, second in pairs])
+    b = np.concatenate([second[(first >= 0) & (second >= 0)] for first, second in pairs])
+
+    parent = _connect(np.arange(len(nodes)), a, b)
+    roots, component = np.unique(parent, return_inverse=True)
+    labels = np.zeros(mask.shape, dtype=np.int64)
+    labels.flat[nodes] = component + 1
+    return labels, len(roots)
+
+
+def cell_areas(lat_coords, lon_coords):
+    """
+    (latitude, longitude) area of every grid cell in km².
+    """
+    d_lat = np.radians(abs(lat_coords[1] - lat_coords[0])) if len(lat_coords) > 1 else 0.0
+    d_lon = np.radians(abs(lon_coords[1] - lon_coords[0])) if len(lon_coords) > 1 else 0.0
+    rows = EARTH_RADIUS_KM ** 2 * d_lat * d_lon * np.cos(np.radians(lat_coords))
+    return np.outer(np.clip(rows, 0, None), np.ones(len(lon_coords)))
+
+
+def detect_events(daily_file, baseline, min_heat_index=90.0, block_days=30, land_cells=None):
+    """
+    Label heatwave components in one daily file, block_days days at a time.
+    Returns (components, footprint): one row per stitched component with
+    its first and last day, cell-days and peak, and the unique
+    (event, cell) pairs it covers.
+    """
+    with xr.open_dataset(daily_file) as ds:
+        hi_max = ds['hi_max']
+        n_days, n_lat, n_lon = hi_max.shape
+        lon_coords = hi_max.longitude.values
+        wrap = len(lon_coords) > 1 and np.isclose(abs(lon_coords[1] - lon_coords[0]) * n_lon, 360)
+
+        stats = []
+        footprints = []
+        links = []
+        previous_last_day = None
+        next_id = 0
+        for start in range(0, n_days, block_days):
+            values = hi_max.isel(time=slice(start, start + block_days)).values
+            with np.errstate(invalid='ignore'):
+                hot = (values > baseline) & (values >= min_heat_index)
+            if land_cells is not None:
+                hot &= land_cells
+            labels, n = label_components(hot, wrap)
+
+            # Global ids for this block's components
+            ids = np.where(labels > 0, labels - 1 + next_id, -1)
+            if previous_last_day is not None:
+                touching = (previous_last_day >= 0) & (ids[0] >= 0)
+                links.append(np.stack([previous_last_day[touching], ids[0][touching]]))
+            previous_last_day = ids[-1]
+
+            if n:
+                voxels = np.flatnonzero(labels)
+                component = ids.flat[voxels]
+                day, cell = np.divmod(voxels, n_lat * n_lon)
+                peak_values = values.flat[voxels]
+                # Last voxel of each component after sorting by value is its peak
+                order = np.lexsort((peak_values, component))
+                last = np.r_[np.flatnonzero(np.diff(component[order])), len(order) - 1]
+                peaks = order[last]
+                stats.append(pd.DataFrame({
+                    'component': component[peaks],
+                    'first_day': np.minimum.reduceat(day[order], np.r_[0, last[:-1] + 1]) + start,
+                    'last_day': np.maximum.reduceat(day[order], np.r_[0, last[:-1] + 1]) + start,
+                    'cell_days': np.bincount(component - next_id, minlength=n),
+                    'peak_heat_index': peak_values[peaks],
+                    'peak_day': day[peaks] + start,
+                    'peak_cell': cell[peaks],
+                }))
+                footprints.append(np.unique(np.stack([component, cell]), axis=1))
+            next_id += n
+
+    # Stitch components that continue across block boundaries
+    parent = np.arange(next_id)
+    if links:
+        links = np.concatenate(links, axis=1)
+        parent = _connect(parent, links[0], links[1])
+
+    if not stats:
+        return pd.DataFrame(), np.empty((2, 0), dtype=np.int64)
+    components = pd.concat(stats, ignore_index=True)
+    components['event'] = parent[components['component'].values]
+    footprint = np.concatenate(footprints, axis=1)
+    footprint = np.unique(np.stack([parent[footprint[0]], footprint[1]]), axis=1)
+    return components, footprint
+
+
+def event_catalogue(components, footprint, times, lat_coords, lon_coords, country_grid, min_days=3):
+    """
+    One row per event lasting at least min_days: dates, duration, footprint
+    area, cell-days, peak and the affected countries (largest area first).
+    """
+    columns = ['event_id', 'start', 'end', 'duration_days', 'area_km2', 'cell_days',
+               'peak_heat_index', 'peak_date', 'peak_latitude', 'peak_longitude', 'countries']
+    if components.empty:
+        return pd.DataFrame(columns=columns)
+
+    peaks = components.loc[components.groupby('event')['peak_heat_index'].idxmax()].set_index('event')
+    events = components.groupby('event').agg(first_day=('first_day', 'min'), last_day=('last_day', 'max'),
+                                             cell_days=('cell_days', 'sum'))
+    events['duration_days'] = events['last_day'] - events['first_day'] + 1
+    events = events[events['duration_days'] >= min_days]
+
+    areas = cell_areas(lat_coords, lon_coords).ravel()
+    cells = pd.DataFrame({'event': footprint[0], 'area_km2': areas[footprint[1]],
+                          'country': country_grid.ravel()[footprint[1]]})
+    cells = cells[cells['event'].isin(events.index)]
+    events['area_km2'] = cells.groupby('event')['area_km2'].sum()
+    by_country = (cells.dropna(subset=['country']).groupby(['event', 'country'])['area_km2'].sum()
+                  .reset_index().sort_values(['event', 'area_km2'], ascending=[True, False]))
+    events['countries'] = by_country.groupby('event')['country'].agg(';'.join)
+
+    peaks = peaks.loc[events.index]
+    n_lon = len(lon_coords)
+    catalogue = pd.DataFrame({
+        'start': times[events['first_day'].values],
+        'end': times[events['last_day'].values],
+        'duration_days': events['duration_days'].values,
+        'area_km2': events['area_km2'].values.round(0),
+        'cell_days': events['cell_days'].values,
+        'peak_heat_index': peaks['peak_heat_index'].values.astype(float).round(1),
+        'peak_date': times[peaks['peak_day'].values],
+        'peak_latitude': lat_coords[peaks['peak_cell'].values // n_lon],
+        'peak_longitude': lon_coords[peaks['peak_cell'].values % n_lon],
+        'countries': events['countries'].fillna('').values,
+    })
+    catalogue = catalogue.sort_values(['start', 'peak_heat_index'], ascending=[True, False], ignore_index=True)
+    catalogue.insert(0, 'event_id', np.arange(1, len(catalogue) + 1))
+    return catalogue[columns]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect heatwave events in the daily maximum heat index")
+    parser.add_argument('--years', type=int, nargs='+', default=[2000, 2025])
+    parser.add_argument('--baseline-years', type=int, nargs='+', default=[2000],
+                        help="Years whose daily maxima define the per-cell percentile baseline")
+    parser.add_argument('--percentile', type=float, default=90.0,
+                        help="Per-cell percentile of daily maximum heat index a hot day must exceed")
+    parser.add_argument('--min-heat-index', type=float, default=90.0,
+                        help="Absolute floor (°F) a hot day must also reach")
+    parser.add_argument('--min-days', type=int, default=3, help="Shortest event kept in the catalogue")
+    parser.add_argument('--block-days', type=int, default=30, help="Days labelled at a time")
+    parser.add_argument('--land-only', action='store_true', help="Only count cells inside a country")
+    args = parser.parse_args()
+
+    daily_files = {year: f'heat_index_{year}_daily.nc' for year in sorted(set(args.years + args.baseline_years))}
+    missing_files = [f for f in daily_files.values() if not os.path.exists(f)]
+    if missing_files:
+        print("❌ Missing required files:")
+        for f in missing_files:
+            print(f"  - {f}")
+        print("\n💡 Please run process_daily_data.py --year <year> for each year first")
+        exit(1)
+
+    print(f"📏 {args.percentile:g}th percentile baseline from {', '.join(map(str, args.baseline_years))}...")
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        baseline = percentile_baseline([daily_files[year] for year in args.baseline_years], args.percentile)
+
+    with xr.open_dataset(daily_files[args.years[0]]) as ds:
+        lat_coords, lon_coords = ds.latitude.values, ds.longitude.values
+    print("🗺️ Assigning grid cells to countries...")
+    country_grid = CountryLocator().country_grid(lat_coords, lon_coords)
+    land_cells = country_grid != None if args.land_only else None  # noqa: E711
+
+    for year in args.years:
+        print(f"\n🔥 Detecting {year} heatwaves...")
+        components, footprint = detect_events(daily_files[year], baseline, args.min_heat_index,
+                                              args.block_days, land_cells)
+        with xr.open_dataset(daily_files[year]) as ds:
+            times = ds.time.values.astype('datetime64[D]')
+        catalogue = event_catalogue(components, footprint, times, lat_coords, lon_coords,
+                                    country_grid, args.min_days)
+
+        print(f"📊 {len(catalogue)} events of at least {args.min_days} days")
+        if len(catalogue):
+            longest = catalogue.loc[catalogue['duration_days'].idxmax()]
+            largest = catalogue.loc[catalogue['area_km2'].idxmax()]
+            print(f"  Longest: {longest['duration_days']} days from {longest['start']:%Y-%m-%d} "
+                  f"({longest['countries'] or 'no country'})")
+            print(f"  Largest: {largest['area_km2'] / 1e6:.2f} million km² from {largest['start']:%Y-%m-%d} "
+                  f"({largest['countries'] or 'no country'})")
+
+        output_file = f'heatwave_events_{year}.csv'
+        catalogue.to_csv(output_file, index=False)
+        print(f"✅ {year} event catalogue saved to '{output_file}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Tabular per-cell export of the comparison results for analytical queries.
+One row per grid cell with its coordinates, country, 2000 and 2025 heat
+index, difference, percent change and time-series aggregates, written as
+a Parquet (or Arrow IPC) dataset partitioned by country. Rows inside each
+partition are sorted by difference and split into row groups whose min/max
+statistics let DuckDB or pyarrow skip groups that cannot match a filter.
+"""
+
+import argparse
+import os
+import shutil
+import numpy as np
+import xarray as xr
+from export_country_columns import MAPPING_FILE, load_id_mapping
+from heat_utils import scatter_to_grid, time_step_seconds
+from world_geometry import rasterize_object
+
+COMPARISON_FILE = 'heat_index_comparison_complete.nc'
+OUTPUT_DIR = 'heat_index_cells'
+YEARS = (2000, 2025)
+DANGER_THRESHOLD = 103.0  # °F, NWS "danger" heat index category
+
+
+def time_aggregates(path, threshold=DANGER_THRESHOLD, block_size=168, lat_coords=None, lon_coords=None):
+    """
+    Per-cell max, standard deviation and hours at or above threshold of a
+    heat_index_<year>_full.nc series, read block_size time steps at a time.
+    Land-only (time, cell) series are scattered back to the grid. With
+    lat_coords/lon_coords the aggregates are cut to that grid, which must
+    be part of the series grid (e.g. a --bbox comparison).
+    """
+    with xr.open_dataarray(path) as series:
+        n_times = series.sizes['time']
+        step_hours = time_step_seconds(series.time.values) / 3600
+        count = mean = m2 = above = peak = None
+        for start in range(0, n_times, block_size):
+            block = series.isel(time=slice(start, start + block_size)).values
+            valid = ~np.isnan(block)
+            if count is None:
+                count = np.zeros(block.shape[1:])
+                mean = np.zeros(block.shape[1:])
+                m2 = np.zeros(block.shape[1:])
+                above = np.zeros(block.shape[1:])
+                peak = np.full(block.shape[1:], -np.inf)
+
+            # Merge the block's count, mean and squared deviations (Chan et al.),
+            # which stays accurate where E[x²] - mean² cancels at ~100°F
+            block_count = valid.sum(axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                block_mean = np.where(valid, block, 0.0).sum(axis=0) / block_count
+            block_mean = np.where(block_count > 0, block_mean, 0.0)
+            block_m2 = (np.where(valid, block - block_mean, 0.0) ** 2).sum(axis=0)
+            total = count + block_count
+            with np.errstate(invalid='ignore', divide='ignore'):
+                weight = np.where(total > 0, block_count / total, 0.0)
+            delta = block_mean - mean
+            mean += delta * weight
+            m2 += block_m2 + delta * delta * count * weight
+            count = total
+
+            with np.errstate(invalid='ignore'):
+                above += (block >= threshold).sum(axis=0)
+            peak = np.maximum(peak, np.where(valid, block, -np.inf).max(axis=0))
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.where(count > 0, np.sqrt(m2 / count), np.nan)
+        aggregates = {'max': np.where(count > 0, peak, np.nan), 'std': std, 'hours_above': above * step_hours}
+
+        template = series.isel(time=0, drop=True)
+        if 'cell' in series.dims:
+            aggregates = {name: scatter_to_grid(template.copy(data=values)) for name, values in aggregates.items()}
+        else:
+            aggregates = {name: template.copy(data=values) for name, values in aggregates.items()}
+
+    if lat_coords is not None:
+        grid = aggregates['max']
+        if not (np.isin(lat_coords, grid.latitude.values).all() and np.isin(lon_coords, grid.longitude.values).all()):
+            raise ValueError(f"{path} does not cover the comparison grid; "
+                             "process the years over the same region as the comparison")
+        aggregates = {name: values.sel(latitude=lat_coords, longitude=lon_coords)
+                      for name, values in aggregates.items()}
+    return {name: values.transpose('latitude', 'longitude').values for name, values in aggregates.items()}
+
+
+def country_rasters(lat_coords, lon_coords, mapping_file=MAPPING_FILE):
+    """
+    (TopoJSON id, ISO3 code) of the country polygon containing each cell;
+    -1 / None outside every country.
+    """
+    raster, ids = rasterize_object(lat_coords, lon_coords, 'countries')
+    id_mapping = load_id_mapping(mapping_file)
+    numeric_ids = np.array([int(i) if i and str(i).lstrip('-').isdigit() else -1 for i in ids] + [-1])
+    codes = np.array([id_mapping.get(i) for i in ids] + [None], dtype=object)
+    # Position -1 (outside) picks the trailing sentinel
+    return numeric_ids[raster], codes[raster]
+
+
+def build_cell_table(comparison, aggregates, mapping_file=MAPPING_FILE):
+    """
+    pandas DataFrame with one row per grid cell.
+    """
+    import pandas as pd
+
+    lat = comparison.latitude.values
+    lon = comparison.longitude.values
+    lat_grid, lon_grid = np.meshgrid(lat, lon, indexing='ij')
+    country_id, country_code = country_rasters(lat, lon, mapping_file)
+
+    columns = {
+        'latitude': lat_grid.ravel().astype(np.float32),
+        'longitude': np.where(lon_grid > 180, lon_grid - 360, lon_grid).ravel().astype(np.float32),
+        'country_id': country_id.ravel().astype(np.int16),
+        'country_code': country_code.ravel(),
+        'heat_index_2000': comparison['heat_index_2000'].values.ravel().astype(np.float32),
+        'heat_index_2025': comparison['heat_index_2025'].values.ravel().astype(np.float32),
+        'difference': comparison['difference_2025_minus_2000'].values.ravel().astype(np.float32),
+        'percent_change': comparison['percent_change'].values.ravel().astype(np.float32),
+    }
+    for year, year_aggregates in aggregates.items():
+        columns[f'max_{year}'] = year_aggregates['max'].ravel().astype(np.float32)
+        columns[f'std_{year}'] = year_aggregates['std'].ravel().astype(np.float32)
+        # NaN where land-only series leave ocean cells without a count
+        columns[f'hours_above_{year}'] = year_aggregates['hours_above'].ravel().astype(np.float32)
+    return pd.DataFrame(columns)
+
+
+def write_cell_dataset(table, output_dir=OUTPUT_DIR, file_format='parquet', row_group_size=65536):
+    """
+    Write the table partitioned by country_code (hive layout), each
+    partition sorted by difference so row group statistics are selective.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    table = table.sort_values(['country_code', 'difference'], ascending=[True, False], na_position='last')
+    arrow_table = pa.Table.from_pandas(table, preserve_index=False)
+
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    ds.write_dataset(
+        arrow_table, output_dir,
+        format=file_format,
+        partitioning=ds.partitioning(pa.schema([('country_code', pa.string())]), flavor='hive'),
+        max_rows_per_group=row_group_size,
+        min_rows_per_group=min(row_group_size, 1024),
+        existing_data_behavior='overwrite_or_ignore',
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export per-cell results as a partitioned Parquet/Arrow dataset")
+    parser.add_argument('--input', default=COMPARISON_FILE, help="Comparison dataset from compare_2000_vs_2025.py")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    parser.add_argument('--format', choices=['parquet', 'arrow'], default='parquet')
+    parser.add_argument('--row-group-size', type=int, default=65536)
+    parser.add_argument('--threshold', type=float, default=DANGER_THRESHOLD,
+                        help="Heat index (°F) counted in the hours_above_<year> columns")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"❌ {args.input} not found")
+        print("\n💡 Please run compare_2000_vs_2025.py first")
+        exit(1)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("❌ The cell export needs pyarrow (pip install pyarrow)")
+        exit(1)
+
+    print(f"🔄 Building per-cell table from {args.input}...")
+    comparison = xr.open_dataset(args.input).load()
+
+    aggregates = {}
+    for year in YEARS:
+        path = f'heat_index_{year}_full.nc'
+        if os.path.exists(path):
+            print(f"  time-series aggregates from {path}")
+            try:
+                aggregates[year] = time_aggregates(path, args.threshold, lat_coords=comparison.latitude.values,
+                                                   lon_coords=comparison.longitude.values)
+            except ValueError as e:
+                print(f"❌ {e}")
+                exit(1)
+        else:
+            print(f"⚠️ {path} not found; skipping {year} time-series aggregates")
+
+    table = build_cell_table(comparison, aggregates)
+    write_cell_dataset(table, args.output_dir, 'ipc' if args.format == 'arrow' else 'parquet',
+                       args.row_group_size)
+
+    n_files = sum(len(files) for _, _, files in os.walk(args.output_dir))
+    print(f"✅ {len(table):,} cells in {table['country_code'].nunique()} countries "
+          f"written to '{args.output_dir}' ({n_files} files)")
+    print("\n💡 Example query (DuckDB):")
+    print(f"  SELECT * FROM read_parquet('{args.output_dir}/*/*.parquet', hive_partitioning=true)")
+    print("  WHERE country_code = 'IND' AND difference > 3")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Compact columnar export of the country results for the web bundle.
+Rows of heat_index_by_country.json are joined with country-id-mapping.json
+here, keyed by the numeric TopoJSON ids of world-110m.json, and written as
+one array per column at fixed precision. A binary variant stores the
+numeric columns as little-endian typed arrays (or as an Arrow IPC file when
+pyarrow is installed) so the browser can read them without parsing.
+"""
+
+import argparse
+import json
+import os
+import struct
+import numpy as np
+
+COUNTRY_FILE = 'heat_index_by_country.json'
+MAPPING_FILE = '../data/country-id-mapping.json'
+COLUMNS_FILE = 'heat_index_by_country.columns.json'
+BINARY_FILE = 'heat_index_by_country.columns.bin'
+ARROW_FILE = 'heat_index_by_country.arrow'
+VALUE_COLUMNS = ('heat_index_2000', 'heat_index_2025', 'difference', 'percent_change')
+BINARY_MAGIC = b'HICB'
+
+
+def load_id_mapping(path=MAPPING_FILE):
+    """
+    {TopoJSON id: ISO3 code} as used by the web app.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def build_columns(records, id_mapping, precision=2):
+    """
+    Join country rows to TopoJSON ids and return {column: list}.
+    A country drawn by several geometries gets one row per id.
+    """
+    by_code = {record['country_code']: record for record in records}
+    rows = sorted((int(topo_id), topo_id, code) for topo_id, code in id_mapping.items() if code in by_code)
+
+    columns = {
+        'id': [topo_id for _, topo_id, _ in rows],
+        'country_code': [code for _, _, code in rows],
+        'country_name': [by_code[code]['country_name'] for _, _, code in rows],
+    }
+    for name in VALUE_COLUMNS:
+        columns[name] = [round(float(by_code[code][name]), precision) for _, _, code in rows]
+    columns['data_points'] = [int(by_code[code]['data_points']) for _, _, code in rows]
+    return columns
+
+
+def write_columns_json(columns, path=COLUMNS_FILE, precision=2):
+    payload = {'precision': precision, 'rows': len(columns['id']), 'columns': columns}
+    with open(path, 'w') as f:
+        json.dump(payload, f, separators=(',', ':'), ensure_ascii=False)
+
+
+def write_columns_binary(columns, path=BINARY_FILE):
+    """
+    Typed-array layout: 'HICB', a uint32 header length, a JSON header
+    (row count, string columns, and name/dtype/byte offset of every numeric
+    column), then the numeric columns, each 4-byte aligned and little-endian.
+    """
+    arrays = {
+        'id': np.asarray([int(topo_id) for topo_id in columns['id']], dtype='<u2'),
+        'data_points': np.asarray(columns['data_points'], dtype='<u4'),
+    }
+    for name in VALUE_COLUMNS:
+        arrays[name] = np.asarray(columns[name], dtype='<f4')
+
+    layout = []
+    offset = 0
+    for name, array in arrays.items():
+        layout.append({'name': name, 'dtype': array.dtype.str.lstrip('<|'), 'offset': offset})
+        offset += -(-array.nbytes // 4) * 4
+    header = json.dumps({
+        'rows': len(columns['id']),
+        'strings': {'country_code': columns['country_code'], 'country_name': columns['country_name']},
+        'columns': layout,
+    }, separators=(',', ':'), ensure_ascii=False).encode()
+    header += b' ' * (-len(header) % 4)
+
+    with open(path, 'wb') as f:
+        f.write(BINARY_MAGIC + struct.pack('<I', len(header)) + header)
+        for array in arrays.values():
+            data = array.tobytes()
+            f.write(data + b'\0' * (-len(data) % 4))
+
+
+def write_columns_arrow(columns, path=ARROW_FILE):
+    import pyarrow as pa
+    table = pa.table({
+        'id': pa.array([int(topo_id) for topo_id in columns['id']], pa.uint16()),
+        'country_code': columns['country_code'],
+        'country_name': columns['country_name'],
+        **{name: pa.array(columns[name], pa.float32()) for name in VALUE_COLUMNS},
+        'data_points': pa.array(columns['data_points'], pa.uint32()),
+    })
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def export_columns(records, binary=None, precision=2, mapping_file=MAPPING_FILE, output_dir=''):
+    """
+    Write the columnar JSON and, with binary='typed' or 'arrow', the binary
+    variant. Returns the written paths.
+    """
+    columns = build_columns(records, load_id_mapping(mapping_file), precision)
+    paths = [os.path.join(output_dir, COLUMNS_FILE)]
+    write_columns_json(columns, paths[0], precision)
+    if binary == 'typed':
+        paths.append(os.path.join(output_dir, BINARY_FILE))
+        write_columns_binary(columns, paths[-1])
+    elif binary == 'arrow':
+        paths.append(os.path.join(output_dir, ARROW_FILE))
+        write_columns_arrow(columns, paths[-1])
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write compact columnar country results for the web app")
+    parser.add_argument('--input', default=COUNTRY_FILE, help="Country rows from compare_2000_vs_2025.py")
+    parser.add_argument('--mapping', default=MAPPING_FILE, help="TopoJSON id to ISO3 mapping")
+    parser.add_argument('--precision', type=int, default=2, help="Decimal places kept")
+    parser.add_argument('--binary', choices=['typed', 'arrow'], default=None,
+                        help="Also write a typed-array or Arrow IPC binary file")
+    parser.add_argument('--output-dir', default='.')
+    args = parser.parse_args()
+
+    for path in (args.input, args.mapping):
+        if not os.path.exists(path):
+            print(f"❌ {path} not found")
+            exit(1)
+    if args.binary == 'arrow':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("❌ Arrow output needs pyarrow (pip install pyarrow); or use --binary typed")
+            exit(1)
+
+    with open(args.input) as f:
+        records = json.load(f)
+    paths = export_columns(records, args.binary, args.precision, args.mapping, args.output_dir)
+
+    original = os.path.getsize(args.input)
+    for path in paths:
+        print(f"✅ {path}: {os.path.getsize(path) / 1e3:.1f} kB (row JSON: {original / 1e3:.1f} kB)")
+
+
+if __name__ == "__main__":
+    main()
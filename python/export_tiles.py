@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Export the comparison rasters as quantized data tiles for the web globe.
+Each pyramid level becomes one zoom level cut into fixed-size tiles on the
+latitude/longitude grid. Values are stored as uint8 or uint16 codes with a
+per-variable scale and offset (code 0 marks missing data), either as
+grayscale PNGs or raw little-endian arrays. tiles.json describes the
+encoding and lists the tiles that hold data, so the frontend fetches only
+what is visible.
+"""
+
+import argparse
+import json
+import os
+import numpy as np
+import xarray as xr
+from build_pyramid import PYRAMID_FILE, INPUT_FILE, build_pyramid, level_group
+
+TILE_DIR = '../public/tiles'
+TILE_VARIABLES = ('difference_2025_minus_2000', 'percent_change')
+NODATA = 0
+
+
+def quantization(values, bits):
+    """
+    (offset, scale) mapping the finite range of values onto codes 1..2^bits-1.
+    """
+    finite = values[np.isfinite(values)]
+    low, high = (float(finite.min()), float(finite.max())) if finite.size else (0.0, 0.0)
+    steps = 2 ** bits - 2
+    scale = (high - low) / steps if high > low else 1.0
+    return low, scale
+
+
+def quantize(values, offset, scale, bits):
+    """
+    Encode values as unsigned integer codes; NaN becomes NODATA.
+    """
+    dtype = np.uint8 if bits == 8 else np.uint16
+    with np.errstate(invalid='ignore'):
+        codes = np.clip(np.rint((values - offset) / scale) + 1, 1, 2 ** bits - 1)
+    return np.where(np.isnan(values), NODATA, codes).astype(dtype)
+
+
+def write_tile(codes, path, tile_format):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if tile_format == 'png':
+        from PIL import Image
+        mode = 'L' if codes.dtype == np.uint8 else 'I;16'
+        Image.fromarray(np.ascontiguousarray(codes), mode=mode).save(path, optimize=True)
+    else:
+        codes.astype(codes.dtype.newbyteorder('<')).tofile(path)
+
+
+def load_levels(pyramid_file, input_file):
+    """
+    Pyramid levels from build_pyramid.py's output, or built from the
+    comparison dataset when the pyramid has not been written.
+    """
+    if os.path.exists(pyramid_file):
+        levels = []
+        while True:
+            try:
+                levels.append(xr.open_dataset(pyramid_file, group=level_group(len(levels))).load())
+            except OSError:
+                return levels
+    with xr.open_dataset(input_file) as ds:
+        return build_pyramid(ds.load())
+
+
+def export_tiles(levels, output_dir=TILE_DIR, variables=TILE_VARIABLES, tile_size=256,
+                 bits=8, tile_format='png'):
+    """
+    Write every tile holding data and return the manifest.
+    Zoom 0 is the coarsest level; the last zoom is the native grid.
+    """
+    extension = 'png' if tile_format == 'png' else 'bin'
+    native = levels[0]
+    manifest = {
+        'format': tile_format,
+        'dtype': 'uint8' if bits == 8 else 'uint16',
+        'tile_size': tile_size,
+        'nodata': NODATA,
+        'path': '{variable}/{z}/{row}/{col}.' + extension,
+        'variables': {},
+        'zooms': [],
+    }
+
+    for name in variables:
+        offset, scale = quantization(native[name].values, bits)
+        manifest['variables'][name] = {
+            'offset': offset, 'scale': scale, 'units': native[name].attrs.get('units', ''),
+        }
+
+    lat_step = float(native.latitude[1] - native.latitude[0]) if native.sizes['latitude'] > 1 else 1.0
+    lon_step = float(native.longitude[1] - native.longitude[0]) if native.sizes['longitude'] > 1 else 1.0
+
+    for z, level_ds in enumerate(reversed(levels)):
+        factor = level_ds.attrs.get('factor', 2 ** (len(levels) - 1 - z))
+        n_lat, n_lon = level_ds.sizes['latitude'], level_ds.sizes['longitude']
+        zoom = {
+            'z': z,
+            'factor': int(factor),
+            'shape': [n_lat, n_lon],
+            # Coarser levels are centred on the block means of native cells
+            'lat0': float(level_ds.latitude[0]), 'lat_step': lat_step * factor,
+            'lon0': float(level_ds.longitude[0]), 'lon_step': lon_step * factor,
+            'tiles': {},
+        }
+        for name in variables:
+            entry = manifest['variables'][name]
+            codes = quantize(level_ds[name].transpose('latitude', 'longitude').values,
+                             entry['offset'], entry['scale'], bits)
+            tiles = []
+            for row in range(0, -(-n_lat // tile_size)):
+                for col in range(0, -(-n_lon // tile_size)):
+                    tile = codes[row * tile_size:(row + 1) * tile_size, col * tile_size:(col + 1) * tile_size]
+                    if not np.any(tile != NODATA):
+                        continue
+                    path = os.path.join(output_dir, manifest['path'].format(variable=name, z=z, row=row, col=col))
+                    write_tile(tile, path, tile_format)
+                    tiles.append([row, col])
+            zoom['tiles'][name] = tiles
+        manifest['zooms'].append(zoom)
+
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, 'tiles.json'), 'w') as f:
+        json.dump(manifest, f, separators=(',', ':'))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export comparison rasters as quantized web tiles")
+    parser.add_argument('--pyramid', default=PYRAMID_FILE, help="Pyramid from build_pyramid.py")
+    parser.add_argument('--input', default=INPUT_FILE, help="Comparison dataset, used when there is no pyramid")
+    parser.add_argument('--output-dir', default=TILE_DIR, help="Tile directory (served by Vite from public/)")
+    parser.add_argument('--tile-size', type=int, default=256)
+    parser.add_argument('--bits', type=int, choices=[8, 16], default=8, help="Quantization depth")
+    parser.add_argument('--format', choices=['png', 'bin'], default='png',
+                        help="Grayscale PNG tiles or raw little-endian arrays")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.pyramid) and not os.path.exists(args.input):
+        print(f"❌ Neither {args.pyramid} nor {args.input} found")
+        print("\n💡 Please run compare_2000_vs_2025.py (and optionally build_pyramid.py) first")
+        exit(1)
+
+    if args.format == 'png':
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            print("❌ PNG tiles need Pillow (pip install pillow); or use --format bin")
+            exit(1)
+
+    print("🔄 Exporting tiles...")
+    levels = load_levels(args.pyramid, args.input)
+    manifest = export_tiles(levels, args.output_dir, tile_size=args.tile_size, bits=args.bits,
+                            tile_format=args.format)
+
+    n_tiles = sum(len(tiles) for zoom in manifest['zooms'] for tiles in zoom['tiles'].values())
+    size = sum(os.path.getsize(os.path.join(root, f))
+               for root, _, files in os.walk(args.output_dir) for f in files)
+    for name, entry in manifest['variables'].items():
+        print(f"  {name}: value = {entry['offset']:.3f} + {entry['scale']:.5f} x (code - 1)")
+    print(f"✅ {n_tiles} tiles over {len(manifest['zooms'])} zoom levels "
+          f"({size / 1e3:.0f} kB) saved to '{args.output_dir}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Download ERA5 2m temperature and dewpoint from the Climate Data Store.
+Requests are split per month and variable and run concurrently with a
+bounded worker pool. Each month is saved as its own GRIB file in the
+collection directory, partial downloads are resumed, and completed files
+are recorded with their size and SHA-256 in a manifest. Files already in
+the collection are rehashed against the manifest before they are skipped.
+The size and SHA-256 of every partial download are recorded as it is
+written, so a later run resumes it, even after a crash, only while the
+partial file still matches the record.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import cdsapi
+import requests
+
+COLLECTION_DIR = "../data/grib"
+DATASET = 'reanalysis-era5-single-levels'
+VARIABLES = {
+    '2m_temperature': 't2m',
+    '2m_dewpoint_temperature': 'd2m',
+}
+MANIFEST_NAME = 'manifest.json'
+
+_manifest_lock = threading.Lock()
+
+
+def month_filename(variable, year, month):
+    """
+    File name of one month of one variable in the collection.
+    """
+    return f"era5_{VARIABLES[variable]}_{year}_{month:02d}.grib"
+
+
+def build_request(variable, year, month, area=None):
+    """
+    CDS request for every hour of one month of one variable.
+    area is (north, west, south, east) as used by the CDS API.
+    """
+    request = {
+        'product_type': 'reanalysis',
+        'variable': variable,
+        'year': str(year),
+        'month': f'{month:02d}',
+        'day': [f'{day:02d}' for day in range(1, 32)],
+        'time': [f'{hour:02d}:00' for hour in range(24)],
+        'format': 'grib',
+    }
+    if area:
+        request['area'] = list(area)
+    return request
+
+
+def _sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """
+    SHA-256 hex digest of a file.
+    """
+    return _sha256(path, chunk_size).hexdigest()
+
+
+def load_manifest(collection_dir):
+    """
+    Read the collection manifest ({file name: size, sha256, request}).
+    """
+    path = os.path.join(collection_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def record_download(collection_dir, filename, entry):
+    """
+    Add one completed file to the manifest, rewriting it atomically.
+    """
+    with _manifest_lock:
+        manifest = load_manifest(collection_dir)
+        manifest[filename] = entry
+        path = os.path.join(collection_dir, MANIFEST_NAME)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+
+def is_complete(collection_dir, filename, manifest, verify_checksum=True):
+    """
+    Whether a file is already in the collection with the recorded size
+    and SHA-256 (only the size when verify_checksum is off).
+    """
+    path = os.path.join(collection_dir, filename)
+    entry = manifest.get(filename)
+    if entry is None or not os.path.exists(path):
+        return False
+    if os.path.getsize(path) != entry['size']:
+        return False
+    return not verify_checksum or file_sha256(path) == entry['sha256']
+
+
+def _write_record(record, size, digest):
+    """
+    Atomically record how many bytes of a partial download are written and
+    their SHA-256.
+    """
+    tmp_path = record + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(f"{size} {digest.hexdigest()}")
+    os.replace(tmp_path, record)
+
+
+def _resumable_prefix(target, record):
+    """
+    (bytes, SHA-256 object) of the part of a partial download that matches
+    its record, truncating the file to it, or (0, None) when the file has
+    no usable record.
+    """
+    if not os.path.exists(record):
+        return 0, None
+    with open(record) as f:
+        fields = f.read().split()
+    if len(fields) != 2 or not fields[0].isdigit():
+        return 0, None
+    recorded_size, recorded_sha256 = int(fields[0]), fields[1]
+    if os.path.getsize(target) < recorded_size:
+        return 0, None
+    digest = hashlib.sha256()
+    with open(target, 'rb') as f:
+        remaining = recorded_size
+        while remaining:
+            chunk = f.read(min(remaining, 1 << 20))
+            digest.update(chunk)
+            remaining -= len(chunk)
+    if digest.hexdigest() != recorded_sha256:
+        return 0, None
+    # Bytes written after the last record update (e.g. killed in between) are dropped
+    os.truncate(target, recorded_size)
+    return recorded_size, digest
+
+
+def download_with_resume(url, target, size, session=None, chunk_size=1 << 16, max_attempts=5):
+    """
+    Download url to target, appending to an existing partial file with an
+    HTTP Range request. After every chunk the number of bytes written and
+    their SHA-256 are recorded in <target>.sha256, so a partial file left by
+    a run that was killed is resumed from the recorded prefix when it still
+    matches, and downloaded again otherwise.
+    Returns (number of bytes, SHA-256) of the finished file.
+    """
+    session = session or requests.Session()
+    record = target + '.sha256'
+    digest = hashlib.sha256()
+    if os.path.exists(target):
+        have, resumed = _resumable_prefix(target, record)
+        if resumed is None or have > size:
+            # Left over from a different result or changed since; start again
+            os.remove(target)
+        else:
+            digest = resumed
+    for _ in range(max_attempts):
+        have = os.path.getsize(target) if os.path.exists(target) else 0
+        if have >= size:
+            break
+        headers = {'Range': f'bytes={have}-'} if have else {}
+        try:
+            with session.get(url, headers=headers, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                # A server that ignores Range sends the whole file again
+                mode = 'ab' if response.status_code == 206 else 'wb'
+                if mode == 'wb':
+                    digest = hashlib.sha256()
+                    have = 0
+                with open(target, mode) as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                        f.flush()
+                        digest.update(chunk)
+                        have += len(chunk)
+                        _write_record(record, have, digest)
+        except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+            print(f"  ⚠️ Download of {os.path.basename(target)} interrupted: {e}")
+    if not os.path.exists(target):
+        return 0, None
+    if os.path.getsize(target) >= size and os.path.exists(record):
+        os.remove(record)
+    return os.path.getsize(target), digest.hexdigest()
+
+
+def fetch_month(variable, year, month, collection_dir, client_kwargs, area=None):
+    """
+    Retrieve one month of one variable into the collection.
+    """
+    filename = month_filename(variable, year, month)
+    target = os.path.join(collection_dir, filename)
+    partial = target + '.part'
+    request = build_request(variable, year, month, area)
+
+    client = cdsapi.Client(**client_kwargs)
+    result = client.retrieve(DATASET, request)
+    size = int(result.content_length)
+
+    received, sha256 = download_with_resume(result.location, partial, size)
+    if received != size:
+        raise IOError(f"{filename}: downloaded {received} of {size} bytes")
+
+    entry = {'size': size, 'sha256': sha256, 'request': request}
+    os.replace(partial, target)
+    record_download(collection_dir, filename, entry)
+    return filename, size
+
+
+def fetch_collection(years, months, collection_dir=COLLECTION_DIR, workers=4,
+                     client_kwargs=None, area=None, verify_checksum=True):
+    """
+    Fetch every missing (variable, year, month) file with a bounded pool.
+    Returns (downloaded, skipped, failed) lists of file names.
+    """
+    os.makedirs(collection_dir, exist_ok=True)
+    client_kwargs = client_kwargs or {}
+    manifest = load_manifest(collection_dir)
+
+    tasks = []
+    skipped = []
+    for year in years:
+        for month in months:
+            for variable in VARIABLES:
+                filename = month_filename(variable, year, month)
+                if is_complete(collection_dir, filename, manifest, verify_checksum):
+                    skipped.append(filename)
+                else:
+                    tasks.append((variable, year, month))
+
+    print(f"📦 {len(skipped)} files already in collection, {len(tasks)} to fetch")
+
+    downloaded = []
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(fetch_month, variable, year, month, collection_dir, client_kwargs, area):
+                month_filename(variable, year, month)
+            for variable, year, month in tasks
+        }
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                _, size = future.result()
+                downloaded.append(filename)
+                print(f"  ✅ {filename} ({size / 1e6:.1f} MB)")
+            except Exception as e:
+                failed.append(filename)
+                print(f"  ❌ {filename}: {e}")
+
+    return downloaded, skipped, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download ERA5 t2m/d2m month by month from the CDS")
+    parser.add_argument('--years', type=int, nargs='+', required=True)
+    parser.add_argument('--months', type=int, nargs='+', default=list(range(1, 13)))
+    parser.add_argument('--collection-dir', default=COLLECTION_DIR,
+                        help="Directory holding the monthly GRIB files")
+    parser.add_argument('--workers', type=int, default=4, help="Concurrent CDS requests")
+    parser.add_argument('--area', type=float, nargs=4, default=None,
+                        metavar=('NORTH', 'WEST', 'SOUTH', 'EAST'), help="Sub-area to request")
+    parser.add_argument('--url', default=None, help="CDS API url (default: ~/.cdsapirc)")
+    parser.add_argument('--key', default=None, help="CDS API key (default: ~/.cdsapirc)")
+    parser.add_argument('--no-verify', action='store_true',
+                        help="Skip files already in the collection by size only, without rehashing them")
+    args = parser.parse_args()
+
+    client_kwargs = {'quiet': True, 'progress': False}
+    if args.url:
+        client_kwargs['url'] = args.url
+    if args.key:
+        client_kwargs['key'] = args.key
+
+    print(f"🌐 Fetching ERA5 {', '.join(VARIABLES)} for {len(args.years)} year(s), "
+          f"{len(args.months)} month(s) with {args.workers} workers...")
+    downloaded, skipped, failed = fetch_collection(args.years, args.months, args.collection_dir,
+                                                   args.workers, client_kwargs, args.area, not args.no_verify)
+
+    print(f"\n✅ Downloaded {len(downloaded)} files, {len(skipped)} already present")
+    if failed:
+        print(f"❌ {len(failed)} files failed; run again to resume them")
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
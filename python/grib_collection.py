@@ -0,0 +1,142 @@
+"""
+Multi-file GRIB / NetCDF input collections.
+A collection is a directory or glob of files, such as the monthly files
+written by fetch_era5.py. The time range of each file is read from its
+coordinates only (cfgrib builds these from message headers) and cached in
+an index, so a run opens just the files that cover its period.
+"""
+
+import glob
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import xarray as xr
+
+INPUT_PATTERNS = ('*.grib', '*.grb', '*.grib2', '*.nc')
+INDEX_NAME = 'collection_index.json'
+
+
+def is_collection(path):
+    """
+    Whether an input path names a directory or glob rather than one file.
+    """
+    return os.path.isdir(path) or glob.has_magic(path)
+
+
+def collection_files(path):
+    """
+    Sorted list of data files in a directory or matching a glob.
+    """
+    if os.path.isdir(path):
+        files = [f for pattern in INPUT_PATTERNS for f in glob.glob(os.path.join(path, pattern))]
+    else:
+        files = glob.glob(path)
+    return sorted(f for f in files if not f.endswith(('.idx', '.part')))
+
+
+def file_engine(path):
+    return None if path.endswith('.nc') else 'cfgrib'
+
+
+def _open_file(path, chunks=None):
+    engine = file_engine(path)
+    if engine == 'cfgrib':
+        return xr.open_dataset(path, engine='cfgrib', chunks=chunks)
+    return xr.open_dataset(path, chunks=chunks)
+
+
+def scan_file(path):
+    """
+    Time coverage and variables of one file, without reading field values.
+    """
+    with _open_file(path) as ds:
+        times = np.atleast_1d(ds['time'].values)
+        return {
+            'path': os.path.abspath(path),
+            'mtime': os.path.getmtime(path),
+            'size': os.path.getsize(path),
+            'start': str(times.min()),
+            'end': str(times.max()),
+            'n_times': int(times.size),
+            'variables': sorted(ds.data_vars),
+        }
+
+
+def build_time_index(path, workers=8):
+    """
+    Scan every file of a collection in parallel and return their entries
+    sorted by start time. Unchanged files are taken from the cached index
+    when the collection is a directory.
+    """
+    files = collection_files(path)
+    index_path = os.path.join(path, INDEX_NAME) if os.path.isdir(path) else None
+
+    cached = {}
+    if index_path and os.path.exists(index_path):
+        with open(index_path) as f:
+            cached = {entry['path']: entry for entry in json.load(f)}
+
+    def scan(file_path):
+        entry = cached.get(os.path.abspath(file_path))
+        if entry and entry['mtime'] == os.path.getmtime(file_path) and entry['size'] == os.path.getsize(file_path):
+            return entry
+        return scan_file(file_path)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        index = sorted(pool.map(scan, files), key=lambda entry: (entry['start'], entry['path']))
+
+    if index_path:
+        tmp_path = index_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=2)
+        os.replace(tmp_path, index_path)
+    return index
+
+
+def files_for_period(index, start=None, end=None):
+    """
+    Paths of the indexed files overlapping [start, end] (inclusive).
+    """
+    start = np.datetime64(start) if start is not None else None
+    end = np.datetime64(end) if end is not None else None
+    selected = []
+    for entry in index:
+        if start is not None and np.datetime64(entry['end']) < start:
+            continue
+        if end is not None and np.datetime64(entry['start']) > end:
+            continue
+        selected.append(entry['path'])
+    return selected
+
+
+def open_collection(path, start=None, end=None, workers=8):
+    """
+    Open the files of a collection that cover [start, end] as one Dataset.
+    Files are opened in parallel and combined by their coordinates, so
+    per-variable and per-month files merge into a single time axis. Each
+    file is read with the engine for its format, so GRIB and NetCDF months
+    can be mixed.
+    """
+    index = build_time_index(path, workers)
+    files = files_for_period(index, start, end)
+    if not files:
+        raise FileNotFoundError(f"No files in {path} cover {start} to {end}")
+    print(f"📚 Opening {len(files)} of {len(index)} collection files")
+
+    try:
+        import dask  # noqa: F401 -- chunked and open_mfdataset(parallel=True) reads need dask
+        chunks = {'time': 24}
+    except ImportError:
+        chunks = None
+    engines = {file_engine(f) for f in files}
+    if chunks and engines == {None}:
+        return xr.open_mfdataset(files, combine='by_coords', parallel=True, chunks=chunks)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        datasets = list(pool.map(lambda f: _open_file(f, chunks), files))
+    if len(engines) > 1:
+        # cfgrib adds coordinates (valid_time, step, ...) that NetCDF files lack
+        common = set.intersection(*(set(ds.coords) for ds in datasets))
+        datasets = [ds.drop_vars([name for name in ds.coords if name not in common]) for ds in datasets]
+    return xr.combine_by_coords(datasets, combine_attrs='drop_conflicts')
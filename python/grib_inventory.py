@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Header-only inventory of GRIB input files.
+Reads message headers with eccodes (no field values are decoded) and
+reports variables, grid, time coverage, gaps and per-year message counts.
+The processing stages use it to check that the requested year is present
+before committing to a full decode.
+"""
+
+import argparse
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from grib_collection import is_collection, collection_files
+from heat_utils import DATA_FILE
+
+GRID_KEYS = ('gridType', 'Ni', 'Nj',
+             'latitudeOfFirstGridPointInDegrees', 'longitudeOfFirstGridPointInDegrees',
+             'latitudeOfLastGridPointInDegrees', 'longitudeOfLastGridPointInDegrees',
+             'iDirectionIncrementInDegrees', 'jDirectionIncrementInDegrees')
+
+
+def scan_grib_headers(path):
+    """
+    Variables, valid times and grids of every message in a GRIB file,
+    read from headers only.
+    """
+    import eccodes
+
+    names = []
+    dates = []
+    times = []
+    grids = Counter()
+    with open(path, 'rb') as f:
+        while True:
+            gid = eccodes.codes_grib_new_from_file(f, headers_only=True)
+            if gid is None:
+                break
+            try:
+                names.append(eccodes.codes_get(gid, 'shortName'))
+                dates.append(eccodes.codes_get(gid, 'validityDate'))
+                times.append(eccodes.codes_get(gid, 'validityTime'))
+                grids[tuple(eccodes.codes_get(gid, key) for key in GRID_KEYS)] += 1
+            finally:
+                eccodes.codes_release(gid)
+
+    dates = np.asarray(dates, dtype=np.int64)
+    times = np.asarray(times, dtype=np.int64)
+    day_strings = [f'{d // 10000:04d}-{d // 100 % 100:02d}-{d % 100:02d}' for d in dates]
+    valid_times = (np.asarray(day_strings, dtype='datetime64[m]')
+                   + (times // 100 * 60 + times % 100).astype('timedelta64[m]'))
+    return {'names': np.asarray(names), 'valid_times': valid_times, 'grids': grids}
+
+
+def scan_netcdf_coords(path):
+    """
+    Same information as scan_grib_headers for a NetCDF file, from its coordinates.
+    """
+    import xarray as xr
+    with xr.open_dataset(path) as ds:
+        file_times = ds['time'].values.astype('datetime64[m]')
+        names = []
+        valid_times = []
+        for name in ds.data_vars:
+            names.extend([name] * len(file_times))
+            valid_times.append(file_times)
+        grid = ('regular_ll', ds.sizes.get('longitude'), ds.sizes.get('latitude'),
+                float(ds.latitude[0]), float(ds.longitude[0]),
+                float(ds.latitude[-1]), float(ds.longitude[-1]), None, None)
+    valid_times = np.concatenate(valid_times) if valid_times else np.array([], dtype='datetime64[m]')
+    return {'names': np.asarray(names), 'valid_times': valid_times, 'grids': Counter({grid: len(names)})}
+
+
+def find_gaps(valid_times):
+    """
+    Spans where consecutive unique times are further apart than the usual step.
+    Returns the step and a list of (last time before gap, first time after gap).
+    """
+    unique_times = np.unique(valid_times)
+    if len(unique_times) < 3:
+        return None, []
+    steps = np.diff(unique_times)
+    values, counts = np.unique(steps, return_counts=True)
+    step = values[np.argmax(counts)]
+    gap_positions = np.where(steps > step)[0]
+    return step, [(unique_times[i], unique_times[i + 1]) for i in gap_positions]
+
+
+def take_inventory(path, workers=8):
+    """
+    Inventory of a single file or a collection of files.
+    """
+    files = collection_files(path) if is_collection(path) else [path]
+
+    def scan(file_path):
+        if file_path.endswith('.nc'):
+            return scan_netcdf_coords(file_path)
+        return scan_grib_headers(file_path)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        scans = list(pool.map(scan, files))
+
+    names = np.concatenate([s['names'] for s in scans]) if scans else np.array([])
+    valid_times = (np.concatenate([s['valid_times'] for s in scans]) if scans
+                   else np.array([], dtype='datetime64[m]'))
+    grids = Counter()
+    for s in scans:
+        grids.update(s['grids'])
+
+    years = valid_times.astype('datetime64[Y]').astype(int) + 1970
+    variables = {}
+    for name in np.unique(names):
+        var_times = valid_times[names == name]
+        step, gaps = find_gaps(var_times)
+        variables[str(name)] = {
+            'messages': int(len(var_times)),
+            'start': var_times.min() if len(var_times) else None,
+            'end': var_times.max() if len(var_times) else None,
+            'step': step,
+            'gaps': gaps,
+        }
+
+    return {
+        'files': files,
+        'bytes': sum(os.path.getsize(f) for f in files),
+        'messages': int(len(names)),
+        'variables': variables,
+        'grids': grids,
+        'year_counts': {int(year): int(count) for year, count in zip(*np.unique(years, return_counts=True))},
+    }
+
+
+def year_message_counts(path):
+    """
+    {year: message count}, or None when headers cannot be scanned
+    (e.g. eccodes missing), in which case callers carry on with a full open.
+    """
+    try:
+        return take_inventory(path)['year_counts']
+    except Exception as e:
+        print(f"⚠️ Skipping inventory check: {e}")
+        return None
+
+
+def year_message_count(path, year):
+    """
+    Number of messages valid in a year, or None when headers cannot be scanned.
+    """
+    counts = year_message_counts(path)
+    return None if counts is None else counts.get(year, 0)
+
+
+def print_inventory(inventory):
+    print(f"📁 {len(inventory['files'])} file(s), {inventory['bytes'] / 1e9:.2f} GB, "
+          f"{inventory['messages']:,} messages")
+
+    print("\n🧾 Variables:")
+    for name, info in inventory['variables'].items():
+        step = f"{info['step'].astype('timedelta64[m]').astype(int) / 60:g}h" if info['step'] is not None else '?'
+        print(f"  {name:<6} {info['messages']:>8,} messages  {info['start']} to {info['end']}  step {step}")
+        for before, after in info['gaps'][:10]:
+            print(f"         gap: {before} -> {after}")
+        if len(info['gaps']) > 10:
+            print(f"         ... {len(info['gaps']) - 10} more gaps")
+
+    print("\n🗺️ Grids:")
+    for grid, count in inventory['grids'].items():
+        grid_type, ni, nj = grid[:3]
+        print(f"  {grid_type} {nj} x {ni} lat {grid[3]}..{grid[5]} lon {grid[4]}..{grid[6]}"
+              f" ({count:,} messages)")
+
+    print("\n📅 Messages per year:")
+    for year, count in inventory['year_counts'].items():
+        print(f"  {year}: {count:,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Header-only inventory of GRIB input files")
+    parser.add_argument('path', nargs='?', default=DATA_FILE,
+                        help="GRIB file, or a directory / glob of monthly files")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    inventory = take_inventory(args.path)
+    print_inventory(inventory)
+    print(f"\n⏱️ Scanned in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
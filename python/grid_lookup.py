@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Batched nearest-grid-cell lookup on regular latitude/longitude grids.
+Cell indices are computed arithmetically from the grid origin and step,
+so any number of points is mapped in O(1) per point with no search.
+Longitudes may be given in either -180-180 or 0-360; they wrap around
+global grids and are bounds-checked on regional ones.
+"""
+
+import argparse
+import os
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+
+class GridIndex:
+    """
+    Nearest-cell index of a regular grid, built from its 1-D coordinates.
+    """
+
+    def __init__(self, lat_coords, lon_coords):
+        lat_coords = np.asarray(lat_coords, dtype=float)
+        lon_coords = np.asarray(lon_coords, dtype=float)
+        self.lat0, self.lat_step = lat_coords[0], self._step(lat_coords, 'latitude')
+        self.lon0, self.lon_step = lon_coords[0], self._step(lon_coords, 'longitude')
+        self.n_lat = len(lat_coords)
+        self.n_lon = len(lon_coords)
+        # A grid covering 360° of longitude wraps; a regional grid does not
+        self.global_lon = np.isclose(abs(self.lon_step) * self.n_lon, 360)
+
+    @staticmethod
+    def _step(coords, name):
+        if len(coords) < 2:
+            return 1.0
+        steps = np.diff(coords)
+        if not np.allclose(steps, steps[0], rtol=1e-6, atol=1e-9):
+            raise ValueError(f"{name} coordinates are not evenly spaced")
+        return float(steps[0])
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        Index for the grid of a Dataset or DataArray.
+        """
+        return cls(data.latitude.values, data.longitude.values)
+
+    def cell_indices(self, lats, lons):
+        """
+        Row and column of the nearest cell for every point, and a mask of the
+        points that fall on the grid. Off-grid and NaN points get index 0.
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        half_step = abs(self.lon_step) / 2
+        with np.errstate(invalid='ignore'):
+            rows = np.rint((lats - self.lat0) / self.lat_step)
+            # Longitude offset from the first column along the grid direction,
+            # in [-half step, 360 - half step), whichever convention lons use
+            offset = ((lons - self.lon0) * np.sign(self.lon_step) + half_step) % 360 - half_step
+            cols = np.rint(offset / abs(self.lon_step))
+            valid = (rows >= 0) & (rows < self.n_lat)
+            if self.global_lon:
+                cols = cols % self.n_lon
+            else:
+                valid &= (cols >= 0) & (cols < self.n_lon)
+
+        valid &= np.isfinite(lats) & np.isfinite(lons)
+        rows = np.where(valid, rows, 0).astype(np.intp)
+        cols = np.where(valid, cols, 0).astype(np.intp)
+        return rows, cols, valid
+
+    def lookup(self, field, lats, lons, fill=np.nan):
+        """
+        Values of field at the nearest cell of every point in one gather.
+        field is a (..., latitude, longitude) array or DataArray; leading
+        dimensions (e.g. time) are kept, so the result is (..., n_points).
+        """
+        if isinstance(field, xr.DataArray):
+            leading = [dim for dim in field.dims if dim not in ('latitude', 'longitude')]
+            field = field.transpose(*leading, 'latitude', 'longitude').values
+        rows, cols, valid = self.cell_indices(lats, lons)
+        values = np.asarray(field)[..., rows, cols].astype(float)
+        values[..., ~valid] = fill
+        return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Attach gridded heat index values to a table of points")
+    parser.add_argument('points', help="CSV file with latitude and longitude columns")
+    parser.add_argument('--field', default='heat_index_comparison_complete.nc',
+                        help="NetCDF file holding the gridded field")
+    parser.add_argument('--variables', nargs='+', default=None,
+                        help="Variables to attach (default: every 2-D variable)")
+    parser.add_argument('--lat-column', default='latitude')
+    parser.add_argument('--lon-column', default='longitude')
+    parser.add_argument('--output', default=None, help="Output CSV (default: <points>_heat_index.csv)")
+    args = parser.parse_args()
+
+    for path in (args.points, args.field):
+        if not os.path.exists(path):
+            print(f"❌ {path} not found")
+            exit(1)
+
+    points = pd.read_csv(args.points)
+    with xr.open_dataset(args.field) as ds:
+        index = GridIndex.from_data(ds)
+        variables = args.variables or [name for name, var in ds.data_vars.items()
+                                       if set(var.dims) == {'latitude', 'longitude'}]
+        lats = points[args.lat_column].values
+        lons = points[args.lon_column].values
+        for name in variables:
+            points[name] = index.lookup(ds[name], lats, lons)
+
+    _, _, valid = index.cell_indices(lats, lons)
+    output = args.output or os.path.splitext(args.points)[0] + '_heat_index.csv'
+    points.to_csv(output, index=False)
+    print(f"✅ {valid.sum():,} of {len(points):,} points on the grid; values saved to '{output}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Shared helpers for the heat index processing scripts.
+Loads ERA5 GRIB data and converts 2m temperature / dewpoint into heat index.
+"""
+
+import os
+import numpy as np
+import xarray as xr
+
+DATA_FILE = "../data/data.grib"
+
+
+def open_grib_dataset(data_file):
+    """
+    Open a GRIB file with the cfgrib engine, falling back to the cfgrib module.
+    """
+    try:
+        # First try with cfgrib engine
+        ds = xr.open_dataset(data_file, engine='cfgrib')
+        print("✅ Successfully opened GRIB file with cfgrib")
+    except Exception as e:
+        print(f"❌ Error loading GRIB file with cfgrib: {e}")
+        print("Trying alternative methods...")
+        try:
+            # Try importing cfgrib explicitly
+            import cfgrib
+            ds = cfgrib.open_dataset(data_file)
+            print("✅ Successfully opened GRIB file with cfgrib module")
+        except ImportError:
+            print("❌ cfgrib not installed. Installing cfgrib...")
+            import subprocess
+            import sys
+            subprocess.check_call([sys.executable, "-m", "pip", "install", "cfgrib"])
+            import cfgrib
+            ds = cfgrib.open_dataset(data_file)
+            print("✅ Installed cfgrib and opened GRIB file")
+        except Exception as e2:
+            print(f"❌ All GRIB loading methods failed: {e2}")
+            print("Please ensure cfgrib and eccodes are properly installed")
+            exit(1)
+    return ds
+
+
+def open_input_dataset(path, start=None, end=None):
+    """
+    Open the input data: a single GRIB file, or a directory / glob of
+    monthly GRIB or NetCDF files of which only those covering [start, end]
+    are opened.
+    """
+    from grib_collection import is_collection, open_collection
+    if is_collection(path):
+        return open_collection(path, start, end)
+    return open_grib_dataset(path)
+
+
+def input_exists(path):
+    """
+    Whether a single input file exists or a collection has any files.
+    """
+    from grib_collection import is_collection, collection_files
+    if is_collection(path):
+        return len(collection_files(path)) > 0
+    return os.path.exists(path)
+
+
+# Thermal comfort indices computed by calculate_indices, all in °F
+INDICES = ('heat_index', 'humidex', 'apparent_temperature', 'wbgt')
+INDEX_NAMES = {
+    'heat_index': 'Heat Index',
+    'humidex': 'Humidex',
+    'apparent_temperature': 'Apparent Temperature (shade, calm)',
+    'wbgt': 'Simplified Wet Bulb Globe Temperature',
+}
+
+
+def vapor_pressures(temp_celsius, dewpoint_celsius):
+    """
+    Actual (from dewpoint) and saturation vapor pressure in Pa, from metpy
+    when it is installed, otherwise from Bolton's formula.
+    """
+    try:
+        from metpy.calc import saturation_vapor_pressure
+        from metpy.units import units as metpy_units
+        vapor = saturation_vapor_pressure(dewpoint_celsius * metpy_units.degC).to('Pa').magnitude
+        saturation = saturation_vapor_pressure(temp_celsius * metpy_units.degC).to('Pa').magnitude
+        return vapor, saturation
+    except ImportError:
+        def bolton(celsius):
+            return 611.2 * np.exp(17.67 * celsius / (celsius + 243.5))
+        return bolton(dewpoint_celsius), bolton(temp_celsius)
+
+
+def calculate_indices(temp_kelvin, dewpoint_kelvin, indices=('heat_index',), verbose=True):
+    """
+    Calculate several thermal comfort indices in °F in one pass over 2m
+    temperature and dewpoint in Kelvin, sharing the vapor pressure and
+    relative humidity between them. Returns {index name: array}.
+    Heat index is undefined (NaN) below 80°F; humidex (Masterton &
+    Richardson), apparent temperature (Steadman, shade and calm air) and
+    the simplified WBGT (Australian Bureau of Meteorology) are defined
+    everywhere and converted from their °C scales.
+    """
+    unknown = set(indices) - set(INDICES)
+    if unknown:
+        raise ValueError(f"Unknown indices: {', '.join(sorted(unknown))}")
+
+    # Convert from Kelvin to Celsius
+    temp_celsius = temp_kelvin - 273.15
+    dewpoint_celsius = dewpoint_kelvin - 273.15
+    temp_f = (temp_celsius * 9/5) + 32
+
+    # Shared intermediates: vapor pressure (hPa) and relative humidity
+    vapor, saturation = vapor_pressures(temp_celsius, dewpoint_celsius)
+    vapor_hpa = vapor / 100
+
+    results = {}
+    if 'heat_index' in indices:
+        try:
+            from metpy.calc import heat_index as hi_calc
+            from metpy.units import units as metpy_units
+
+            rh = (vapor / saturation) * metpy_units.dimensionless
+            hi_result = hi_calc(temp_f * metpy_units.degF, rh, mask_undefined=True)
+            fahrenheit_hi = hi_result.to(metpy_units.degF).magnitude
+
+        except Exception as e:
+            if verbose:
+                print(f"Heat index calculation failed: {e}")
+                print("Using simplified calculation...")
+
+            # Fallback: simple heat index approximation
+            fahrenheit_hi = temp_f * 1.1  # Simple approximation
+
+        # Masked (undefined) values become NaN, matching xarray's conversion
+        if np.ma.isMaskedArray(fahrenheit_hi):
+            fahrenheit_hi = np.ma.filled(fahrenheit_hi, np.nan)
+        results['heat_index'] = np.asarray(fahrenheit_hi)
+
+    celsius_indices = {
+        'humidex': lambda: temp_celsius + 0.5555 * (vapor_hpa - 10),
+        'apparent_temperature': lambda: temp_celsius + 0.33 * vapor_hpa - 4.0,
+        'wbgt': lambda: 0.567 * temp_celsius + 0.393 * vapor_hpa + 3.94,
+    }
+    for name, formula in celsius_indices.items():
+        if name in indices:
+            results[name] = np.asarray(formula() * 9/5 + 32)
+    return results
+
+
+def calculate_heat_index(temp_kelvin, dewpoint_kelvin, verbose=True):
+    """
+    Calculate heat index in °F from 2m temperature and dewpoint in Kelvin.
+    Accepts numpy arrays of any shape; values where the heat index is
+    undefined (below 80°F) come back as NaN.
+    """
+    return calculate_indices(temp_kelvin, dewpoint_kelvin, ('heat_index',), verbose)['heat_index']
+
+
+def time_step_seconds(times):
+    """
+    Return the sampling interval of a datetime64 time axis in seconds.
+    """
+    if len(times) < 2:
+        return 3600
+    steps = np.diff(times).astype('timedelta64[s]').astype(np.int64)
+    return int(np.min(steps[steps > 0])) if np.any(steps > 0) else 3600
+
+
+def load_land_mask(ds, source='world', threshold=0.5):
+    """
+    Boolean (latitude, longitude) land mask for the dataset grid, from the
+    ERA5 land-sea mask ('lsm') or rasterized from world-110m.json ('world').
+    """
+    if source == 'lsm':
+        if 'lsm' not in ds:
+            print("❌ Land-sea mask 'lsm' not found in dataset; use --land-mask world")
+            exit(1)
+        lsm = ds['lsm']
+        if 'time' in lsm.dims:
+            lsm = lsm.isel(time=0)
+        return lsm.transpose('latitude', 'longitude').values >= threshold
+
+    from world_geometry import land_mask
+    return land_mask(ds.latitude.values, ds.longitude.values)
+
+
+def cell_coords(data_array, mask):
+    """
+    Coordinates and attributes of the compact (time, cell) layout of a
+    (time, latitude, longitude) array restricted to the masked cells.
+    """
+    lat_index, lon_index = np.nonzero(mask)
+    lat_coords = data_array.latitude.values
+    lon_coords = data_array.longitude.values
+    coords = {
+        'time': data_array.time.values,
+        'latitude': ('cell', lat_coords[lat_index]),
+        'longitude': ('cell', lon_coords[lon_index]),
+        'lat_index': ('cell', lat_index),
+        'lon_index': ('cell', lon_index),
+    }
+    return coords, {'grid_latitude': lat_coords, 'grid_longitude': lon_coords}
+
+
+def scatter_to_grid(compact_array, lat_coords=None, lon_coords=None):
+    """
+    Scatter a compact (..., cell) array back onto the full latitude/longitude
+    grid, filling cells outside the mask with NaN.
+    """
+    if lat_coords is None:
+        lat_coords = compact_array.attrs['grid_latitude']
+    if lon_coords is None:
+        lon_coords = compact_array.attrs['grid_longitude']
+
+    leading_dims = [dim for dim in compact_array.dims if dim != 'cell']
+    compact_array = compact_array.transpose(*leading_dims, 'cell')
+    leading_shape = compact_array.shape[:-1]
+
+    grid = np.full(leading_shape + (len(lat_coords), len(lon_coords)), np.nan)
+    grid[..., compact_array['lat_index'].values, compact_array['lon_index'].values] = compact_array.values
+
+    coords = {dim: compact_array[dim].values for dim in leading_dims if dim in compact_array.coords}
+    coords.update({'latitude': lat_coords, 'longitude': lon_coords})
+    attrs = {key: value for key, value in compact_array.attrs.items()
+             if key not in ('grid_latitude', 'grid_longitude')}
+    return xr.DataArray(grid, coords=coords, dims=leading_dims + ['latitude', 'longitude'], attrs=attrs)
+
+
+def parse_bbox(text):
+    """
+    Parse a 'west,south,east,north' bounding box in degrees.
+    Longitudes use -180-180; west > east means the box crosses the antimeridian.
+    """
+    parts = text.split(',')
+    if len(parts) != 4:
+        raise ValueError(f"bbox '{text}' must have four values: west,south,east,north")
+    try:
+        west, south, east, north = (float(value) for value in parts)
+    except ValueError:
+        raise ValueError(f"bbox '{text}' must be four numbers: west,south,east,north") from None
+    if not np.all(np.isfinite([west, south, east, north])):
+        raise ValueError(f"bbox '{text}' must be finite")
+    if south > north:
+        raise ValueError(f"bbox south ({south}) is greater than north ({north})")
+    return west, south, east, north
+
+
+def region_slices(lat_coords, lon_coords, bbox):
+    """
+    Index slices selecting a bounding box from a grid.
+    Returns one latitude slice and a list of longitude slices ordered from
+    the west edge eastwards (two slices when the box wraps the grid seam).
+    """
+    west, south, east, north = bbox
+    lat_coords = np.asarray(lat_coords)
+    lon_converted = np.asarray(lon_coords)
+    lon_converted = np.where(lon_converted > 180, lon_converted - 360, lon_converted)
+
+    lat_index = np.where((lat_coords >= south) & (lat_coords <= north))[0]
+    # Distance east of the west edge handles boxes across the antimeridian
+    east_of_west = (lon_converted - west) % 360
+    lon_index = np.where(east_of_west <= (east - west) % 360)[0]
+    if len(lat_index) == 0 or (len(lon_index) == 0 and east - west < 360):
+        raise ValueError(f"bbox {bbox} contains no grid points")
+    lat_slice = slice(lat_index.min(), lat_index.max() + 1)
+    if east - west >= 360:
+        return lat_slice, [slice(0, len(lon_converted))]
+
+    lon_index = lon_index[np.argsort(east_of_west[lon_index], kind='stable')]
+    breaks = np.where(np.diff(lon_index) != 1)[0] + 1
+    lon_slices = [slice(run[0], run[-1] + 1) for run in np.split(lon_index, breaks)]
+    return lat_slice, lon_slices
+
+
+def subset_region(data, bbox):
+    """
+    Select a bounding box from a lazily opened Dataset or DataArray before
+    any values are read, so only the window is decoded and computed.
+    """
+    if bbox is None:
+        return data
+    lat_slice, lon_slices = region_slices(data.latitude.values, data.longitude.values, bbox)
+    pieces = [data.isel(latitude=lat_slice, longitude=lon_slice) for lon_slice in lon_slices]
+    return pieces[0] if len(pieces) == 1 else xr.concat(pieces, dim='longitude')
+
+
+def region_from_args(bbox=None, countries=None):
+    """
+    Resolve --bbox / --countries command line values into (bbox, country list).
+    Without --bbox, the box covers the listed countries. Raises ValueError
+    for a malformed box or unknown country codes.
+    """
+    country_list = [code.strip().upper() for code in countries.split(',')] if countries else None
+    if bbox:
+        return parse_bbox(bbox), country_list
+    if country_list:
+        from country_utils import countries_bbox
+        return countries_bbox(country_list), country_list
+    return None, None
+
+
+def add_region_arguments(parser):
+    """
+    Add the --bbox / --countries options shared by the processing and comparison stages.
+    """
+    parser.add_argument('--bbox', default=None,
+                        help="Only process 'west,south,east,north' (degrees, -180-180 longitudes)")
+    parser.add_argument('--countries', default=None,
+                        help="Only process these comma-separated ISO3 country codes, e.g. IND,PAK")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Load test for query_service.py.
+Opens a number of keep-alive connections and sends a random mix of point,
+bbox and country queries as fast as each connection allows, then reports
+throughput and p50/p99 latency per endpoint. Only successful (2xx)
+responses count towards latency; failed requests are reported per
+endpoint and status. With --start-server the service is started in this
+process first.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import numpy as np
+from country_utils import COUNTRY_BOUNDARIES
+
+ENDPOINTS = ('point', 'bbox', 'country')
+
+
+def random_query(rng, year, mix):
+    kind = rng.choices(ENDPOINTS, weights=mix)[0]
+    if kind == 'point':
+        return kind, f"/point?lat={rng.uniform(-60, 70):.3f}&lon={rng.uniform(-180, 180):.3f}&year={year}"
+    if kind == 'bbox':
+        west, south = rng.uniform(-180, 160), rng.uniform(-60, 50)
+        size = rng.uniform(2, 20)
+        return kind, f"/bbox?bbox={west:.2f},{south:.2f},{west + size:.2f},{south + size:.2f}&year={year}"
+    return kind, f"/country?code={rng.choice(list(COUNTRY_BOUNDARIES))}&year={year}"
+
+
+async def run_connection(host, port, queries, latencies, failures):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for kind, path in queries:
+            started = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+            await writer.drain()
+            status_line = await reader.readline()
+            parts = status_line.split()
+            status = int(parts[1]) if len(parts) > 1 and parts[1].isdigit() else 0
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':')[1])
+            await reader.readexactly(length)
+            if 200 <= status < 300:
+                latencies[kind].append(time.perf_counter() - started)
+            else:
+                failures[kind][status] = failures[kind].get(status, 0) + 1
+            if not status_line:
+                raise ConnectionError("service closed the connection")
+    finally:
+        writer.close()
+
+
+async def load_test(host, port, requests, concurrency, year, mix, seed=0):
+    rng = random.Random(seed)
+    queries = [random_query(rng, year, mix) for _ in range(requests)]
+    latencies = {kind: [] for kind in ENDPOINTS}
+    failures = {kind: {} for kind in ENDPOINTS}
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        run_connection(host, port, queries[i::concurrency], latencies, failures) for i in range(concurrency)
+    ))
+    return latencies, failures, time.perf_counter() - started
+
+
+def print_report(latencies, failures, elapsed):
+    total = sum(len(values) for values in latencies.values())
+    failed = sum(sum(counts.values()) for counts in failures.values())
+    print(f"\n📊 {total:,} successful requests in {elapsed:.2f}s ({total / elapsed:,.0f} req/s)")
+    if total:
+        print(f"  {'endpoint':<10} {'count':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        everything = np.concatenate([values for values in latencies.values() if values]) * 1000
+        rows = [(kind, np.asarray(values) * 1000) for kind, values in latencies.items() if values]
+        for kind, values in rows + [('all', everything)]:
+            print(f"  {kind:<10} {len(values):>7,} {np.percentile(values, 50):>8.2f} "
+                  f"{np.percentile(values, 99):>8.2f} {values.max():>8.2f}")
+    if failed:
+        print(f"❌ {failed:,} failed requests:")
+        for kind, counts in failures.items():
+            for status, count in sorted(counts.items()):
+                print(f"  {kind:<10} HTTP {status or '???'}: {count:,}")
+    return failed
+
+
+async def _main(args):
+    server = None
+    if args.start_server:
+        from query_service import start_service
+        service, server = await start_service([args.year], args.host, args.port, args.cache_mb)
+    try:
+        # Warm-up pass so the first chunk reads are not counted
+        await load_test(args.host, args.port, args.concurrency, args.concurrency, args.year, args.mix, seed=1)
+        latencies, failures, elapsed = await load_test(args.host, args.port, args.requests,
+                                                       args.concurrency, args.year, args.mix)
+    finally:
+        if server:
+            server.close()
+            await server.wait_closed()
+    failed = print_report(latencies, failures, elapsed)
+    if args.start_server:
+        print(f"  cache: {service.cache.stats()}")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure query_service.py latency under load")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32, help="Parallel keep-alive connections")
+    parser.add_argument('--year', type=int, default=2025)
+    parser.add_argument('--mix', type=float, nargs=3, default=[0.8, 0.15, 0.05],
+                        metavar=('POINT', 'BBOX', 'COUNTRY'), help="Relative weights of the query types")
+    parser.add_argument('--start-server', action='store_true', help="Run the service in this process")
+    parser.add_argument('--cache-mb', type=int, default=256)
+    args = parser.parse_args()
+
+    print(f"🚀 {args.requests:,} requests over {args.concurrency} connections to {args.host}:{args.port}")
+    try:
+        failed = asyncio.run(_main(args))
+    except ConnectionRefusedError:
+        print("❌ Service not reachable; start query_service.py or pass --start-server")
+        exit(1)
+    if failed:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the CDS API so fetch_era5.py can be exercised offline.
+Implements the parts of the legacy CDS protocol that cdsapi uses
+(status.json, POST /resources/<dataset>, GET /tasks/<id>) and serves a
+deterministic payload per request with HTTP Range support. It can drop
+connections part way through to simulate interrupted downloads, or stall
+them to let a client be killed mid-download.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_payload(request, size):
+    """
+    Deterministic bytes for a request, so repeated requests match.
+    """
+    seed = hashlib.sha256(json.dumps(request, sort_keys=True).encode()).digest()
+    blocks = (seed * (size // len(seed) + 1))[:size]
+    return b'GRIB' + blocks[4:] if size >= 4 else blocks
+
+
+class MockCDSServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding the mock CDS state.
+    payload_size: bytes served per request
+    queue_polls: how many task polls report 'queued' before 'completed'
+    interrupt_after: drop the first download of each result after this many bytes
+    stall_after: hold the first download of each result after this many
+    bytes until release() (or shutdown), then send the rest
+    Every download's Range header (None without one) is kept in downloads.
+    """
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), payload_size=4096, queue_polls=0, interrupt_after=None,
+                 stall_after=None):
+        super().__init__(address, MockCDSHandler)
+        self.payload_size = payload_size
+        self.queue_polls = queue_polls
+        self.interrupt_after = interrupt_after
+        self.stall_after = stall_after
+        self.released = threading.Event()
+        self.tasks = {}
+        self.requests = []
+        self.downloads = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/api/v2'
+
+    def start(self):
+        """
+        Serve in a background thread; returns the thread.
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def release(self):
+        """
+        Let stalled downloads finish.
+        """
+        self.released.set()
+
+    def shutdown(self):
+        self.release()
+        super().shutdown()
+
+
+class MockCDSHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, reply, status=200):
+        body = json.dumps(reply).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _task_reply(self, task_id):
+        task = self.server.tasks[task_id]
+        if task['polls'] < self.server.queue_polls:
+            task['polls'] += 1
+            return {'state': 'queued', 'request_id': task_id}
+        return {
+            'state': 'completed',
+            'request_id': task_id,
+            'location': f'/download/{task_id}.grib',
+            'content_length': len(task['payload']),
+            'content_type': 'application/x-grib',
+        }
+
+    def do_GET(self):
+        if self.path.endswith('/status.json'):
+            return self._send_json({'info': [], 'warning': []})
+
+        match = re.search(r'/tasks/([\w-]+)$', self.path)
+        if match and match.group(1) in self.server.tasks:
+            with self.server.lock:
+                return self._send_json(self._task_reply(match.group(1)))
+
+        match = re.search(r'/download/([\w-]+)\.grib$', self.path)
+        if match and match.group(1) in self.server.tasks:
+            return self._send_download(self.server.tasks[match.group(1)])
+
+        self._send_json({'message': f'Not found: {self.path}'}, status=404)
+
+    def _send_download(self, task):
+        payload = task['payload']
+        start = 0
+        range_header = self.headers.get('Range')
+        if range_header:
+            start = int(re.match(r'bytes=(\d+)-', range_header).group(1))
+        body = payload[start:]
+        with self.server.lock:
+            self.server.downloads.append(range_header)
+
+        self.send_response(206 if range_header else 200)
+        self.send_header('Content-Type', 'application/x-grib')
+        self.send_header('Content-Length', str(len(body)))
+        if range_header:
+            self.send_header('Content-Range', f'bytes {start}-{len(payload) - 1}/{len(payload)}')
+        self.end_headers()
+
+        with self.server.lock:
+            first = not task['interrupted']
+            task['interrupted'] = True
+        if first and self.server.interrupt_after is not None:
+            # Send part of the body, then drop the connection
+            self.wfile.write(body[:self.server.interrupt_after])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        if first and self.server.stall_after is not None:
+            # Send part of the body, then hold the connection open
+            self.wfile.write(body[:self.server.stall_after])
+            self.wfile.flush()
+            self.server.released.wait()
+            body = body[self.server.stall_after:]
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away while the download was held
+            self.close_connection = True
+
+    def do_POST(self):
+        match = re.search(r'/resources/([\w.-]+)$', self.path)
+        if not match:
+            return self._send_json({'message': f'Not found: {self.path}'}, status=404)
+
+        length = int(self.headers.get('Content-Length', 0))
+        request = json.loads(self.rfile.read(length) or b'{}')
+        task_id = uuid.uuid4().hex
+        with self.server.lock:
+            self.server.requests.append({'dataset': match.group(1), 'request': request})
+            self.server.tasks[task_id] = {
+                'payload': fake_payload(request, self.server.payload_size),
+                'polls': 0,
+                'interrupted': False,
+            }
+            reply = self._task_reply(task_id)
+        self._send_json(reply, status=202 if reply['state'] == 'queued' else 200)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock CDS API server")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--payload-size', type=int, default=1 << 20)
+    parser.add_argument('--interrupt-after', type=int, default=None,
+                        help="Drop the first download of each result after this many bytes")
+    args = parser.parse_args()
+
+    server = MockCDSServer(('127.0.0.1', args.port), args.payload_size, interrupt_after=args.interrupt_after)
+    print(f"🧪 Mock CDS API at {server.url} (use --key 0:mock)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
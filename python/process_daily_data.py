@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Reduce hourly heat index to daily maximum, minimum and mean fields.
+Reads the GRIB data a few days at a time so the full hourly heat index
+array is never held in memory, and writes a compact daily product that
+later stages can use instead of the full hourly series.
+"""
+
+import argparse
+import warnings
+import numpy as np
+import xarray as xr
+from heat_utils import (DATA_FILE, open_input_dataset, input_exists, calculate_heat_index, time_step_seconds,
+                        subset_region, add_region_arguments, region_from_args)
+from grib_inventory import year_message_count
+
+
+def solar_offsets(lon_coords, steps_per_day):
+    """
+    Number of time steps to add to UTC to get local solar time at each longitude.
+    """
+    lon = np.where(lon_coords > 180, lon_coords - 360, lon_coords)
+    return np.rint(lon / 360 * steps_per_day).astype(int)
+
+
+def reduce_daily(temp, dewpoint, year, day_boundary='utc', days_per_block=4):
+    """
+    Compute daily max/min/mean heat index for one year in a single pass
+    over blocks of days. Returns an xarray Dataset of float32 fields.
+    """
+    times = temp.time.values
+    step = time_step_seconds(times)
+    steps_per_day = 86400 // step
+    day0 = np.datetime64(f'{year}-01-01T00:00:00', 's')
+    n_days = int((np.datetime64(f'{year + 1}-01-01', 'D') - np.datetime64(f'{year}-01-01', 'D')).astype(int))
+
+    # Position of every time step relative to midnight UTC on Jan 1
+    step_index = ((times.astype('datetime64[s]') - day0).astype(np.int64) // step)
+
+    if day_boundary == 'solar':
+        offsets = solar_offsets(temp.longitude.values, steps_per_day)
+    else:
+        offsets = np.zeros(temp.sizes['longitude'], dtype=int)
+
+    n_lat = temp.sizes['latitude']
+    n_lon = temp.sizes['longitude']
+    daily = {
+        name: np.full((n_days, n_lat, n_lon), np.nan, dtype=np.float32)
+        for name in ('hi_max', 'hi_min', 'hi_mean')
+    }
+
+    for d0 in range(0, n_days, days_per_block):
+        d1 = min(d0 + days_per_block, n_days)
+
+        # UTC window that covers these local days for every longitude
+        w0 = d0 * steps_per_day - offsets.max()
+        w1 = d1 * steps_per_day - offsets.min()
+        i0, i1 = np.searchsorted(step_index, [w0, w1])
+
+        window = np.full((w1 - w0, n_lat, n_lon), np.nan)
+        if i1 > i0:
+            block_hi = calculate_heat_index(temp.isel(time=slice(i0, i1)).values,
+                                            dewpoint.isel(time=slice(i0, i1)).values,
+                                            verbose=(d0 == 0))
+            window[step_index[i0:i1] - w0] = block_hi
+
+        with warnings.catch_warnings():
+            # All-NaN days (no data or below the heat index range) stay NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            for offset in np.unique(offsets):
+                cols = np.where(offsets == offset)[0]
+                r0 = d0 * steps_per_day - offset - w0
+                r1 = d1 * steps_per_day - offset - w0
+                days = window[r0:r1][:, :, cols].reshape(d1 - d0, steps_per_day, n_lat, len(cols))
+                daily['hi_max'][d0:d1, :, cols] = np.nanmax(days, axis=1)
+                daily['hi_min'][d0:d1, :, cols] = np.nanmin(days, axis=1)
+                daily['hi_mean'][d0:d1, :, cols] = np.nanmean(days, axis=1)
+
+    dates = np.arange(np.datetime64(f'{year}-01-01'), np.datetime64(f'{year + 1}-01-01'))
+    coords = {'time': dates.astype('datetime64[ns]'),
+              'latitude': temp.latitude.values,
+              'longitude': temp.longitude.values}
+    dims = ('time', 'latitude', 'longitude')
+    long_names = {'hi_max': f'Daily Maximum Heat Index {year}',
+                  'hi_min': f'Daily Minimum Heat Index {year}',
+                  'hi_mean': f'Daily Mean Heat Index {year}'}
+
+    daily_ds = xr.Dataset({
+        name: xr.DataArray(values, coords=coords, dims=dims,
+                           attrs={'units': 'degrees_F', 'long_name': long_names[name]})
+        for name, values in daily.items()
+    })
+    daily_ds.attrs = {
+        'title': f'Daily Heat Index {year}',
+        'day_boundary': day_boundary,
+        'source_time_step_seconds': step,
+        'created_date': str(np.datetime64('now'))
+    }
+    return daily_ds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reduce hourly heat index to daily max/min/mean")
+    parser.add_argument('--year', type=int, required=True, help="Year to process")
+    parser.add_argument('--data-file', default=DATA_FILE,
+                        help="Input GRIB file, or a directory / glob of monthly GRIB or NetCDF files")
+    parser.add_argument('--day-boundary', choices=['utc', 'solar'], default='utc',
+                        help="Align days to UTC midnight or to local solar midnight")
+    parser.add_argument('--days-per-block', type=int, default=4,
+                        help="Number of days decoded and reduced at a time")
+    add_region_arguments(parser)
+    args = parser.parse_args()
+    try:
+        bbox, _ = region_from_args(args.bbox, args.countries)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"Processing {args.year} daily heat index from: {args.data_file}")
+
+    if not input_exists(args.data_file):
+        print(f"❌ Error: {args.data_file} not found!")
+        exit(1)
+
+    # Header-only check so a missing year fails before the full decode
+    if year_message_count(args.data_file, args.year) == 0:
+        print(f"❌ No {args.year} data found in dataset")
+        exit(1)
+
+    # Pad by half a day on both sides so solar days at the year edges are complete
+    period = slice(f'{args.year - 1}-12-31T12:00', f'{args.year + 1}-01-01T12:00')
+
+    ds = open_input_dataset(args.data_file, period.start, period.stop)
+    try:
+        ds = subset_region(ds, bbox)
+    except ValueError as e:
+        print(f"❌ {e}")
+        exit(1)
+    temp = ds['t2m'].sel(time=period)
+    dewpoint = ds['d2m'].sel(time=period)
+
+    if len(temp.time) == 0:
+        print(f"❌ No {args.year} data found in dataset")
+        exit(1)
+
+    print(f"Reducing {len(temp.time)} time steps to daily values ({args.day_boundary} days)...")
+    daily_ds = reduce_daily(temp, dewpoint, args.year, args.day_boundary, args.days_per_block)
+
+    output_file = f'heat_index_{args.year}_daily.nc'
+    daily_ds.to_netcdf(output_file)
+    print(f"✅ {args.year} daily heat index saved to '{output_file}'")
+
+    ds.close()
+    print(f"✅ {args.year} daily processing complete!")
+
+
+if __name__ == "__main__":
+    main()
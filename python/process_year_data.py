@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Process one year of ERA5 data into hourly and annual-average heat index.
+Used by process_2000_data.py / process_2025_data.py and for any other year
+needed by the trend stage.
+"""
+
+import argparse
+import os
+import numpy as np
+import xarray as xr
+from block_pipeline import run_pipeline, format_utilization
+from checkpoints import BlockCheckpoint
+from heat_utils import (DATA_FILE, INDICES, INDEX_NAMES, open_input_dataset, input_exists, calculate_indices,
+                        load_land_mask, cell_coords, scatter_to_grid,
+                        subset_region, add_region_arguments, region_from_args)
+from grib_inventory import year_message_count
+from seasons import PERIODS, time_months, accumulate_months, period_aggregates
+
+BLOCK_SIZE = 168  # time steps per checkpointed block (one week of hourly data)
+
+
+def checkpoint_dir(year):
+    return f'heat_index_{year}_checkpoint'
+
+
+def accumulate(state, blocks):
+    """
+    Add (time, ...) blocks of every index ({name: array}) to the running
+    per-cell <name>_sum, _count, _min and _max. NaN (undefined) values are
+    left out.
+    """
+    updated = {}
+    for name, block in blocks.items():
+        valid = ~np.isnan(block)
+        if state is None:
+            shape = block.shape[1:]
+            previous = {'sum': np.zeros(shape), 'count': np.zeros(shape, dtype=np.int64),
+                        'min': np.full(shape, np.inf), 'max': np.full(shape, -np.inf)}
+        else:
+            previous = {key: state[f'{name}_{key}'] for key in ('sum', 'count', 'min', 'max')}
+        updated[f'{name}_sum'] = previous['sum'] + np.where(valid, block, 0.0).sum(axis=0)
+        updated[f'{name}_count'] = previous['count'] + valid.sum(axis=0)
+        updated[f'{name}_min'] = np.minimum(previous['min'], np.where(valid, block, np.inf).min(axis=0))
+        updated[f'{name}_max'] = np.maximum(previous['max'], np.where(valid, block, -np.inf).max(axis=0))
+    return updated
+
+
+def period_dataset(series, state, indices, land_mask):
+    """
+    Monthly, seasonal and local warm season means and maxima of every
+    index, as <name>_mean / <name>_max variables along a period axis.
+    """
+    time_coords = [coord for coord in series['heat_index'].coords if 'time' in series['heat_index'][coord].dims]
+    template = series['heat_index'].isel(time=0).drop_vars(time_coords)
+    latitudes = template.latitude.broadcast_like(template).values
+    variables = {}
+    for name in indices:
+        means, maxima = period_aggregates(state, name, latitudes)
+        for statistic, values in (('mean', means), ('max', maxima)):
+            data = xr.DataArray(values, dims=('period',) + template.dims,
+                                coords={**template.coords, 'period': list(PERIODS)}, attrs=template.attrs)
+            if land_mask:
+                data = scatter_to_grid(data)
+            data.attrs = {'units': 'degrees_F', 'long_name': f'{INDEX_NAMES[name]} {statistic} by period'}
+            variables[f'{name}_{statistic}'] = data
+    return xr.Dataset(variables)
+
+
+def year_average(series, state, name, land_mask):
+    """
+    Annual average of one index from its accumulators, on the full grid.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        average = np.where(state[f'{name}_count'] > 0, state[f'{name}_sum'] / state[f'{name}_count'], np.nan)
+    time_coords = [coord for coord in series.coords if 'time' in series[coord].dims]
+    series_avg = series.isel(time=0).drop_vars(time_coords).copy(data=average)
+    if land_mask:
+        # Map products go back onto the full grid
+        series_avg = scatter_to_grid(series_avg)
+    return series_avg
+
+
+def process_year(year, data_file=DATA_FILE, land_mask=None, bbox=None, block_size=BLOCK_SIZE, resume=False,
+                 workers=2, max_in_flight=4, indices=('heat_index',), seasonal=False):
+    """
+    Calculate heat index for one year and save heat_index_<year>_avg.nc
+    and heat_index_<year>_full.nc.
+    Further thermal comfort indices (see heat_utils.INDICES) are computed
+    in the same pass and saved, with heat index, as the variables of
+    thermal_indices_<year>_avg.nc and thermal_indices_<year>_full.nc.
+    With seasonal, monthly, seasonal and local warm season means and maxima
+    are accumulated in the same pass and saved to heat_index_<year>_seasonal.nc.
+    Time is processed in blocks of block_size steps, each checkpointed to
+    heat_index_<year>_checkpoint/; with resume a crashed run continues after
+    the last completed block. Blocks flow through a read / compute / write
+    pipeline (block_pipeline.py) with `workers` compute threads and at most
+    max_in_flight blocks in memory.
+    With land_mask ('lsm' or 'world') only land cells are computed; the full
+    time series is stored on a compact 1-D cell axis and the average is
+    scattered back to the grid.
+    With bbox (west, south, east, north) only that window is read and computed.
+    """
+    print(f"Processing {year} heat index data from: {data_file}")
+
+    if not input_exists(data_file):
+        print(f"❌ Error: {data_file} not found!")
+        exit(1)
+
+    # Header-only check so a missing year fails before the full decode
+    if year_message_count(data_file, year) == 0:
+        print(f"❌ No {year} data found in dataset")
+        exit(1)
+
+    print("Loading and processing data...")
+    # Load the GRIB file using cfgrib engine
+    ds = open_input_dataset(data_file, f'{year}-01-01', f'{year}-12-31T23:59')
+    if bbox:
+        # Cut the window out before any values are decoded
+        try:
+            ds = subset_region(ds, bbox)
+        except ValueError as e:
+            print(f"❌ {e}")
+            exit(1)
+        print(f"Restricting to bbox {bbox}")
+
+    # Extract temperature and dewpoint data
+    temp = ds['t2m']  # 2m temperature in Kelvin
+    dewpoint = ds['d2m']  # 2m dewpoint temperature in Kelvin
+
+    print(f"Data shape: {temp.shape}")
+    print(f"Time range: {temp.time.values[0]} to {temp.time.values[-1]}")
+
+    # Extract only this year's data
+    temp_year = temp.sel(time=slice(f'{year}-01-01', f'{year}-12-31'))
+    dewpoint_year = dewpoint.sel(time=slice(f'{year}-01-01', f'{year}-12-31'))
+
+    print(f"{year} data shape: {temp_year.shape}")
+
+    if len(temp_year.time) == 0:
+        print(f"❌ No {year} data found in dataset")
+        exit(1)
+
+    if land_mask:
+        # Only land cells are read from each block, onto a compact cell axis
+        mask = load_land_mask(ds, land_mask)
+        print(f"Keeping {mask.sum():,} of {mask.size:,} grid cells ({mask.mean() * 100:.1f}% land)")
+        lat_index, lon_index = np.nonzero(mask)
+        temp_year = temp_year.transpose('time', 'latitude', 'longitude')
+        dewpoint_year = dewpoint_year.transpose('time', 'latitude', 'longitude')
+        coords, grid_attrs = cell_coords(temp_year, mask)
+        dims = ('time', 'cell')
+    else:
+        coords, grid_attrs, dims = temp_year.coords, {}, temp_year.dims
+
+    n_times = temp_year.sizes['time']
+    block_starts = range(0, n_times, block_size)
+    config = {
+        'year': year,
+        'data_file': os.path.abspath(data_file),
+        'data_mtime': os.path.getmtime(data_file) if os.path.isfile(data_file) else None,
+        'land_mask': land_mask,
+        'bbox': list(bbox) if bbox else None,
+        'block_size': block_size,
+        'indices': list(indices),
+        'seasonal': seasonal,
+        'times': [str(temp_year.time.values[0]), str(temp_year.time.values[-1]), n_times],
+        'shape': [int(mask.sum())] if land_mask else list(temp_year.shape[1:]),
+    }
+    try:
+        checkpoint = BlockCheckpoint(checkpoint_dir(year), config, len(block_starts), resume)
+    except ValueError as e:
+        print(f"❌ Cannot resume: {e}")
+        print("💡 Run without --resume to start over")
+        exit(1)
+    if checkpoint.completed:
+        print(f"♻️ Resuming after block {checkpoint.completed} of {len(block_starts)}")
+
+    print(f"Calculating {', '.join(indices)} for {year} in blocks of {block_size} time steps...")
+    accumulators = {'state': checkpoint.state}
+    months = time_months(temp_year.time.values)
+
+    def read_block(task):
+        _, start = task
+        temp_block = temp_year.isel(time=slice(start, start + block_size)).values
+        dewpoint_block = dewpoint_year.isel(time=slice(start, start + block_size)).values
+        if land_mask:
+            temp_block = temp_block[:, lat_index, lon_index]
+            dewpoint_block = dewpoint_block[:, lat_index, lon_index]
+        return temp_block, dewpoint_block
+
+    def compute_block(task, data):
+        return calculate_indices(*data, indices, verbose=task[0] == 0)
+
+    def write_block(task, blocks):
+        # Blocks arrive in order, so accumulation matches a serial run exactly
+        block, start = task
+        state = accumulate(accumulators['state'], blocks)
+        if seasonal:
+            for name, values in blocks.items():
+                state.update(accumulate_months(accumulators['state'], name, values,
+                                               months[start:start + block_size]))
+        accumulators['state'] = state
+        checkpoint.commit(block, blocks, accumulators['state'])
+        print(f"  block {block + 1}/{len(block_starts)} done")
+
+    remaining = [(block, start) for block, start in enumerate(block_starts) if block >= checkpoint.completed]
+    stats = run_pipeline(remaining, read_block, compute_block, write_block, workers, max_in_flight)
+    state = accumulators['state']
+    print("✅ Heat index calculation successful")
+    print(format_utilization(stats))
+
+    # Reassemble each series from the checkpointed blocks
+    series = {}
+    averages = {}
+    for name in indices:
+        series[name] = xr.DataArray(
+            checkpoint.load_outputs(name),
+            coords=coords,
+            dims=dims,
+            attrs={'units': 'degrees_F', 'long_name': f'{INDEX_NAMES[name]} {year}'}
+        )
+        # Keep the grid definition with a compact series
+        series[name].attrs.update(grid_attrs)
+        # Average for the year from the accumulators
+        averages[name] = year_average(series[name], state, name, land_mask)
+        averages[name].attrs = {'units': 'degrees_F', 'long_name': f'Average {INDEX_NAMES[name]} {year}'}
+    hi_year, hi_year_avg = series['heat_index'], averages['heat_index']
+
+    print("Heat index calculation complete!")
+    for name in indices:
+        print(f"{year} {INDEX_NAMES[name].lower()} range: {np.min(state[f'{name}_min']):.1f}°F to "
+              f"{np.max(state[f'{name}_max']):.1f}°F, average {averages[name].mean().values:.1f}°F")
+
+    # Save results
+    hi_year_avg.to_netcdf(f'heat_index_{year}_avg.nc')
+    hi_year.to_netcdf(f'heat_index_{year}_full.nc')
+
+    print(f"✅ {year} average data saved to 'heat_index_{year}_avg.nc'")
+    print(f"✅ {year} full time series saved to 'heat_index_{year}_full.nc'")
+    if seasonal:
+        period_dataset(series, state, indices, land_mask).to_netcdf(f'heat_index_{year}_seasonal.nc')
+        print(f"✅ {year} monthly and seasonal aggregates saved to 'heat_index_{year}_seasonal.nc'")
+    if len(indices) > 1:
+        xr.Dataset(averages).to_netcdf(f'thermal_indices_{year}_avg.nc')
+        xr.Dataset(series).to_netcdf(f'thermal_indices_{year}_full.nc')
+        print(f"✅ {year} averages of {', '.join(indices)} saved to 'thermal_indices_{year}_avg.nc'")
+        print(f"✅ {year} full series of {', '.join(indices)} saved to 'thermal_indices_{year}_full.nc'")
+
+    # Clean up
+    ds.close()
+    checkpoint.remove()
+    print(f"✅ {year} data processing complete!")
+
+
+def main(year=None):
+    parser = argparse.ArgumentParser(description="Process one year of heat index data")
+    parser.add_argument('--year', type=int, default=year, required=year is None, help="Year to process")
+    parser.add_argument('--data-file', default=DATA_FILE,
+                        help="Input GRIB file, or a directory / glob of monthly GRIB or NetCDF files")
+    parser.add_argument('--land-only', action='store_true',
+                        help="Compute and store land cells only")
+    parser.add_argument('--land-mask', choices=['world', 'lsm'], default='world',
+                        help="Land mask source: world-110m.json polygons or the ERA5 'lsm' field")
+    parser.add_argument('--block-size', type=int, default=BLOCK_SIZE, help="Time steps per checkpointed block")
+    parser.add_argument('--resume', action='store_true', help="Continue from the last completed checkpoint block")
+    parser.add_argument('--workers', type=int, default=2, help="Heat index compute threads")
+    parser.add_argument('--max-in-flight', type=int, default=4,
+                        help="Blocks read ahead but not yet written (bounds memory)")
+    parser.add_argument('--indices', nargs='+', choices=INDICES, default=['heat_index'],
+                        help="Thermal comfort indices to compute (heat index is always included)")
+    parser.add_argument('--seasonal', action='store_true',
+                        help="Also accumulate monthly, seasonal and local warm season means and maxima")
+    add_region_arguments(parser)
+    args = parser.parse_args()
+    for name in ('block_size', 'workers', 'max_in_flight'):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name.replace('_', '-')} must be at least 1")
+    try:
+        bbox, _ = region_from_args(args.bbox, args.countries)
+    except ValueError as e:
+        parser.error(str(e))
+    indices = ['heat_index'] + [name for name in INDICES if name in args.indices and name != 'heat_index']
+
+    process_year(args.year, args.data_file, args.land_mask if args.land_only else None, bbox,
+                 args.block_size, args.resume, args.workers, args.max_in_flight, indices, args.seasonal)
+
+
+if __name__ == "__main__":
+    main()
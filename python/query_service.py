@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Local HTTP query service over the processed heat index series.
+Each heat_index_<year>_full.nc is converted once into a memory-mapped
+(latitude, longitude, time) float32 store next to it, read in chunks of
+a square of cells by a block of time steps, so a request only reads the
+time blocks its period touches. Decoded chunks are kept in an LRU cache,
+and concurrent requests for the same chunk wait on a single read. Box
+statistics are reduced one time block at a time.
+
+Endpoints (JSON):
+  /point?lat=&lon=&year=[&start=&end=]      time series of the nearest cell
+  /bbox?bbox=west,south,east,north&year=[&start=&end=]   mean over a box
+  /country?code=ISO3&year=[&start=&end=]    mean/min/max over a country box
+  /health                                   cache statistics
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qs
+import numpy as np
+import xarray as xr
+from country_utils import COUNTRY_BOUNDARIES
+from grid_lookup import GridIndex
+from heat_utils import parse_bbox, region_slices, scatter_to_grid
+
+CACHE_DIR = '.query_cache'
+CHUNK_CELLS = 16
+TIME_BLOCK = 744  # time steps per chunk, a month of hourly data
+
+
+def series_file(year):
+    return f'heat_index_{year}_full.nc'
+
+
+def build_store(source, store_dir=CACHE_DIR, block_size=168):
+    """
+    Write a (latitude, longitude, time) float32 copy of a full series for
+    memory mapping, plus a JSON sidecar with its coordinates. Rebuilt only
+    when the source is newer than the store.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(source))[0]
+    data_path = os.path.join(store_dir, name + '.npy')
+    meta_path = os.path.join(store_dir, name + '.json')
+    if os.path.exists(meta_path) and os.path.getmtime(meta_path) >= os.path.getmtime(source):
+        return data_path, meta_path
+
+    with xr.open_dataarray(source) as series:
+        compact = 'cell' in series.dims
+        if compact:
+            lat = np.asarray(series.attrs['grid_latitude'])
+            lon = np.asarray(series.attrs['grid_longitude'])
+        else:
+            series = series.transpose('time', 'latitude', 'longitude')
+            lat, lon = series.latitude.values, series.longitude.values
+        times = series.time.values
+        store = np.lib.format.open_memmap(data_path + '.tmp', mode='w+', dtype=np.float32,
+                                          shape=(len(lat), len(lon), len(times)))
+        for start in range(0, len(times), block_size):
+            block = series.isel(time=slice(start, start + block_size))
+            if compact:
+                block = scatter_to_grid(block, lat, lon)
+            store[:, :, start:start + block.sizes['time']] = np.moveaxis(block.values, 0, -1)
+        store.flush()
+        del store
+
+    os.replace(data_path + '.tmp', data_path)
+    with open(meta_path, 'w') as f:
+        json.dump({'latitude': lat.tolist(), 'longitude': lon.tolist(),
+                   'time': [str(t) for t in times.astype('datetime64[s]')]}, f)
+    return data_path, meta_path
+
+
+class ChunkStore:
+    """
+    Memory-mapped series of one year with an LRU cache of decoded chunks.
+    """
+
+    def __init__(self, data_path, meta_path, cache, chunk_cells=CHUNK_CELLS, time_block=TIME_BLOCK):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        self.latitude = np.asarray(meta['latitude'])
+        self.longitude = np.asarray(meta['longitude'])
+        self.time_labels = meta['time']
+        self.times = np.asarray(meta['time'], dtype='datetime64[s]')
+        self.grid = GridIndex(self.latitude, self.longitude)
+        self.data = np.load(data_path, mmap_mode='r')
+        self.cache = cache
+        self.chunk_cells = chunk_cells
+        self.time_block = time_block
+        self.key = data_path
+
+    def nearest_cell(self, lat, lon):
+        rows, cols, valid = self.grid.cell_indices([lat], [lon])
+        if not valid[0]:
+            raise ValueError(f"point ({lat}, {lon}) is outside the grid")
+        return int(rows[0]), int(cols[0])
+
+    def time_slice(self, start=None, end=None):
+        """
+        Time steps in [start, end]; like xarray, a date-only end includes
+        the whole day (or month, year).
+        """
+        first = np.searchsorted(self.times, np.datetime64(start).astype('datetime64[s]')) if start else 0
+        last = len(self.times)
+        if end:
+            end = np.datetime64(end)
+            # One unit past the end at the string's own precision
+            last = np.searchsorted(self.times, (end + 1).astype('datetime64[s]'))
+        return slice(int(first), int(max(first, last)))
+
+    def read_chunk(self, chunk):
+        """
+        Copy one chunk of cells and time steps out of the memory map.
+        """
+        row, col, block = chunk
+        size, steps = self.chunk_cells, self.time_block
+        return np.array(self.data[row * size:(row + 1) * size, col * size:(col + 1) * size,
+                                  block * steps:(block + 1) * steps])
+
+    async def chunk(self, chunk):
+        return await self.cache.get((self.key, chunk), lambda: self.read_chunk(chunk))
+
+    async def blocks(self, rows, cols, period):
+        """
+        For each time block in period, the (row position, column position,
+        period offset, values) parts of the chunks the cells touch; values
+        holds only the block's steps inside period.
+        """
+        rows = np.asarray(rows)
+        cols = np.asarray(cols)
+        size, steps = self.chunk_cells, self.time_block
+        row_chunks = [(chunk, np.flatnonzero(rows // size == chunk)) for chunk in np.unique(rows // size)]
+        col_chunks = [(chunk, np.flatnonzero(cols // size == chunk)) for chunk in np.unique(cols // size)]
+        for block in range(period.start // steps, -(-period.stop // steps)):
+            t0 = max(period.start - block * steps, 0)
+            t1 = min(period.stop - block * steps, steps)
+            keys = [(row_chunk, col_chunk, block) for row_chunk, _ in row_chunks for col_chunk, _ in col_chunks]
+            chunks = iter(await asyncio.gather(*(self.chunk(key) for key in keys)))
+            parts = []
+            for _, row_pos in row_chunks:
+                for _, col_pos in col_chunks:
+                    chunk = next(chunks)[:, :, t0:t1]
+                    parts.append((row_pos, col_pos, block * steps + t0 - period.start,
+                                  chunk[np.ix_(rows[row_pos] % size, cols[col_pos] % size)]))
+            yield parts
+
+    async def cells(self, rows, cols, period=slice(None)):
+        """
+        (len(rows), len(cols), time) values of the time steps in period,
+        gathered from the chunks they touch.
+        """
+        period = slice(*period.indices(len(self.times)))
+        values = np.empty((len(rows), len(cols), period.stop - period.start), dtype=np.float32)
+        async for parts in self.blocks(rows, cols, period):
+            for row_pos, col_pos, offset, part in parts:
+                values[row_pos[:, None], col_pos, offset:offset + part.shape[2]] = part
+        return values
+
+    async def summary(self, rows, cols, period=slice(None)):
+        """
+        Mean, min, max and count of the non-NaN values of the cells over
+        period, reduced one time block at a time.
+        """
+        period = slice(*period.indices(len(self.times)))
+        total, count, low, high = 0.0, 0, np.inf, -np.inf
+        async for parts in self.blocks(rows, cols, period):
+            for _, _, _, part in parts:
+                finite = part[~np.isnan(part)]
+                if finite.size:
+                    total += float(finite.sum(dtype=np.float64))
+                    count += int(finite.size)
+                    low = min(low, float(finite.min()))
+                    high = max(high, float(finite.max()))
+        if count == 0:
+            return {'mean': None, 'min': None, 'max': None, 'count': 0}
+        return {'mean': total / count, 'min': low, 'max': high, 'count': count}
+
+
+class ChunkCache:
+    """
+    Byte-bounded LRU cache. Concurrent misses for the same key share one
+    read, which runs in the default thread pool.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.pending = {}
+        self.bytes = 0
+        self.hits = self.misses = self.shared = 0
+
+    async def get(self, key, load):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        if key in self.pending:
+            self.shared += 1
+            return await self.pending[key]
+
+        self.misses += 1
+        future = asyncio.get_running_loop().run_in_executor(None, load)
+        self.pending[key] = future
+        try:
+            value = await future
+        finally:
+            del self.pending[key]
+        self.entries[key] = value
+        self.bytes += value.nbytes
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= evicted.nbytes
+        return value
+
+    def stats(self):
+        return {'chunks': len(self.entries), 'bytes': self.bytes, 'hits': self.hits,
+                'misses': self.misses, 'shared_reads': self.shared}
+
+
+def finite_param(params, name):
+    """
+    A query parameter as a finite float; ValueError otherwise.
+    """
+    value = float(params[name])
+    if not np.isfinite(value):
+        raise ValueError(f"{name} must be finite, got {params[name]}")
+    return value
+
+
+class QueryService:
+
+    def __init__(self, years, cache_mb=256, store_dir=CACHE_DIR, chunk_cells=CHUNK_CELLS):
+        self.cache = ChunkCache(cache_mb * 1024 * 1024)
+        self.stores = {}
+        for year in years:
+            data_path, meta_path = build_store(series_file(year), store_dir)
+            self.stores[year] = ChunkStore(data_path, meta_path, self.cache, chunk_cells)
+
+    def store(self, params):
+        year = int(params.get('year', max(self.stores)))
+        if year not in self.stores:
+            raise ValueError(f"year {year} is not loaded")
+        return self.stores[year]
+
+    async def point(self, params):
+        store = self.store(params)
+        row, col = store.nearest_cell(finite_param(params, 'lat'), finite_param(params, 'lon'))
+        period = store.time_slice(params.get('start'), params.get('end'))
+        values = (await store.cells([row], [col], period))[0, 0]
+        return {
+            'latitude': float(store.latitude[row]), 'longitude': float(store.longitude[col]),
+            'time': store.time_labels[period],
+            'heat_index': [None if v != v else v for v in np.round(values.astype(float), 2).tolist()],
+        }
+
+    async def bbox(self, params):
+        store = self.store(params)
+        lat_slice, lon_slices = region_slices(store.latitude, store.longitude, parse_bbox(params['bbox']))
+        rows = np.arange(lat_slice.start, lat_slice.stop)
+        cols = np.concatenate([np.arange(s.start, s.stop) for s in lon_slices])
+        period = store.time_slice(params.get('start'), params.get('end'))
+        return {'bbox': params['bbox'], 'cells': int(len(rows) * len(cols)),
+                **(await store.summary(rows, cols, period))}
+
+    async def country(self, params):
+        code = params['code'].upper()
+        if code not in COUNTRY_BOUNDARIES:
+            raise ValueError(f"unknown country {code}")
+        bounds = COUNTRY_BOUNDARIES[code]
+        params = dict(params, bbox=f"{bounds['lon'][0]},{bounds['lat'][0]},{bounds['lon'][1]},{bounds['lat'][1]}")
+        return {'country_code': code, **(await self.bbox(params))}
+
+    async def handle(self, path):
+        url = urlsplit(path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        routes = {'/point': self.point, '/bbox': self.bbox, '/country': self.country}
+        if url.path == '/health':
+            return 200, {'years': sorted(self.stores), 'cache': self.cache.stats()}
+        if url.path not in routes:
+            return 404, {'error': f'unknown endpoint {url.path}'}
+        try:
+            return 200, await routes[url.path](params)
+        except KeyError as e:
+            return 400, {'error': f'missing parameter {e.args[0]}'}
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            print(f"⚠️ {path} failed: {type(e).__name__}: {e}")
+            return 500, {'error': f'internal error: {type(e).__name__}'}
+
+    async def serve_connection(self, reader, writer):
+        """
+        Minimal HTTP/1.1 GET handling with keep-alive.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = line.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+
+                parts = request_line.decode('latin-1').split()
+                if len(parts) < 2 or parts[0] != 'GET':
+                    status, reply = 405, {'error': 'only GET is supported'}
+                else:
+                    status, reply = await self.handle(parts[1])
+
+                body = json.dumps(reply, separators=(',', ':')).encode()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+
+async def start_service(years, host='127.0.0.1', port=8090, cache_mb=256, chunk_cells=CHUNK_CELLS):
+    """
+    Build the stores and start listening; returns (service, asyncio server).
+    """
+    service = QueryService(years, cache_mb, chunk_cells=chunk_cells)
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    return service, server
+
+
+async def _serve(args):
+    started = time.perf_counter()
+    service, server = await start_service(args.years, args.host, args.port, args.cache_mb, args.chunk_cells)
+    for year, store in service.stores.items():
+        print(f"  {year}: {store.data.shape[0]} x {store.data.shape[1]} cells, {store.data.shape[2]} time steps")
+    print(f"✅ Serving on http://{args.host}:{args.port} (ready in {time.perf_counter() - started:.1f}s)")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve point, bbox and country queries over processed series")
+    parser.add_argument('--years', type=int, nargs='+', default=[2000, 2025])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--cache-mb', type=int, default=256, help="Decoded chunk cache size")
+    parser.add_argument('--chunk-cells', type=int, default=CHUNK_CELLS,
+                        help="Chunk edge length in grid cells")
+    args = parser.parse_args()
+
+    missing = [series_file(year) for year in args.years if not os.path.exists(series_file(year))]
+    if missing:
+        print("❌ Missing required files:")
+        for f in missing:
+            print(f"  - {f}")
+        print("\n💡 Please run process_year_data.py for these years first")
+        exit(1)
+
+    print(f"🔄 Preparing memory-mapped stores for {', '.join(map(str, args.years))}...")
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+
+
+if __name__ == "__main__":
+    main()
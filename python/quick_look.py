@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Quick-look preview of the 2000 vs 2025 comparison.
+Runs the same heat index, comparison and country steps as the full
+pipeline on a strided sample of the time axis (and optionally a coarser
+grid), and reports estimated error bounds against the full-resolution
+averages. Results go to a separate directory so full outputs are kept.
+"""
+
+import argparse
+import json
+import os
+import time
+import numpy as np
+import xarray as xr
+from country_utils import aggregate_by_country, country_comparison_table
+from heat_utils import (DATA_FILE, open_input_dataset, input_exists, calculate_heat_index,
+                        subset_region, add_region_arguments, region_from_args)
+from grib_collection import is_collection
+from grib_inventory import year_message_counts
+
+YEARS = (2000, 2025)
+Z_95 = 1.96
+
+
+def sample_year(ds, year, time_stride, coarsen, bbox=None):
+    """
+    Strided sample of one year: every time_stride-th step and every
+    coarsen-th grid point. Returns (temp, dewpoint, total time steps).
+    """
+    if bbox:
+        ds = subset_region(ds, bbox)
+    ds = ds.sel(time=slice(f'{year}-01-01', f'{year}-12-31'))
+    n_total = ds.sizes['time']
+    # Only the selected steps and points are decoded
+    ds = ds.isel(time=slice(None, None, time_stride),
+                 latitude=slice(None, None, coarsen), longitude=slice(None, None, coarsen))
+    return ds['t2m'], ds['d2m'], n_total
+
+
+def sampled_average(temp, dewpoint, n_total, year):
+    """
+    Per-cell average heat index of a time sample and its standard error
+    as an estimate of the full-resolution average.
+    """
+    fahrenheit_hi = calculate_heat_index(temp.values, dewpoint.values, verbose=False)
+    n_sampled = np.sum(~np.isnan(fahrenheit_hi), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.nanmean(fahrenheit_hi, axis=0)
+        std = np.nanstd(fahrenheit_hi, axis=0, ddof=1)
+        # Finite population correction: the sample is drawn from n_total steps
+        fpc = np.sqrt(np.clip(1 - temp.sizes['time'] / n_total, 0, 1))
+        stderr = std / np.sqrt(n_sampled) * fpc
+    # A single defined value gives no spread estimate
+    stderr = np.where(n_sampled > 1, stderr, np.nan)
+
+    coords = {'latitude': temp.latitude.values, 'longitude': temp.longitude.values}
+    dims = ('latitude', 'longitude')
+    hi_avg = xr.DataArray(mean, coords=coords, dims=dims,
+                          attrs={'units': 'degrees_F', 'long_name': f'Average Heat Index {year} (quick look)'})
+    hi_stderr = xr.DataArray(stderr, coords=coords, dims=dims,
+                             attrs={'units': 'degrees_F', 'long_name': f'Sampling standard error {year}'})
+    return hi_avg, hi_stderr
+
+
+def country_error_bounds(stderr_2000, stderr_2025, hi_difference, countries=None, coarsen=1):
+    """
+    95% error bound on each country's difference.
+    Time sampling: mean of the per-cell standard errors, which assumes
+    errors are fully correlated within a country (an upper bound).
+    Grid coarsening: standard error of the country mean from the spread of
+    the sampled cells.
+    """
+    diff_stderr = np.sqrt(stderr_2000 ** 2 + stderr_2025 ** 2)
+    time_errors = aggregate_by_country(diff_stderr, countries)
+    spread = aggregate_by_country(hi_difference, countries) if coarsen > 1 else {}
+
+    bounds = {}
+    for country, stats in time_errors.items():
+        error = stats['mean'] ** 2
+        if country in spread:
+            kept = 1 / coarsen ** 2
+            error += spread[country]['std'] ** 2 / spread[country]['count'] * (1 - kept)
+        bounds[country] = Z_95 * np.sqrt(error)
+    return bounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast preview of the 2000 vs 2025 heat index comparison")
+    parser.add_argument('--data-file', default=DATA_FILE,
+                        help="Input GRIB file, or a directory / glob of monthly GRIB or NetCDF files")
+    parser.add_argument('--time-stride', type=int, default=13,
+                        help="Use every Nth time step; a stride coprime with 24 cycles through all hours")
+    parser.add_argument('--coarsen', type=int, default=1,
+                        help="Use every Nth grid point in latitude and longitude")
+    parser.add_argument('--output-dir', default='quick_look', help="Directory for the preview outputs")
+    add_region_arguments(parser)
+    args = parser.parse_args()
+    try:
+        bbox, selected_countries = region_from_args(args.bbox, args.countries)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.time_stride < 1 or args.coarsen < 1:
+        print("❌ --time-stride and --coarsen must be at least 1")
+        exit(1)
+
+    print(f"⚡ Quick look: every {args.time_stride} time step(s), every {args.coarsen} grid point(s)")
+    started = time.perf_counter()
+
+    if not input_exists(args.data_file):
+        print(f"❌ Error: {args.data_file} not found!")
+        exit(1)
+
+    # One header scan covers both years
+    counts = year_message_counts(args.data_file)
+    missing = [year for year in YEARS if counts is not None and counts.get(year, 0) == 0]
+    if missing:
+        print(f"❌ No {missing[0]} data found in dataset")
+        exit(1)
+
+    # A single file is opened (and indexed) once for both years
+    shared_ds = None if is_collection(args.data_file) else open_input_dataset(args.data_file)
+
+    averages = {}
+    stderrs = {}
+    for year in YEARS:
+        ds = shared_ds
+        if ds is None:
+            ds = open_input_dataset(args.data_file, f'{year}-01-01', f'{year}-12-31T23:59')
+        try:
+            temp, dewpoint, n_total = sample_year(ds, year, args.time_stride, args.coarsen, bbox)
+        except ValueError as e:
+            print(f"❌ {e}")
+            exit(1)
+        if n_total == 0:
+            print(f"❌ No {year} data found in dataset")
+            exit(1)
+        print(f"{year}: sampled {temp.sizes['time']} of {n_total} time steps on a "
+              f"{temp.sizes['latitude']} x {temp.sizes['longitude']} grid")
+        averages[year], stderrs[year] = sampled_average(temp, dewpoint, n_total, year)
+
+    hi_2000_avg, hi_2025_avg = averages[2000], averages[2025]
+    hi_difference = hi_2025_avg - hi_2000_avg
+    hi_difference.attrs = {'units': 'degrees_F', 'long_name': 'Heat Index Change (2025 - 2000, quick look)'}
+
+    country_df = country_comparison_table(hi_2000_avg, hi_2025_avg, hi_difference, selected_countries)
+    bounds = country_error_bounds(stderrs[2000], stderrs[2025], hi_difference, selected_countries, args.coarsen)
+    country_df['difference_error_95'] = country_df['country_code'].map(bounds)
+
+    cell_error = Z_95 * np.sqrt(stderrs[2000] ** 2 + stderrs[2025] ** 2)
+    print(f"\n📈 Average change: {hi_difference.mean().values:.2f}°F "
+          f"(median cell error ±{float(cell_error.median()):.2f}°F)")
+    print(f"\n🏆 Top 10 Countries with Highest Warming (preview):")
+    for i, (_, row) in enumerate(country_df.head(10).iterrows()):
+        print(f"{i+1:2d}. {row['country_name']:<20} {row['difference']:+.1f}°F "
+              f"± {row['difference_error_95']:.1f}°F")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    country_df.to_csv(os.path.join(args.output_dir, 'heat_index_by_country.csv'), index=False)
+    with open(os.path.join(args.output_dir, 'heat_index_by_country.json'), 'w') as f:
+        json.dump(country_df.to_dict('records'), f, indent=2)
+    xr.Dataset({
+        'heat_index_2000': hi_2000_avg,
+        'heat_index_2025': hi_2025_avg,
+        'difference_2025_minus_2000': hi_difference,
+        'difference_error_95': cell_error,
+    }, attrs={
+        'title': 'Heat Index Comparison: 2000 vs 2025 (quick look)',
+        'time_stride': args.time_stride,
+        'coarsen': args.coarsen,
+    }).to_netcdf(os.path.join(args.output_dir, 'heat_index_comparison_quick.nc'))
+
+    print(f"\n✅ Preview saved to '{args.output_dir}/' in {time.perf_counter() - started:.1f}s")
+    print("💡 Error bounds are 95% estimates of the gap to the full-resolution averages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Reverse-geocode points to countries using the world-110m.json polygons.
+A uniform cell index over the globe is the prefilter: cells that no
+border or coastline passes through are resolved once at build time, so
+most points are answered with a single lookup. Points in border cells are
+refined with an exact even-odd point-in-polygon test (rays cast north,
+as in world_geometry), vectorized over the edges that cross the point's
+longitude column. Codes come from
+country-id-mapping.json, the same mapping the web app uses.
+"""
+
+import argparse
+import os
+import time
+import numpy as np
+from export_country_columns import MAPPING_FILE, load_id_mapping
+from world_geometry import WORLD_FILE, load_topology, object_geometries, ring_edges, rasterize_object
+
+MIXED = -2
+# Upper bound on (point, edge) pairs tested at once during refinement
+PAIR_BUDGET = 4_000_000
+
+
+def _normalize(lats, lons):
+    lats = np.asarray(lats, dtype=float)
+    lons = (np.asarray(lons, dtype=float) + 180) % 360 - 180
+    return lats, lons
+
+
+def _cell_ranges(low, high, origin, cell_size, n_cells):
+    first = np.clip(np.floor((low - origin) / cell_size).astype(np.int64), 0, n_cells - 1)
+    last = np.clip(np.floor((high - origin) / cell_size).astype(np.int64), 0, n_cells - 1)
+    return first, last
+
+
+class CountryLocator:
+    """
+    Point-to-country index over the polygons of a TopoJSON object.
+    """
+
+    def __init__(self, path=WORLD_FILE, mapping_file=MAPPING_FILE, cell_size=0.5):
+        geometries = object_geometries(load_topology(path), 'countries')
+        id_mapping = load_id_mapping(mapping_file)
+        self.ids = [geometry_id for geometry_id, _ in geometries]
+        self.codes = np.array([id_mapping.get(geometry_id) for geometry_id in self.ids] + [None], dtype=object)
+        self.cell_size = cell_size
+        self.n_rows = int(round(180 / cell_size))
+        self.n_cols = int(round(360 / cell_size))
+
+        # Every polygon edge, tagged with the geometry it belongs to
+        x0, y0, x1, y1, owner = [], [], [], [], []
+        for position, (_, rings) in enumerate(geometries):
+            edges = ring_edges(rings)
+            for values, edge_values in zip((x0, y0, x1, y1), edges):
+                values.append(edge_values)
+            owner.append(np.full(len(edges[0]), position))
+        self.x0, self.y0, self.x1, self.y1, self.owner = (np.concatenate(a) for a in (x0, y0, x1, y1, owner))
+
+        self._build_column_edges()
+        self._build_cells()
+
+    def _build_column_edges(self):
+        """
+        CSR lists of the edges spanning each longitude column, sorted by geometry.
+        """
+        # Vertical edges never cross a north-pointing ray
+        sloped = np.nonzero(self.x0 != self.x1)[0]
+        x0, x1 = self.x0[sloped], self.x1[sloped]
+        first, last = _cell_ranges(np.minimum(x0, x1), np.maximum(x0, x1), -180, self.cell_size, self.n_cols)
+        counts = last - first + 1
+        edge = np.repeat(sloped, counts)
+        col = np.repeat(first, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+        order = np.lexsort((self.owner[edge], col))
+        self.col_edge = edge[order]
+        self.col_offsets = np.searchsorted(col[order], np.arange(self.n_cols + 1))
+
+    def _build_cells(self):
+        """
+        Owner of every cell that no edge passes through (-1 for none), and
+        MIXED for cells that need a point-in-polygon test.
+        """
+        lat_centres = -90 + (np.arange(self.n_rows) + 0.5) * self.cell_size
+        lon_centres = -180 + (np.arange(self.n_cols) + 0.5) * self.cell_size
+        raster, _ = rasterize_object(lat_centres, lon_centres, 'countries')
+        self.cell_owner = raster.astype(np.int32).ravel()
+
+        # Conservatively mark every cell inside each edge's bounding box
+        rows0, rows1 = _cell_ranges(np.minimum(self.y0, self.y1), np.maximum(self.y0, self.y1),
+                                    -90, self.cell_size, self.n_rows)
+        cols0, cols1 = _cell_ranges(np.minimum(self.x0, self.x1), np.maximum(self.x0, self.x1),
+                                    -180, self.cell_size, self.n_cols)
+        for row0, row1, col0, col1 in zip(rows0, rows1, cols0, cols1):
+            rows = np.arange(row0, row1 + 1)[:, None]
+            cols = np.arange(col0, col1 + 1)[None, :]
+            self.cell_owner[(rows * self.n_cols + cols).ravel()] = MIXED
+
+    def locate(self, lats, lons):
+        """
+        Position of the containing geometry for every point (-1 for none).
+        """
+        lats, lons = _normalize(lats, lons)
+        rows = np.clip(np.floor((lats + 90) / self.cell_size).astype(np.int64), 0, self.n_rows - 1)
+        cols = np.clip(np.floor((lons + 180) / self.cell_size).astype(np.int64), 0, self.n_cols - 1)
+        result = self.cell_owner[rows * self.n_cols + cols]
+        result[~(np.isfinite(lats) & np.isfinite(lons))] = -1
+
+        mixed = np.nonzero(result == MIXED)[0]
+        if len(mixed):
+            result[mixed] = self._refine(lats[mixed], lons[mixed], cols[mixed])
+        return result
+
+    def _refine(self, lats, lons, cols):
+        """
+        Even-odd test of each point against every edge crossing its column.
+        """
+        result = np.full(len(lats), -1, dtype=np.int32)
+        order = np.argsort(cols, kind='stable')
+        col_starts = np.searchsorted(cols[order], np.arange(self.n_cols + 1))
+        for col in np.unique(cols):
+            points = order[col_starts[col]:col_starts[col + 1]]
+            edges = self.col_edge[self.col_offsets[col]:self.col_offsets[col + 1]]
+            if len(edges) == 0:
+                continue
+            x0, y0, x1, y1 = self.x0[edges], self.y0[edges], self.x1[edges], self.y1[edges]
+            owners = self.owner[edges]
+            # Edges are sorted by geometry within a column
+            group_starts = np.concatenate([[0], np.nonzero(np.diff(owners))[0] + 1])
+            group_owner = owners[group_starts]
+
+            step = max(1, PAIR_BUDGET // len(edges))
+            for start in range(0, len(points), step):
+                batch = points[start:start + step]
+                y = lats[batch][:, None]
+                x = lons[batch][:, None]
+                spans = (x0 <= x) != (x1 <= x)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    crossing_y = y0 + (x - x0) * (y1 - y0) / (x1 - x0)
+                crossings = (spans & (crossing_y > y)).astype(np.int32)
+                inside = np.add.reduceat(crossings, group_starts, axis=1) % 2 == 1
+                hit = inside.any(axis=1)
+                result[batch[hit]] = group_owner[inside[hit].argmax(axis=1)]
+        return result
+
+    def iso3(self, lats, lons):
+        """
+        ISO3 code of the country containing every point (None for none).
+        """
+        return self.codes[self.locate(lats, lons)]
+
+    def country_grid(self, lat_coords, lon_coords):
+        """
+        (lat, lon) array of ISO3 codes for a grid of any resolution.
+        """
+        lat_grid, lon_grid = np.meshgrid(lat_coords, lon_coords, indexing='ij')
+        return self.iso3(lat_grid.ravel(), lon_grid.ravel()).reshape(lat_grid.shape)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reverse-geocode points to ISO3 country codes")
+    parser.add_argument('points', nargs='?', help="CSV file with latitude and longitude columns")
+    parser.add_argument('--lat-column', default='latitude')
+    parser.add_argument('--lon-column', default='longitude')
+    parser.add_argument('--output', default=None, help="Output CSV (default: <points>_countries.csv)")
+    parser.add_argument('--cell-size', type=float, default=0.5, help="Prefilter cell size in degrees")
+    parser.add_argument('--benchmark', type=int, default=None, metavar='N',
+                        help="Time N random points instead of reading a file")
+    args = parser.parse_args()
+
+    if not args.points and not args.benchmark:
+        parser.error("give a points CSV or --benchmark N")
+
+    started = time.perf_counter()
+    locator = CountryLocator(cell_size=args.cell_size)
+    mixed = np.mean(locator.cell_owner == MIXED) * 100
+    print(f"🗺️ Index built in {time.perf_counter() - started:.2f}s "
+          f"({len(locator.ids)} geometries, {mixed:.1f}% border cells)")
+
+    if args.benchmark:
+        rng = np.random.default_rng(0)
+        lats = np.degrees(np.arcsin(rng.uniform(-1, 1, args.benchmark)))
+        lons = rng.uniform(-180, 180, args.benchmark)
+        started = time.perf_counter()
+        codes = locator.iso3(lats, lons)
+        elapsed = time.perf_counter() - started
+        print(f"✅ {args.benchmark:,} points in {elapsed:.2f}s ({args.benchmark / elapsed / 1e6:.1f}M points/s), "
+              f"{np.mean(codes != None) * 100:.1f}% in a country")  # noqa: E711
+        return
+
+    import pandas as pd
+    if not os.path.exists(args.points):
+        print(f"❌ {args.points} not found")
+        exit(1)
+    points = pd.read_csv(args.points)
+    points['country_code'] = locator.iso3(points[args.lat_column].values, points[args.lon_column].values)
+    output = args.output or os.path.splitext(args.points)[0] + '_countries.csv'
+    points.to_csv(output, index=False)
+    print(f"✅ {points['country_code'].notna().sum():,} of {len(points):,} points matched; saved to '{output}'")
+
+
+if __name__ == "__main__":
+    main()
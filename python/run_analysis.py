@@ -4,18 +4,19 @@ Master script to process heat index data for 2000 vs 2025 comparison
 Runs all analysis scripts in sequence
 """
 
+import argparse
 import subprocess
 import sys
 import os
 
-def run_script(script_name, description):
+def run_script(script_name, description, script_args=()):
     """Run a Python script and handle errors"""
     print(f"\n{'='*60}")
     print(f"🚀 {description}")
     print(f"{'='*60}")
     
     try:
-        result = subprocess.run([sys.executable, script_name], 
+        result = subprocess.run([sys.executable, script_name, *script_args], 
                               capture_output=True, text=True, check=True)
         print(result.stdout)
         if result.stderr:
@@ -29,6 +30,17 @@ def run_script(script_name, description):
         return False
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the 2000 vs 2025 heat index pipeline")
+    parser.add_argument('--quick', action='store_true',
+                        help="Only build a fast preview from a strided sample (see quick_look.py)")
+    parser.add_argument('--time-stride', default='13', help="Time stride for --quick")
+    parser.add_argument('--coarsen', default='1', help="Grid stride for --quick")
+    parser.add_argument('--resume', action='store_true',
+                        help="Resume interrupted processing stages from their last checkpoint")
+    parser.add_argument('--population', default=None,
+                        help="Gridded population raster; adds the exposure stage (see compute_exposure.py)")
+    args = parser.parse_args()
+
     print("🌡️ Heat Index Analysis Pipeline: 2000 vs 2025 Comparison")
     print("="*70)
     
@@ -38,16 +50,28 @@ def main():
         print("Please ensure your GRIB data file is in the data/ folder")
         sys.exit(1)
     
+    if args.quick:
+        quick_args = ['--time-stride', args.time_stride, '--coarsen', args.coarsen]
+        if run_script("quick_look.py", "Building Quick-Look Preview", quick_args):
+            print("\n🎯 Preview ready in quick_look/heat_index_by_country.json")
+        else:
+            sys.exit(1)
+        return
+
+    process_args = ['--resume'] if args.resume else []
     scripts = [
-        ("process_2000_data.py", "Processing 2000 Heat Index Data"),
-        ("process_2025_data.py", "Processing 2025 Heat Index Data"),
+        ("process_2000_data.py", "Processing 2000 Heat Index Data", process_args),
+        ("process_2025_data.py", "Processing 2025 Heat Index Data", process_args),
         ("compare_2000_vs_2025.py", "Creating 2000 vs 2025 Comparison Analysis")
     ]
+    if args.population:
+        scripts.append(("compute_exposure.py", "Computing Population-Weighted Exposure",
+                        ['--population', args.population]))
     
     success_count = 0
     
-    for script, description in scripts:
-        if run_script(script, description):
+    for script, description, *script_args in scripts:
+        if run_script(script, description, *script_args):
             success_count += 1
         else:
             print(f"\n❌ Pipeline failed at {script}")
@@ -66,6 +90,8 @@ def main():
             "heat_index_percent_change_2025_2000.nc - Percentage change map",
             "heat_index_comparison_complete.nc - Complete comparison dataset"
         ]
+        if args.population:
+            output_files.append("heat_index_exposure_<year>.csv - Population-weighted exposure by country")
         
         for file_desc in output_files:
             print(f"  ✅ {file_desc}")
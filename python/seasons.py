@@ -0,0 +1,74 @@
+"""
+Monthly and seasonal aggregates accumulated in the same pass as the
+annual average. Every time step is added once to the accumulators of its
+calendar month; meteorological seasons and the hemisphere-aware local
+warm season (JJA north of the equator, DJF south of it) are then combined
+from the monthly sums, counts and maxima, which is exact.
+Seasons are taken within the processed calendar year, so DJF is
+January, February and December of that year.
+"""
+
+import numpy as np
+
+MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+SEASONS = {'DJF': (12, 1, 2), 'MAM': (3, 4, 5), 'JJA': (6, 7, 8), 'SON': (9, 10, 11)}
+PERIODS = MONTH_NAMES + tuple(SEASONS) + ('warm',)
+
+
+def time_months(times):
+    """
+    Calendar month (1-12) of every datetime64 time step.
+    """
+    return np.asarray(times, dtype='datetime64[M]').astype(np.int64) % 12 + 1
+
+
+def accumulate_months(state, name, block, months):
+    """
+    Add a (time, ...) block of one index to its per-month <name>_month_sum,
+    _month_count and _month_max accumulators (12, ...). Returns the updated
+    accumulators only; NaN values are left out.
+    """
+    shape = (12,) + block.shape[1:]
+    if state is None or f'{name}_month_sum' not in state:
+        sums, counts, maxima = np.zeros(shape), np.zeros(shape, dtype=np.int64), np.full(shape, -np.inf)
+    else:
+        sums = state[f'{name}_month_sum'].copy()
+        counts = state[f'{name}_month_count'].copy()
+        maxima = state[f'{name}_month_max'].copy()
+
+    valid = ~np.isnan(block)
+    for month in np.unique(months):
+        steps = months == month
+        sums[month - 1] += np.where(valid[steps], block[steps], 0.0).sum(axis=0)
+        counts[month - 1] += valid[steps].sum(axis=0)
+        maxima[month - 1] = np.maximum(maxima[month - 1], np.where(valid[steps], block[steps], -np.inf).max(axis=0))
+    return {f'{name}_month_sum': sums, f'{name}_month_count': counts, f'{name}_month_max': maxima}
+
+
+def period_aggregates(state, name, latitudes):
+    """
+    Mean and maximum of one index for every period in PERIODS, as two
+    (period, ...) arrays. latitudes gives the latitude of every cell
+    (broadcastable to the cell shape) and picks the local warm season.
+    """
+    sums = state[f'{name}_month_sum']
+    counts = state[f'{name}_month_count']
+    maxima = state[f'{name}_month_max']
+
+    north = np.broadcast_to(np.asarray(latitudes) >= 0, sums.shape[1:])
+    groups = [(month,) for month in range(1, 13)] + list(SEASONS.values())
+    period_sums = [sums[[m - 1 for m in group]].sum(axis=0) for group in groups]
+    period_counts = [counts[[m - 1 for m in group]].sum(axis=0) for group in groups]
+    period_maxima = [maxima[[m - 1 for m in group]].max(axis=0) for group in groups]
+
+    # Local warm season: JJA in the north, DJF in the south
+    djf, jja = len(MONTH_NAMES), len(MONTH_NAMES) + 2
+    period_sums.append(np.where(north, period_sums[jja], period_sums[djf]))
+    period_counts.append(np.where(north, period_counts[jja], period_counts[djf]))
+    period_maxima.append(np.where(north, period_maxima[jja], period_maxima[djf]))
+
+    period_counts = np.stack(period_counts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(period_counts > 0, np.stack(period_sums) / period_counts, np.nan)
+    maxima = np.where(period_counts > 0, np.stack(period_maxima), np.nan)
+    return means, maxima
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Build pre-simplified, quantized copies of world-110m.json with the country
+results attached to each geometry's properties, one file per zoom level.
+Arcs are simplified one at a time (Visvalingam effective area) with their
+end points fixed, so borders shared by neighbouring countries stay shared
+and the topology is preserved. The browser then loads a single file per
+zoom level with no separate id mapping or join. A level is never allowed
+to be larger than the source file: its quantization is coarsened until it
+fits.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import numpy as np
+from export_country_columns import COUNTRY_FILE, MAPPING_FILE, VALUE_COLUMNS, load_id_mapping, build_columns
+from world_geometry import WORLD_FILE, load_topology, decode_arcs
+
+OUTPUT_DIR = '../public/world'
+# (minimum effective area in square degrees, quantization) per zoom level
+ZOOM_LEVELS = ((1.0, 2000), (0.1, 5000), (0.01, 10000))
+MIN_QUANTIZATION = 500
+
+
+def visvalingam_weights(points):
+    """
+    Effective area of every point of a line, made monotonic so that
+    keeping points with weight >= a threshold gives the Visvalingam
+    simplification for that threshold. End points get infinite weight.
+    """
+    n = len(points)
+    weights = np.full(n, np.inf)
+    if n < 3:
+        return weights
+    x = points[:, 0].tolist()
+    y = points[:, 1].tolist()
+    prev_point = list(range(-1, n - 1))
+    next_point = list(range(1, n + 1))
+
+    def area(i):
+        a, c = prev_point[i], next_point[i]
+        return abs((x[i] - x[a]) * (y[c] - y[a]) - (x[c] - x[a]) * (y[i] - y[a])) / 2
+
+    current = [0.0] * n
+    heap = []
+    for i in range(1, n - 1):
+        current[i] = area(i)
+        heap.append((current[i], i))
+    heapq.heapify(heap)
+
+    removed = [False] * n
+    max_area = 0.0
+    while heap:
+        point_area, i = heapq.heappop(heap)
+        if removed[i] or point_area != current[i]:
+            continue  # Stale entry left after a neighbour was removed
+        max_area = max(max_area, point_area)
+        weights[i] = max_area
+        removed[i] = True
+        a, c = prev_point[i], next_point[i]
+        next_point[a] = c
+        prev_point[c] = a
+        for j in (a, c):
+            if 0 < j < n - 1:
+                current[j] = area(j)
+                heapq.heappush(heap, (current[j], j))
+    return weights
+
+
+def simplify_arc(points, weights, min_area):
+    """
+    Points of an arc with weight >= min_area. Closed arcs keep at least
+    two interior points so their ring stays a polygon.
+    """
+    keep = weights >= min_area
+    if np.array_equal(points[0], points[-1]) and len(points) > 3 and keep.sum() < 4:
+        interior = np.argsort(weights[1:-1])[-2:] + 1
+        keep[interior] = True
+    return points[keep]
+
+
+def quantize_arcs(arcs, quantization):
+    """
+    Quantize arcs onto a quantization x quantization integer grid and
+    delta-encode them. Returns (encoded arcs, transform, bbox).
+    """
+    all_points = np.concatenate(arcs)
+    x0, y0 = all_points.min(axis=0)
+    x1, y1 = all_points.max(axis=0)
+    scale = [(x1 - x0) / (quantization - 1) or 1.0, (y1 - y0) / (quantization - 1) or 1.0]
+
+    encoded = []
+    for points in arcs:
+        grid = np.rint((points - [x0, y0]) / scale).astype(np.int64)
+        # Points that fall on the same grid cell collapse into one
+        distinct = np.ones(len(grid), dtype=bool)
+        distinct[1:] = np.any(np.diff(grid, axis=0) != 0, axis=1)
+        grid = grid[distinct]
+        if len(grid) < 2:
+            grid = np.vstack([grid, grid])
+        deltas = np.vstack([grid[:1], np.diff(grid, axis=0)])
+        encoded.append(deltas.tolist())
+
+    transform = {'scale': scale, 'translate': [float(x0), float(y0)]}
+    return encoded, transform, [float(x0), float(y0), float(x1), float(y1)]
+
+
+def country_properties(records, id_mapping, precision=2):
+    """
+    {TopoJSON id: properties} from the country results.
+    """
+    columns = build_columns(records, id_mapping, precision)
+    names = ['country_code', 'country_name', *VALUE_COLUMNS, 'data_points']
+    return {
+        topo_id: {name: columns[name][row] for name in names}
+        for row, topo_id in enumerate(columns['id'])
+    }
+
+
+def simplify_topology(topology, min_area, quantization, properties, weights=None):
+    """
+    Simplified, quantized copy of a topology with properties attached to
+    the 'countries' geometries. weights can be passed in to reuse the
+    Visvalingam weights across zoom levels.
+    """
+    arcs = decode_arcs(topology)
+    if weights is None:
+        weights = [visvalingam_weights(points) for points in arcs]
+    simplified = [simplify_arc(points, arc_weights, min_area) for points, arc_weights in zip(arcs, weights)]
+    encoded, transform, bbox = quantize_arcs(simplified, quantization)
+
+    objects = json.loads(json.dumps(topology['objects']))
+    for geometry in objects['countries']['geometries']:
+        if geometry.get('id') in properties:
+            geometry['properties'] = properties[geometry['id']]
+
+    return {'type': 'Topology', 'bbox': bbox, 'transform': transform, 'objects': objects, 'arcs': encoded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write simplified, pre-joined TopoJSON files per zoom level")
+    parser.add_argument('--world', default=WORLD_FILE, help="Source TopoJSON")
+    parser.add_argument('--input', default=COUNTRY_FILE, help="Country rows from compare_2000_vs_2025.py")
+    parser.add_argument('--mapping', default=MAPPING_FILE, help="TopoJSON id to ISO3 mapping")
+    parser.add_argument('--levels', nargs='+', default=None, metavar='AREA:QUANTIZATION',
+                        help="Zoom levels as minimum area (square degrees) and quantization, "
+                             "e.g. 1:2000 0.1:5000 0.01:10000")
+    parser.add_argument('--precision', type=int, default=2, help="Decimal places kept in properties")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    for path in (args.world, args.input, args.mapping):
+        if not os.path.exists(path):
+            print(f"❌ {path} not found")
+            exit(1)
+
+    levels = ZOOM_LEVELS
+    if args.levels:
+        levels = [(float(area), int(quantization))
+                  for area, quantization in (level.split(':') for level in args.levels)]
+
+    topology = load_topology(args.world)
+    with open(args.input) as f:
+        records = json.load(f)
+    properties = country_properties(records, load_id_mapping(args.mapping), args.precision)
+    print(f"🔄 Simplifying {len(topology['arcs'])} arcs; {len(properties)} geometries get heat index data")
+
+    weights = [visvalingam_weights(points) for points in decode_arcs(topology)]
+    os.makedirs(args.output_dir, exist_ok=True)
+    original = os.path.getsize(args.world)
+    for z, (min_area, quantization) in enumerate(levels):
+        while True:
+            simplified = simplify_topology(topology, min_area, quantization, properties, weights)
+            encoded = json.dumps(simplified, separators=(',', ':'), ensure_ascii=False).encode()
+            if len(encoded) < original or quantization // 2 < MIN_QUANTIZATION:
+                break
+            # Serving the source would be cheaper; coarsen until the level is smaller
+            print(f"  ⚠️ z{z} at quantization {quantization} is {len(encoded) / 1e3:.0f} kB; halving quantization")
+            quantization //= 2
+        if len(encoded) >= original:
+            print(f"❌ z{z} stays larger than the source ({len(encoded) / 1e3:.0f} kB); raise its minimum area")
+            exit(1)
+
+        path = os.path.join(args.output_dir, f'world-heat-z{z}.json')
+        with open(path, 'wb') as f:
+            f.write(encoded)
+        n_points = sum(len(arc) for arc in simplified['arcs'])
+        print(f"  z{z}: area >= {min_area:g} deg², quantization {quantization}: {n_points:,} points, "
+              f"{len(encoded) / 1e3:.0f} kB (source {original / 1e3:.0f} kB)")
+
+    print(f"✅ {len(levels)} zoom levels saved to '{args.output_dir}'")
+
+
+if __name__ == "__main__":
+    main()
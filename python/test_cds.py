@@ -0,0 +1,125 @@
+"""
+Offline checks of the ERA5 fetch stage against the local mock CDS server.
+Run with: python -m pytest test_cds.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from fetch_era5 import fetch_collection, month_filename, file_sha256, MANIFEST_NAME
+from mock_cds_server import MockCDSServer, fake_payload
+
+
+def start_server(**kwargs):
+    server = MockCDSServer(**kwargs)
+    server.start()
+    return server, {'url': server.url, 'key': '0:mock', 'quiet': True, 'progress': False}
+
+
+def test_fetch_splits_requests_per_month_and_variable(tmp_path):
+    server, client_kwargs = start_server(payload_size=2048)
+    try:
+        downloaded, skipped, failed = fetch_collection([2025], [1, 2], str(tmp_path), workers=3,
+                                                       client_kwargs=client_kwargs)
+    finally:
+        server.shutdown()
+
+    assert not failed and not skipped
+    assert len(downloaded) == 4
+    assert len(server.requests) == 4
+    assert {(r['request']['variable'], r['request']['month']) for r in server.requests} == {
+        ('2m_temperature', '01'), ('2m_temperature', '02'),
+        ('2m_dewpoint_temperature', '01'), ('2m_dewpoint_temperature', '02'),
+    }
+
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())
+    for filename in downloaded:
+        path = tmp_path / filename
+        assert manifest[filename]['size'] == os.path.getsize(path) == 2048
+        assert manifest[filename]['sha256'] == file_sha256(path)
+    assert not list(tmp_path.glob('*.part'))
+
+
+def test_interrupted_download_is_resumed(tmp_path):
+    server, client_kwargs = start_server(payload_size=100_000, interrupt_after=30_000)
+    try:
+        downloaded, _, failed = fetch_collection([2000], [7], str(tmp_path), workers=2,
+                                                 client_kwargs=client_kwargs)
+        request = server.requests[0]['request']
+    finally:
+        server.shutdown()
+
+    assert not failed and len(downloaded) == 2
+    filename = month_filename(request['variable'], 2000, 7)
+    assert (tmp_path / filename).read_bytes() == fake_payload(request, 100_000)
+
+
+def test_existing_months_are_skipped_and_corruption_refetched(tmp_path):
+    server, client_kwargs = start_server(payload_size=1024)
+    try:
+        fetch_collection([2000], [1], str(tmp_path), client_kwargs=client_kwargs)
+        downloaded, skipped, _ = fetch_collection([2000], [1, 2], str(tmp_path), client_kwargs=client_kwargs)
+        assert len(skipped) == 2 and len(downloaded) == 2
+
+        # Same size, different content: trusted by size only without verification
+        corrupt = tmp_path / month_filename('2m_temperature', 2000, 1)
+        corrupt.write_bytes(b'\0' * 1024)
+        _, skipped, _ = fetch_collection([2000], [1], str(tmp_path), client_kwargs=client_kwargs,
+                                         verify_checksum=False)
+        assert len(skipped) == 2
+        downloaded, _, _ = fetch_collection([2000], [1], str(tmp_path), client_kwargs=client_kwargs)
+        assert downloaded == [corrupt.name]
+        assert file_sha256(corrupt) == json.loads((tmp_path / MANIFEST_NAME).read_text())[corrupt.name]['sha256']
+    finally:
+        server.shutdown()
+
+
+def test_changed_partial_download_is_restarted(tmp_path):
+    server, client_kwargs = start_server(payload_size=100_000, interrupt_after=30_000)
+    try:
+        filename = month_filename('2m_temperature', 2000, 7)
+        partial = tmp_path / (filename + '.part')
+        # A partial file whose recorded checksum no longer matches is not resumed
+        partial.write_bytes(b'\0' * 30_000)
+        (tmp_path / (filename + '.part.sha256')).write_text(f"30000 {'0' * 64}")
+        downloaded, _, failed = fetch_collection([2000], [7], str(tmp_path), client_kwargs=client_kwargs)
+        request = next(r['request'] for r in server.requests if r['request']['variable'] == '2m_temperature')
+    finally:
+        server.shutdown()
+
+    assert not failed and len(downloaded) == 2
+    assert (tmp_path / filename).read_bytes() == fake_payload(request, 100_000)
+    assert not list(tmp_path.glob('*.part*'))
+
+
+def test_killed_fetch_is_resumed_by_the_next_run(tmp_path):
+    server, client_kwargs = start_server(payload_size=300_000, stall_after=131_072)
+    fetch = ("import json, sys; from fetch_era5 import fetch_collection; "
+             "fetch_collection([2000], [7], sys.argv[1], workers=2, client_kwargs=json.loads(sys.argv[2]))")
+    process = subprocess.Popen([sys.executable, '-c', fetch, str(tmp_path), json.dumps(client_kwargs)],
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        # Both downloads have written their first two 64 KiB chunks and stall
+        records = [tmp_path / (month_filename(variable, 2000, 7) + '.part.sha256')
+                   for variable in ('2m_temperature', '2m_dewpoint_temperature')]
+        deadline = time.monotonic() + 60
+        while not all(r.exists() and r.read_text().startswith('131072 ') for r in records):
+            assert time.monotonic() < deadline and process.poll() is None, "fetch did not reach the stall"
+            time.sleep(0.05)
+        process.kill()
+        process.wait()
+        server.release()
+
+        downloaded, _, failed = fetch_collection([2000], [7], str(tmp_path), client_kwargs=client_kwargs)
+        requests = {r['request']['variable']: r['request'] for r in server.requests}
+    finally:
+        process.kill()
+        server.shutdown()
+
+    assert not failed and len(downloaded) == 2
+    assert server.downloads.count('bytes=131072-') == 2
+    for variable, request in requests.items():
+        assert (tmp_path / month_filename(variable, 2000, 7)).read_bytes() == fake_payload(request, 300_000)
+    assert not list(tmp_path.glob('*.part*'))
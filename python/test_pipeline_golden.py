@@ -0,0 +1,460 @@
+"""
+Golden-output regression and performance budgets for the processing pipeline.
+Every stage runs as a script on a small synthetic ERA5-like collection
+and population raster (fixed seeds), and every output file is compared
+with its golden copy in golden/ within numeric tolerances. The grid run
+(processing, comparison with columnar export, pyramid, tiles, per-cell
+table, simplified topology, quick look, daily series, heatwaves, trends,
+significance, exposure) writes to one work directory, the land-only run
+with further indices to another (golden/land_only/). A land-only run
+killed after its first checkpoint block must resume to the uninterrupted
+outputs.
+Each stage must also stay within its wall-time and peak-memory budget in
+golden/budgets.json. The budgets only catch gross regressions (a stage
+suddenly taking a good part longer or more memory): most of a stage's
+time on this input is interpreter start-up and imports, and timings on a
+shared machine are too noisy for finer limits.
+Run with: python -m pytest test_pipeline_golden.py
+Regenerate the golden files after an intended change of results with
+python test_pipeline_golden.py --update (--update-budgets re-measures the
+budgets from the slowest of --runs pipeline runs).
+"""
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(SCRIPT_DIR, 'golden')
+BUDGETS_FILE = os.path.join(GOLDEN_DIR, 'budgets.json')
+DATA_DIR = os.path.join(SCRIPT_DIR, '..', 'data')
+
+YEARS = (2000, 2010, 2025)
+MONTHS = (1, 7)
+STEP_HOURS = 6
+GRID_DEGREES = 10.0
+RTOL = 1e-5
+ATOL = 1e-4
+# Budget headroom for timing noise: BUDGET_TIME_FACTOR x wall time plus
+# BUDGET_TIME_SLACK seconds, BUDGET_MEMORY_FACTOR x peak memory
+BUDGET_TIME_FACTOR = 1.5
+BUDGET_TIME_SLACK = 1.0
+BUDGET_MEMORY_FACTOR = 1.25
+# Slower machines can scale every budget, e.g. BUDGET_SCALE=2
+BUDGET_SCALE = float(os.environ.get('BUDGET_SCALE', 1))
+
+# Work directories; outputs of WORK_DIR are compared with golden/, those
+# of any other directory with golden/<directory>/
+WORK_DIR = 'work'
+LAND_DIR = 'land_only'
+
+# (stage, work directory, script, arguments); {input} is the synthetic
+# collection, {population} the synthetic population raster
+STAGES = [
+    ('process_2000', WORK_DIR, 'process_year_data.py', ['--year', '2000', '--data-file', '{input}', '--seasonal']),
+    ('process_2025', WORK_DIR, 'process_year_data.py', ['--year', '2025', '--data-file', '{input}', '--seasonal']),
+    ('process_2010', WORK_DIR, 'process_year_data.py', ['--year', '2010', '--data-file', '{input}']),
+    ('compare', WORK_DIR, 'compare_2000_vs_2025.py', ['--season', 'warm', '--columnar', '--binary', 'typed']),
+    ('pyramid', WORK_DIR, 'build_pyramid.py', []),
+    ('tiles', WORK_DIR, 'export_tiles.py', ['--output-dir', 'tiles', '--format', 'bin']),
+    ('cells', WORK_DIR, 'export_cells.py', ['--output-dir', 'heat_index_cells']),
+    ('topology', WORK_DIR, 'simplify_topology.py', ['--output-dir', 'world']),
+    ('quick_look', WORK_DIR, 'quick_look.py', ['--data-file', '{input}', '--output-dir', 'quick_look']),
+    ('daily_2000', WORK_DIR, 'process_daily_data.py', ['--year', '2000', '--data-file', '{input}']),
+    ('daily_2025', WORK_DIR, 'process_daily_data.py', ['--year', '2025', '--data-file', '{input}']),
+    ('heatwaves', WORK_DIR, 'detect_heatwaves.py', ['--min-days', '2']),
+    ('trends', WORK_DIR, 'compute_trends.py', ['--years', '2000', '2010', '2025']),
+    ('significance', WORK_DIR, 'compute_significance.py', ['--resamples', '200', '--workers', '2', '--seed', '1']),
+    ('exposure', WORK_DIR, 'compute_exposure.py', ['--population', '{population}']),
+    ('land_2025', LAND_DIR, 'process_year_data.py',
+     ['--year', '2025', '--data-file', '{input}', '--land-only', '--block-size', '64', '--seasonal',
+      '--indices', 'heat_index', 'humidex', 'apparent_temperature', 'wbgt']),
+]
+# Stage that is killed after its first checkpoint block and resumed
+RESUME_STAGE = 'land_2025'
+OUTPUT_SUFFIXES = ('.nc', '.csv', '.json', '.parquet', '.bin')
+
+# Runs a script (the first argument) like python would, but kills the
+# process without any clean-up right after its first checkpoint block
+INTERRUPTED_RUN = """
+import os, runpy, signal, sys
+script = sys.argv[1]
+sys.path.insert(0, os.path.dirname(script))
+import checkpoints
+commit = checkpoints.BlockCheckpoint.commit
+def commit_then_kill(self, *args):
+    commit(self, *args)
+    os.kill(os.getpid(), signal.SIGKILL)
+checkpoints.BlockCheckpoint.commit = commit_then_kill
+sys.argv = sys.argv[1:]
+runpy.run_path(script, run_name='__main__')
+"""
+
+
+def synthetic_inputs(directory):
+    """
+    Write monthly NetCDF files of 2m temperature and dewpoint with a
+    latitude/seasonal climate, a diurnal cycle, steady warming, a July 2025
+    heatwave over South Asia and seeded noise.
+    """
+    os.makedirs(directory, exist_ok=True)
+    lats = np.arange(90, -90 - GRID_DEGREES / 2, -GRID_DEGREES)
+    lons = np.arange(0, 360, GRID_DEGREES)
+    lat_grid, lon_grid = np.meshgrid(np.radians(lats), np.radians(lons), indexing='ij')
+    dryness = 0.5 + 0.5 * np.sin(lon_grid) * np.cos(lat_grid)
+
+    for year in YEARS:
+        rng = np.random.default_rng(year)
+        for month in MONTHS:
+            start = np.datetime64(f'{year}-{month:02d}-01')
+            times = np.arange(start, start + np.timedelta64(31, 'D'), np.timedelta64(STEP_HOURS, 'h'))
+            day_of_year = (times - np.datetime64(f'{year}-01-01')) / np.timedelta64(1, 'D')
+            utc_hours = (times - times.astype('datetime64[D]')) / np.timedelta64(1, 'h')
+
+            season = np.cos(2 * np.pi * (day_of_year - 196) / 365)[:, None, None]
+            local_hours = (utc_hours[:, None, None] + np.degrees(lon_grid) / 15) % 24
+            temp_c = (28 - 0.55 * np.degrees(np.abs(lat_grid)) + 10 * np.sin(lat_grid) * season
+                      + 5 * np.cos(2 * np.pi * (local_hours - 15) / 24)
+                      + (year - 2000) * 0.04
+                      + rng.normal(0, 1.5, (len(times),) + lat_grid.shape))
+            if year == 2025 and month == 7:
+                blob = np.exp(-((np.degrees(lat_grid) - 20) ** 2 + (np.degrees(lon_grid) - 80) ** 2) / 400)
+                days = ((day_of_year - 190) / 4) ** 2
+                temp_c += 10 * blob * np.exp(-days)[:, None, None]
+            dewpoint_c = temp_c - (4 + 14 * dryness) - np.abs(rng.normal(0, 1, temp_c.shape))
+
+            coords = {'time': times.astype('datetime64[ns]'), 'latitude': lats, 'longitude': lons}
+            dims = ('time', 'latitude', 'longitude')
+            ds = xr.Dataset({
+                't2m': xr.DataArray((temp_c + 273.15).astype(np.float32), coords=coords, dims=dims,
+                                    attrs={'units': 'K'}),
+                'd2m': xr.DataArray((dewpoint_c + 273.15).astype(np.float32), coords=coords, dims=dims,
+                                    attrs={'units': 'K'}),
+            })
+            ds.to_netcdf(os.path.join(directory, f'synthetic_{year}_{month:02d}.nc'))
+
+
+def synthetic_population(path):
+    """
+    Write a 5-degree population raster: people mostly in the mid-latitudes
+    of the northern hemisphere, with seeded noise and randomly empty cells.
+    """
+    lats = np.arange(87.5, -90, -5.0)
+    lons = np.arange(-177.5, 180, 5.0)
+    rng = np.random.default_rng(1)
+    density = np.exp(-((lats[:, None] - 25) / 20) ** 2) * (1 + np.cos(np.radians(lons[None, :] - 90)))
+    population = 1e7 * density * rng.uniform(0.5, 1.5, density.shape)
+    population[rng.uniform(size=density.shape) < 0.3] = np.nan
+    xr.DataArray(population, coords={'lat': lats, 'lon': lons}, dims=('lat', 'lon'),
+                 name='population').to_netcdf(path)
+
+
+def run_stage(script, args, work_dir, python_args=()):
+    """
+    Run one script in work_dir, after any python_args of the interpreter.
+    Returns (exit code, wall seconds, peak MB, log).
+    """
+    log_path = os.path.join(work_dir, f'{os.path.splitext(script)[0]}.log')
+    started = time.perf_counter()
+    with open(log_path, 'a') as log:
+        process = subprocess.Popen([sys.executable, *python_args, os.path.join(SCRIPT_DIR, script), *args],
+                                   cwd=work_dir, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 gives the resource usage of this child alone
+        _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    seconds = time.perf_counter() - started
+    with open(log_path) as log:
+        return process.returncode, seconds, usage.ru_maxrss / 1024, log.read()
+
+
+def stage_arguments(args, base_dir):
+    return [arg.format(input=os.path.join(base_dir, 'input'), population=os.path.join(base_dir, 'population.nc'))
+            for arg in args]
+
+
+def run_pipeline(base_dir):
+    """
+    Build the synthetic input under base_dir and run every stage in its
+    work directory there. Returns {stage: {'seconds', 'peak_mb'}}.
+    """
+    synthetic_inputs(os.path.join(base_dir, 'input'))
+    synthetic_population(os.path.join(base_dir, 'population.nc'))
+    # The scripts read shared data from ../data
+    os.symlink(os.path.abspath(DATA_DIR), os.path.join(base_dir, 'data'))
+
+    measurements = {}
+    for stage, directory, script, args in STAGES:
+        work_dir = os.path.join(base_dir, directory)
+        os.makedirs(work_dir, exist_ok=True)
+        code, seconds, peak_mb, log = run_stage(script, stage_arguments(args, base_dir), work_dir)
+        if code != 0:
+            raise RuntimeError(f"stage {stage} ({script}) exited with {code}:\n{log[-2000:]}")
+        measurements[stage] = {'seconds': seconds, 'peak_mb': peak_mb}
+    return measurements
+
+
+def output_files(directory):
+    """
+    Sorted paths, relative to directory, of the output files under it;
+    hidden directories (caches) and checkpoints are skipped.
+    """
+    names = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if not d.startswith('.') and not d.endswith('_checkpoint')]
+        names += [os.path.relpath(os.path.join(root, f), directory) for f in files if f.endswith(OUTPUT_SUFFIXES)]
+    return sorted(names)
+
+
+def _work_dirs():
+    return list(dict.fromkeys(directory for _, directory, _, _ in STAGES))
+
+
+def pipeline_outputs(base_dir):
+    """
+    {name: path} of the outputs of every work directory under base_dir, named
+    as in golden/: WORK_DIR's at the top, others as <directory>/<file>.
+    """
+    outputs = {}
+    for directory in _work_dirs():
+        for name in output_files(os.path.join(base_dir, directory)):
+            golden_name = name if directory == WORK_DIR else os.path.join(directory, name)
+            outputs[golden_name] = os.path.join(base_dir, directory, name)
+    return outputs
+
+
+def _compare_json(actual, expected, path='$'):
+    if isinstance(expected, dict):
+        assert isinstance(actual, dict) and sorted(actual) == sorted(expected), f"keys differ at {path}"
+        for key in expected:
+            _compare_json(actual[key], expected[key], f'{path}.{key}')
+    elif isinstance(expected, list):
+        assert isinstance(actual, list) and len(actual) == len(expected), f"length differs at {path}"
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            _compare_json(a, e, f'{path}[{i}]')
+    elif isinstance(expected, float) or isinstance(actual, float):
+        np.testing.assert_allclose(actual, expected, rtol=RTOL, atol=ATOL, err_msg=path)
+    else:
+        assert actual == expected, f"value differs at {path}"
+
+
+def netcdf_groups(path):
+    """
+    The root (None) and the paths of every group of a NetCDF file.
+    """
+    import netCDF4
+
+    groups = [None]
+
+    def walk(group, prefix):
+        for name, child in group.groups.items():
+            groups.append(f'{prefix}/{name}')
+            walk(child, f'{prefix}/{name}')
+
+    with netCDF4.Dataset(path) as nc:
+        walk(nc, '')
+    return groups
+
+
+def _compare_dataset(actual, expected):
+    assert sorted(actual.variables) == sorted(expected.variables)
+    for name in expected.variables:
+        assert actual[name].dims == expected[name].dims, name
+        a, e = actual[name].values, expected[name].values
+        if np.issubdtype(e.dtype, np.number):
+            np.testing.assert_allclose(a, e, rtol=RTOL, atol=ATOL, equal_nan=True, err_msg=name)
+        else:
+            np.testing.assert_array_equal(a, e, err_msg=name)
+
+
+def _compare_table(actual, expected):
+    assert list(actual.columns) == list(expected.columns)
+    assert len(actual) == len(expected)
+    for column in expected.columns:
+        a, e = actual[column], expected[column]
+        if pd.api.types.is_numeric_dtype(e) and pd.api.types.is_numeric_dtype(a):
+            np.testing.assert_allclose(a.values, e.values, rtol=RTOL, atol=ATOL, equal_nan=True,
+                                       err_msg=column)
+        else:
+            assert list(a.fillna('').astype(str)) == list(e.fillna('').astype(str)), column
+
+
+def compare_output(actual_path, golden_path):
+    """
+    Assert that an output file matches its golden copy. Variables and
+    coordinates of every NetCDF group and numeric table columns (CSV,
+    Parquet) are compared within RTOL/ATOL; attributes (creation dates,
+    paths) are ignored. Quantized binary files must match byte for byte.
+    """
+    if golden_path.endswith('.nc'):
+        groups = netcdf_groups(golden_path)
+        assert netcdf_groups(actual_path) == groups
+        for group in groups:
+            with xr.open_dataset(actual_path, group=group) as actual, \
+                    xr.open_dataset(golden_path, group=group) as expected:
+                _compare_dataset(actual, expected)
+    elif golden_path.endswith('.csv'):
+        _compare_table(pd.read_csv(actual_path), pd.read_csv(golden_path))
+    elif golden_path.endswith('.parquet'):
+        _compare_table(pd.read_parquet(actual_path), pd.read_parquet(golden_path))
+    elif golden_path.endswith('.bin'):
+        with open(actual_path, 'rb') as a, open(golden_path, 'rb') as e:
+            assert a.read() == e.read(), "binary contents differ"
+    else:
+        with open(actual_path) as a, open(golden_path) as e:
+            _compare_json(json.load(a), json.load(e))
+
+
+def save_golden(outputs, golden_dir=GOLDEN_DIR):
+    """
+    Make golden_dir hold the golden copies of outputs ({name: path}).
+    Golden files that still match their output within tolerance are kept
+    as they are, so only changed results are rewritten (NetCDF compressed);
+    goldens of outputs no longer written are removed.
+    Returns the names that were written.
+    """
+    for name in _golden_names(golden_dir):
+        if name not in outputs:
+            os.remove(os.path.join(golden_dir, name))
+    written = []
+    for name, source in outputs.items():
+        target = os.path.join(golden_dir, name)
+        if os.path.exists(target):
+            try:
+                compare_output(source, target)
+                continue
+            except (AssertionError, ValueError):
+                pass
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if name.endswith('.nc'):
+            for group in netcdf_groups(source):
+                with xr.open_dataset(source, group=group) as ds:
+                    ds.load().to_netcdf(target, mode='a' if group else 'w', group=group,
+                                        encoding={v: {'zlib': True, 'complevel': 9} for v in ds.data_vars})
+        else:
+            shutil.copy(source, target)
+        written.append(name)
+    return written
+
+
+def measured_budgets(measurements):
+    """
+    Budgets with headroom for timing noise (see BUDGET_TIME_FACTOR ...).
+    """
+    return {stage: {'seconds': round(m['seconds'] * BUDGET_TIME_FACTOR + BUDGET_TIME_SLACK, 1),
+                    'peak_mb': round(m['peak_mb'] * BUDGET_MEMORY_FACTOR)}
+            for stage, m in measurements.items()}
+
+
+def _golden_names(golden_dir=GOLDEN_DIR):
+    if not os.path.isdir(golden_dir):
+        return []
+    return [name for name in output_files(golden_dir) if name != os.path.basename(BUDGETS_FILE)]
+
+
+@pytest.fixture(scope='module')
+def pipeline(tmp_path_factory):
+    base_dir = str(tmp_path_factory.mktemp('pipeline'))
+    return base_dir, run_pipeline(base_dir)
+
+
+def test_pipeline_writes_the_golden_set_of_outputs(pipeline):
+    base_dir, _ = pipeline
+    assert sorted(pipeline_outputs(base_dir)) == _golden_names()
+
+
+@pytest.mark.parametrize('name', _golden_names())
+def test_output_matches_golden(pipeline, name):
+    base_dir, _ = pipeline
+    outputs = pipeline_outputs(base_dir)
+    assert name in outputs, f"{name} was not written"
+    compare_output(outputs[name], os.path.join(GOLDEN_DIR, name))
+
+
+def test_interrupted_run_resumes_to_the_same_outputs(pipeline):
+    """
+    Kill RESUME_STAGE after its first checkpoint block, rerun it with
+    --resume, and require exactly the outputs of the uninterrupted run.
+    """
+    base_dir, _ = pipeline
+    _, directory, script, args = next(entry for entry in STAGES if entry[0] == RESUME_STAGE)
+    args = stage_arguments(args, base_dir)
+    resume_dir = os.path.join(base_dir, 'resume')
+    os.makedirs(resume_dir)
+
+    code, _, _, log = run_stage(script, args, resume_dir, python_args=('-c', INTERRUPTED_RUN))
+    assert code == -signal.SIGKILL, f"the interrupted run exited with {code}:\n{log[-2000:]}"
+    manifests = [os.path.join(resume_dir, d, 'manifest.json') for d in os.listdir(resume_dir)
+                 if os.path.exists(os.path.join(resume_dir, d, 'manifest.json'))]
+    assert len(manifests) == 1, "the interrupted run left no checkpoint"
+    with open(manifests[0]) as f:
+        manifest = json.load(f)
+    assert 0 < manifest['completed'] < manifest['n_blocks']
+    assert not any(name.endswith('.nc') for name in os.listdir(resume_dir))
+
+    code, _, _, log = run_stage(script, args + ['--resume'], resume_dir)
+    assert code == 0, f"the resumed run exited with {code}:\n{log[-2000:]}"
+    assert f"Resuming after block {manifest['completed']} of {manifest['n_blocks']}" in log
+    assert not os.path.exists(os.path.dirname(manifests[0])), "the checkpoint was not removed"
+
+    uninterrupted_dir = os.path.join(base_dir, directory)
+    assert output_files(resume_dir) == output_files(uninterrupted_dir)
+    for name in output_files(uninterrupted_dir):
+        with xr.open_dataset(os.path.join(resume_dir, name)) as resumed, \
+                xr.open_dataset(os.path.join(uninterrupted_dir, name)) as uninterrupted:
+            xr.testing.assert_equal(resumed, uninterrupted)
+
+
+@pytest.mark.parametrize('stage', [stage for stage, _, _, _ in STAGES])
+def test_stage_within_budget(pipeline, stage):
+    _, measurements = pipeline
+    with open(BUDGETS_FILE) as f:
+        budget = json.load(f)[stage]
+    measured = measurements[stage]
+    seconds, peak_mb = budget['seconds'] * BUDGET_SCALE, budget['peak_mb'] * BUDGET_SCALE
+    assert measured['seconds'] <= seconds, f"{stage} took {measured['seconds']:.1f}s (budget {seconds:.1f}s)"
+    assert measured['peak_mb'] <= peak_mb, f"{stage} peaked at {measured['peak_mb']:.0f} MB (budget {peak_mb:.0f} MB)"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate golden outputs and performance budgets")
+    parser.add_argument('--update', action='store_true', help="Replace the golden output files")
+    parser.add_argument('--update-budgets', action='store_true', help="Re-measure the stage budgets")
+    parser.add_argument('--runs', type=int, default=3,
+                        help="Pipeline runs to measure the budgets over; the slowest of each stage counts")
+    args = parser.parse_args()
+    if not (args.update or args.update_budgets):
+        parser.error("give --update and/or --update-budgets (run the checks with pytest)")
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    slowest = {}
+    for run in range(args.runs if args.update_budgets else 1):
+        with tempfile.TemporaryDirectory() as base_dir:
+            print(f"🧪 Running the pipeline on synthetic input ({run + 1}/{args.runs if args.update_budgets else 1})...")
+            measurements = run_pipeline(base_dir)
+            for stage, m in measurements.items():
+                print(f"  {stage:<14} {m['seconds']:6.1f}s {m['peak_mb']:7.0f} MB")
+                slowest[stage] = {key: max(value, slowest.get(stage, {}).get(key, 0)) for key, value in m.items()}
+            if args.update and run == 0:
+                outputs = pipeline_outputs(base_dir)
+                written = save_golden(outputs)
+                print(f"✅ {len(written)} of {len(outputs)} golden outputs changed and saved to '{GOLDEN_DIR}'")
+    if args.update_budgets:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(BUDGETS_FILE, 'w') as f:
+            json.dump(measured_budgets(slowest), f, indent=2)
+        print(f"✅ Budgets saved to '{BUDGETS_FILE}'")
+
+
+if __name__ == "__main__":
+    main()
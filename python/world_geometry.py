@@ -0,0 +1,147 @@
+"""
+Read the world-110m.json TopoJSON used by the globe and rasterize its
+polygons onto regular latitude/longitude grids.
+"""
+
+import json
+import numpy as np
+
+WORLD_FILE = "../data/world-110m.json"
+
+
+def load_topology(path=WORLD_FILE):
+    """
+    Load a TopoJSON file.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def decode_arcs(topology):
+    """
+    Decode the quantized, delta-encoded arcs of a topology into
+    (n, 2) arrays of longitude/latitude.
+    """
+    transform = topology.get('transform')
+    arcs = []
+    for arc in topology['arcs']:
+        points = np.asarray(arc, dtype=float)
+        if transform:
+            points = np.cumsum(points, axis=0)
+            points = points * transform['scale'] + transform['translate']
+        arcs.append(points)
+    return arcs
+
+
+def _ring_coordinates(ring, arcs):
+    """
+    Stitch a ring of arc indexes into one coordinate array.
+    Negative indexes (~i) refer to arc i reversed.
+    """
+    parts = []
+    for index in ring:
+        points = arcs[index] if index >= 0 else arcs[~index][::-1]
+        # Consecutive arcs share their joining point
+        parts.append(points if not parts else points[1:])
+    return np.concatenate(parts)
+
+
+def geometry_rings(geometry, arcs):
+    """
+    All rings (outer boundaries and holes) of a Polygon or MultiPolygon.
+    """
+    if geometry['type'] == 'Polygon':
+        polygons = [geometry['arcs']]
+    elif geometry['type'] == 'MultiPolygon':
+        polygons = geometry['arcs']
+    else:
+        return []
+    return [_ring_coordinates(ring, arcs) for polygon in polygons for ring in polygon]
+
+
+def object_geometries(topology, object_name='countries'):
+    """
+    Return [(id, rings)] for every polygon geometry in a topology object.
+    """
+    arcs = decode_arcs(topology)
+    geometries = []
+    for geometry in topology['objects'][object_name]['geometries']:
+        rings = geometry_rings(geometry, arcs)
+        if rings:
+            geometries.append((geometry.get('id'), rings))
+    return geometries
+
+
+def ring_edges(rings):
+    """
+    (x0, y0, x1, y1) arrays of the edges of a set of rings. An edge that
+    jumps across the antimeridian (more than 180° of longitude) is replaced
+    by its two wrapped copies, one ending beyond +180° and one starting
+    beyond -180°, so rings cut at the seam stay closed on either side of it.
+    """
+    starts = np.concatenate([ring[:-1] for ring in rings])
+    ends = np.concatenate([ring[1:] for ring in rings])
+    x0, y0, x1, y1 = starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1]
+    shift = np.round((x0 - x1) / 360) * 360
+    jumps = shift != 0
+    return (np.concatenate([x0, x0[jumps] - shift[jumps]]), np.concatenate([y0, y0[jumps]]),
+            np.concatenate([x1 + shift, x1[jumps]]), np.concatenate([y1, y1[jumps]]))
+
+
+def rasterize_rings(rings, lat_coords, lon_coords):
+    """
+    Boolean (lat, lon) mask of grid points inside a set of rings, using the
+    even-odd rule so holes are excluded. Longitudes may be 0-360 or -180-180.
+    Rays are cast northwards along each grid column, so the stretches of
+    the antimeridian that close rings cut at the seam are never crossed.
+    """
+    lat_coords = np.asarray(lat_coords, dtype=float)
+    lon_coords = np.asarray(lon_coords, dtype=float)
+    lon_converted = np.where(lon_coords > 180, lon_coords - 360, lon_coords)
+    mask = np.zeros((len(lat_coords), len(lon_coords)), dtype=bool)
+
+    x0, y0, x1, y1 = ring_edges(rings)
+    if len(x0) == 0:
+        return mask
+
+    # Only points south of the northernmost edge and within its longitudes can
+    # be inside; rings around a pole also contain the points south of them
+    rows = np.where(lat_coords <= max(y0.max(), y1.max()))[0]
+    cols = np.where((lon_converted >= min(x0.min(), x1.min())) & (lon_converted <= max(x0.max(), x1.max())))[0]
+    if len(rows) == 0 or len(cols) == 0:
+        return mask
+    row_lats = lat_coords[rows]
+
+    for col in cols:
+        x = lon_converted[col]
+        crossing = (x0 <= x) != (x1 <= x)
+        if not crossing.any():
+            continue
+        cx0, cy0, cx1, cy1 = x0[crossing], y0[crossing], x1[crossing], y1[crossing]
+        ys = np.sort(cy0 + (x - cx0) * (cy1 - cy0) / (cx1 - cx0))
+        # Count ray crossings to the north of each grid point
+        crossings_north = len(ys) - np.searchsorted(ys, row_lats, side='right')
+        mask[rows, col] = crossings_north % 2 == 1
+    return mask
+
+
+def rasterize_object(lat_coords, lon_coords, object_name='countries', path=WORLD_FILE):
+    """
+    Rasterize a topology object onto a grid.
+    Returns the (lat, lon) array of geometry positions (-1 outside every
+    geometry) and the list of geometry ids.
+    """
+    topology = load_topology(path)
+    geometries = object_geometries(topology, object_name)
+    raster = np.full((len(lat_coords), len(lon_coords)), -1, dtype=np.int16)
+    for position, (_, rings) in enumerate(geometries):
+        raster[rasterize_rings(rings, lat_coords, lon_coords)] = position
+    return raster, [geometry_id for geometry_id, _ in geometries]
+
+
+def land_mask(lat_coords, lon_coords, path=WORLD_FILE):
+    """
+    Boolean (lat, lon) land mask rasterized from the TopoJSON land object.
+    """
+    raster, _ = rasterize_object(lat_coords, lon_coords, 'land', path)
+    return raster >= 0